@@ -1,17 +1,11 @@
 import json
 
 from google.adk.agents import BaseAgent
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Content, Part
 
-from app.callbacks.lang_detect import LangCallback
-from app.callbacks.safety_filters import SafetyGuard
-from app.callbacks.transcript_acc import TranscriptAccumulator
-from app.config.base import Settings
-from app.services.prompts.langfuse_cli import prompt_manager
-from app.tools.save_analysis import save_analysis
-
-settings = Settings()
+from app.agents.factory import analyst_core_llm
+from app.services.prompts.builders import analysis_data, prompt_tokens_delta
 
 
 class AnalystLLMAgent(BaseAgent):
@@ -35,32 +29,23 @@ class AnalystLLMAgent(BaseAgent):
             )
             return
 
-        # Get the analysis instruction
-        analysis_instruction = prompt_manager.fetch_prompt(settings.analysis_agent_instruction_key)
-
-        # Create the prompt with the parsed data
-        prompt = f"""{analysis_instruction}
-
-Here is the structured intake data to analyze:
-
-{json.dumps(parsed_data, indent=2)}
-
-Please provide a comprehensive CBT analysis as specified in the instructions."""
-
-        # Use the LLM to analyze
-        from google.adk.agents import LlmAgent
-
-        llm = LlmAgent(
-            name="AnalystLLMCore",
-            model=settings.google_ai_model,
-            instruction=prompt,
-            before_model_callback=[LangCallback(), SafetyGuard()],
-            after_model_callback=[TranscriptAccumulator()],
-            tools=[save_analysis],  # Tool for saving analysis
+        # The prompt used to embed the record indented; record what compaction saves
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta=prompt_tokens_delta(
+                    ctx.session.state,
+                    "analysis",
+                    json.dumps(parsed_data, indent=2),
+                    analysis_data(parsed_data),
+                )
+            ),
         )
 
-        # Process through LLM
-        async for llm_event in llm.run_async(ctx):
+        # Process through the prebuilt LLM - it reads the parsed data from state
+        async for llm_event in analyst_core_llm().run_async(ctx):
             yield llm_event
 
 
@@ -1,9 +1,17 @@
-from google.adk.agents import LoopAgent
-
 from app.agents.analysis_llm import analyst_llm
+from app.agents.budgeted_loop import BudgetedLoopAgent
+from app.config.base import Settings
+
+settings = Settings()
 
-analysis_loop = LoopAgent(
+analysis_loop = BudgetedLoopAgent(
     name="AnalysisLoop",
     sub_agents=[analyst_llm],
     max_iterations=8,
+    max_seconds=settings.analysis_loop_max_seconds,
+    max_tokens=settings.analysis_loop_max_tokens,
+    max_stalls=settings.loop_max_stalls,
+    # The analyst is done once it calls save_analysis; text alone is a draft.
+    require_tool_call=True,
+    fallback_output_key="cbt_analysis",
 )
@@ -0,0 +1,226 @@
+"""``LoopAgent`` with progress detection and per-session budgets.
+
+A plain ``LoopAgent`` only stops when a sub-agent escalates or after
+``max_iterations``.  When the analyst never calls ``save_analysis`` it re-sends
+the full analysis prompt up to eight times, and those runaway sessions dominate
+our tail latency and model spend.  :class:`BudgetedLoopAgent` stops a loop as
+soon as one of these holds, checked between iterations:
+
+* ``escalated`` - a sub-agent escalated (``exit_loop`` / ``save_analysis``),
+  the normal way out;
+* ``no_progress`` - ``max_stalls`` iterations in a row made no progress: the
+  output repeated an earlier iteration word for word, or no tool was called
+  while ``require_tool_call`` is set;
+* ``time_budget`` / ``token_budget`` - the loop has spent ``max_seconds`` of
+  wall-clock time or ``max_tokens`` model tokens (as recorded by
+  :class:`app.callbacks.token_usage.TokenUsageRecorder`) in this session,
+  summed over every invocation that ran it - or, with
+  ``budget_per_invocation``, in the current invocation only, so a loop that
+  runs once per user turn gets a fresh budget on every turn;
+* ``max_iterations`` - as for ``LoopAgent``, per invocation;
+* ``awaiting_user`` - with ``await_user_after_reply``, the model answered in
+  text (a question for the user) without calling a tool.  Running it again
+  before the user says something new only buys "continue processing" filler,
+  so the loop ends the invocation and hands control back to the client (see
+  :class:`app.agents.turn_gate.TurnGatedPipeline`).
+
+When a loop stops without escalating and ``fallback_output_key`` is unset in
+state, the last model output is stored there, so the analysis degrades to the
+analyst's last draft instead of an empty report.  The spend and the stop reason
+are recorded under ``state["loop_control"][<loop name>]`` with a state-delta
+event, so they persist with the session.
+
+Like ``LoopAgent``, the loop records its position (``LoopAgentState``) before
+each sub-agent run and an end-of-agent event when it finishes, so a resumable
+invocation picks up where it stopped.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Mapping
+from contextlib import aclosing
+import hashlib
+import time
+from typing import Any
+
+from google.adk.agents import LoopAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.loop_agent import LoopAgentState
+from google.adk.events import Event, EventActions
+
+from app.agents.turn_gate import AWAITING_USER_KEY
+from app.callbacks.token_usage import TOKEN_USAGE_KEY
+
+LOOP_CONTROL_KEY = "loop_control"
+
+
+def session_tokens(state: Mapping[str, Any]) -> int:
+    """Return the prompt and output tokens recorded for the whole session."""
+    usage = state.get(TOKEN_USAGE_KEY) or {}
+    return sum(totals["prompt"] + totals["output"] for totals in usage.values())
+
+
+class BudgetedLoopAgent(LoopAgent):
+    """Loop that also stops on non-progress and on wall-clock or token budgets."""
+
+    max_seconds: float | None = None
+    """Wall-clock seconds the loop may run in one session (all invocations)."""
+
+    max_tokens: int | None = None
+    """Model tokens the loop may spend in one session (all invocations)."""
+
+    budget_per_invocation: bool = False
+    """Apply ``max_seconds`` and ``max_tokens`` to each invocation instead of the session."""
+
+    max_stalls: int = 2
+    """Consecutive iterations without progress after which the loop stops."""
+
+    require_tool_call: bool = False
+    """Count an iteration that calls no tool as one without progress."""
+
+    fallback_output_key: str | None = None
+    """State key that receives the last model output when the loop gives up."""
+
+    await_user_after_reply: bool = False
+    """End the invocation once the model replies in text without calling a tool."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        if not self.sub_agents:
+            return
+
+        state = ctx.session.state
+        spent = (state.get(LOOP_CONTROL_KEY) or {}).get(self.name) or {}
+        if self.budget_per_invocation and spent.get("invocation_id") != ctx.invocation_id:
+            spent = {}
+        seconds = float(spent.get("seconds", 0.0))
+        tokens = int(spent.get("tokens", 0))
+
+        agent_state = self._load_agent_state(ctx, LoopAgentState)
+        resuming = agent_state is not None
+        iterations, start_index = self._get_start_state(agent_state)
+
+        seen_outputs: set[bytes] = set()
+        last_output = ""
+        stalls = 0
+        reason = None
+        while reason is None:
+            reason = self._budget_exceeded(iterations, seconds, tokens)
+            if reason is not None:
+                break
+
+            started, tokens_before = time.monotonic(), session_tokens(state)
+            called_tool = paused = False
+            outputs: list[str] = []
+            for sub_agent in self.sub_agents[start_index:]:
+                if ctx.is_resumable and not resuming:
+                    ctx.set_agent_state(
+                        self.name,
+                        agent_state=LoopAgentState(
+                            current_sub_agent=sub_agent.name, times_looped=iterations
+                        ),
+                    )
+                    yield self._create_agent_state_event(ctx)
+                resuming = False
+
+                async with aclosing(sub_agent.run_async(ctx)) as agen:
+                    async for event in agen:
+                        yield event
+                        called_tool = called_tool or bool(event.get_function_calls())
+                        if event.author != "user" and not event.partial and event.content:
+                            outputs.extend(
+                                part.text for part in event.content.parts or () if part.text
+                            )
+                        if event.actions.escalate:
+                            reason = "escalated"
+                        paused = paused or ctx.should_pause_invocation(event)
+                if reason is not None or paused:
+                    break
+
+            iterations += 1
+            seconds += time.monotonic() - started
+            tokens += session_tokens(state) - tokens_before
+            if paused:
+                reason = reason or "paused"
+                break
+            start_index = 0
+            ctx.reset_sub_agent_states(self.name)
+            if reason is not None:
+                break
+
+            output = "\n".join(outputs).strip()
+            digest = hashlib.blake2b(output.encode(), digest_size=16).digest()
+            repeated = digest in seen_outputs
+            seen_outputs.add(digest)
+            if output:
+                last_output = output
+            if self.await_user_after_reply and output and not called_tool:
+                reason = "awaiting_user"
+                break
+
+            if repeated or (self.require_tool_call and not called_tool):
+                stalls += 1
+                if stalls >= self.max_stalls:
+                    reason = "no_progress"
+            else:
+                stalls = 0
+
+        yield self._record(ctx, reason, iterations, seconds, tokens, last_output)
+        if reason == "awaiting_user":
+            ctx.end_invocation = True
+        # A paused invocation resumes inside the loop, so it has not ended yet.
+        if reason != "paused" and ctx.is_resumable:
+            ctx.set_agent_state(self.name, end_of_agent=True)
+            yield self._create_agent_state_event(ctx)
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                    #
+    # ------------------------------------------------------------------ #
+    def _budget_exceeded(self, iterations: int, seconds: float, tokens: int) -> str | None:
+        if self.max_iterations is not None and iterations >= self.max_iterations:
+            return "max_iterations"
+        if self.max_seconds is not None and seconds >= self.max_seconds:
+            return "time_budget"
+        if self.max_tokens is not None and tokens >= self.max_tokens:
+            return "token_budget"
+        return None
+
+    def _record(
+        self,
+        ctx: InvocationContext,
+        reason: str,
+        iterations: int,
+        seconds: float,
+        tokens: int,
+        last_output: str,
+    ) -> Event:
+        """Return the state-delta event with the loop's spend and stop reason."""
+        state = ctx.session.state
+        degraded = bool(
+            reason not in ("escalated", "paused", "awaiting_user")
+            and self.fallback_output_key
+            and not state.get(self.fallback_output_key)
+            and last_output
+        )
+        print(f"[{self.name}] Stopped after {iterations} iteration(s): {reason}")
+
+        control = dict(state.get(LOOP_CONTROL_KEY) or {})
+        control[self.name] = {
+            "stop_reason": reason,
+            "iterations": iterations,
+            "seconds": round(seconds, 3),
+            "tokens": tokens,
+            "degraded": degraded,
+        }
+        if self.budget_per_invocation:
+            control[self.name]["invocation_id"] = ctx.invocation_id
+        delta: dict[str, Any] = {LOOP_CONTROL_KEY: control}
+        if reason == "awaiting_user":
+            delta[AWAITING_USER_KEY] = ctx.invocation_id
+        if degraded:
+            delta[self.fallback_output_key] = last_output  # type: ignore[index]
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=delta),
+        )
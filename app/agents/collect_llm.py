@@ -1,7 +1,11 @@
 from google.adk.agents import LlmAgent
 
+from app.callbacks.content_filter import ContentFilter
+from app.callbacks.intake_readiness import IntakeReadiness
+from app.callbacks.intake_tracker import IntakeTracker
 from app.callbacks.lang_detect import LangCallback
 from app.callbacks.safety_filters import SafetyGuard
+from app.callbacks.token_usage import TokenUsageRecorder
 from app.callbacks.transcript_acc import TranscriptAccumulator
 from app.config.base import Settings
 from app.services.prompts.langfuse_cli import prompt_manager
@@ -13,7 +17,17 @@ collector_llm = LlmAgent(
     name="CollectorLLM",
     model=settings.google_ai_model,
     instruction=prompt_manager.fetch_prompt(settings.collect_agent_instruction_key),
-    before_model_callback=[LangCallback(), SafetyGuard()],
-    after_model_callback=TranscriptAccumulator(),
+    before_model_callback=[
+        LangCallback(),
+        SafetyGuard(mode=settings.pii_mode),
+        ContentFilter.from_settings(settings),
+    ],
+    after_model_callback=[
+        TranscriptAccumulator(append_only=True, redact_pii=settings.pii_mode == "redact"),
+        IntakeTracker(redact_pii=settings.pii_mode == "redact"),
+        TokenUsageRecorder(),
+        # Last: it replaces the response once every intake field is covered.
+        *([IntakeReadiness()] if settings.intake_auto_exit else []),
+    ],
     tools=[exit_loop],
 )
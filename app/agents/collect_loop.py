@@ -1,9 +1,18 @@
-from google.adk.agents import LoopAgent
-
+from app.agents.budgeted_loop import BudgetedLoopAgent
 from app.agents.collect_llm import collector_llm
+from app.config.base import Settings
+
+settings = Settings()
 
-collector_loop = LoopAgent(
+collector_loop = BudgetedLoopAgent(
     name="CollectorLoop",
     sub_agents=[collector_llm],
     max_iterations=12,
+    max_seconds=settings.collector_loop_max_seconds,
+    max_tokens=settings.collector_loop_max_tokens,
+    # The collector runs once per user message; a long intake must not starve later turns.
+    budget_per_invocation=True,
+    max_stalls=settings.loop_max_stalls,
+    # One question per user message: hand control back after every reply.
+    await_user_after_reply=True,
 )
@@ -0,0 +1,71 @@
+"""Process-wide LLM sub-agents of ``JsonParserAgent`` and ``AnalystLLMAgent``.
+
+Both wrapper agents used to build a fresh ``LlmAgent`` - with a fresh list of
+callbacks and a prompt holding the session's data - on every run.  The agents
+below are built once per process instead (``lru_cache``, like
+``get_session_service``) and read the per-session data from state through an
+``InstructionProvider`` (see :mod:`app.services.prompts.builders`).  The
+callbacks already keep their per-session data in state or in
+session-scoped caches, so one instance serves every session.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.readonly_context import ReadonlyContext
+
+from app.callbacks.content_filter import ContentFilter
+from app.callbacks.lang_detect import LangCallback
+from app.callbacks.safety_filters import SafetyGuard
+from app.callbacks.token_usage import TokenUsageRecorder
+from app.callbacks.transcript_acc import TranscriptAccumulator
+from app.config.base import Settings
+from app.services.parsing.intake import IntakeRecord
+from app.services.prompts.builders import analysis_prompt_from_state, parser_prompt_from_state
+from app.tools.save_analysis import save_analysis
+
+settings = Settings()
+
+
+def parser_instruction(ctx: ReadonlyContext) -> str:
+    """InstructionProvider of the parser LLM."""
+    return parser_prompt_from_state(ctx.state)
+
+
+def analysis_instruction(ctx: ReadonlyContext) -> str:
+    """InstructionProvider of the analyst LLM."""
+    return analysis_prompt_from_state(ctx.state)
+
+
+@lru_cache
+def parser_llm(structured_output: bool = True) -> LlmAgent:
+    """Return the parser LLM, constrained to ``IntakeRecord`` when *structured_output*."""
+    return LlmAgent(
+        name="JsonParserLLM",
+        model=settings.google_ai_model,
+        instruction=parser_instruction,
+        output_schema=IntakeRecord if structured_output else None,
+        after_model_callback=TokenUsageRecorder(),
+    )
+
+
+@lru_cache
+def analyst_core_llm() -> LlmAgent:
+    """Return the analyst LLM with its safety callbacks and the save_analysis tool."""
+    return LlmAgent(
+        name="AnalystLLMCore",
+        model=settings.google_ai_model,
+        instruction=analysis_instruction,
+        before_model_callback=[
+            LangCallback(),
+            SafetyGuard(mode=settings.pii_mode),
+            ContentFilter.from_settings(settings),
+        ],
+        after_model_callback=[
+            TranscriptAccumulator(append_only=True, redact_pii=settings.pii_mode == "redact"),
+            TokenUsageRecorder(),
+        ],
+        tools=[save_analysis],  # Tool for saving analysis
+    )
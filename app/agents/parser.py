@@ -1,26 +1,58 @@
+import asyncio
+import hashlib
+import json
+from typing import Any
+
 from google.adk.agents import BaseAgent
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Content, Part
 
+from app.agents.factory import parser_llm
 from app.config.base import Settings
+from app.services.cache.parses import get_parse_cache
+from app.services.parsing.intake import (
+    IntakeParseError,
+    IntakeRecord,
+    parse_intake,
+    validate_intake,
+)
+from app.services.parsing.json_stream import JsonObjectExtractor, extract_json_object
+from app.services.parsing.slots import tracked_record
+from app.services.prompts.builders import (
+    PARSER_REPAIR_KEY,
+    parser_transcript,
+    prompt_tokens_delta,
+)
 from app.services.prompts.langfuse_cli import prompt_manager
+from app.services.rendering.staged import get_report_stages
+from app.services.transcript.store import Transcript
 
 settings = Settings()
 
 
+def parser_prompt_version() -> str:
+    """Return a short hash of everything besides the transcript that shapes a parse."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(prompt_manager.fetch_prompt(settings.parser_agent_instruction_key).encode())
+    digest.update(f"{settings.google_ai_model}:{settings.parser_token_budget}".encode())
+    if settings.parser_structured_output:
+        digest.update(json.dumps(IntakeRecord.model_json_schema(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+
 class JsonParserAgent(BaseAgent):
     """Parser agent that reads transcript from state and converts to JSON."""
 
     async def _run_async_impl(self, ctx):
         """Process the intake transcript from state."""
-        # Get the transcript from state
-        intake_transcript = ctx.session.state.get("intake_transcript", "")
-        conv_raw = ctx.session.state.get("conv_raw", [])
+        # Render the intake part of the conversation stored in state
+        transcript = Transcript(ctx.session.state)
+        intake_transcript = transcript.render_intake()
 
-        print(f"[JsonParser] Processing transcript with {len(conv_raw)} entries")
+        print(f"[JsonParser] Processing transcript with {len(transcript)} entries")
         print(f"[JsonParser] Intake transcript length: {len(intake_transcript)}")
 
-        if not intake_transcript and not conv_raw:
+        if not intake_transcript:
             yield Event(
                 author=self.name,
                 content=Content(
@@ -33,72 +65,151 @@ class JsonParserAgent(BaseAgent):
             )
             return
 
-        # Build the full transcript if needed
-        if not intake_transcript and conv_raw:
-            intake_transcript = "\n".join(f"{entry['role']}: {entry['text']}" for entry in conv_raw)
-            ctx.session.state["intake_transcript"] = intake_transcript
-
-        # Get the parser instruction
-        parser_instruction = prompt_manager.fetch_prompt(settings.parser_agent_instruction_key)
-
-        # Create the prompt with the transcript
-        prompt = f"""{parser_instruction}
-
-Here is the intake conversation transcript to process:
+        # The intake tracker already filled every field during the conversation.
+        tracked = tracked_record(ctx.session.state) if settings.parser_use_tracked_record else None
+        if tracked is not None:
+            print("[JsonParser] Using the intake record tracked during the conversation")
+            ctx.session.state["parse_attempts"] = 0
+            yield self._parsed_event(ctx, tracked)
+            return
 
-{intake_transcript}
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta=prompt_tokens_delta(
+                    ctx.session.state,
+                    "parser",
+                    intake_transcript,
+                    parser_transcript(ctx.session.state),
+                )
+            ),
+        )
 
-Please extract and structure this information as JSON as specified in the instructions."""
+        # Identical transcripts never pay for a second parser call.  The sqlite
+        # and postgres backends block, so the cache is used off the event loop.
+        cache = await asyncio.to_thread(get_parse_cache)
+        prompt_version = parser_prompt_version()
+        cached = (
+            await asyncio.to_thread(cache.get, intake_transcript, prompt_version) if cache else None
+        )
+        if cached is not None:
+            print("[JsonParser] Reusing the cached parse of this transcript")
+            ctx.session.state["parse_attempts"] = 0
+            yield self._parsed_event(ctx, cached)
+            return
 
-        # Use the LLM to parse
-        from google.adk.agents import LlmAgent
+        # First attempt, then at most ``parser_max_repairs`` repairs: an answer
+        # that fails validation is sent back with the errors (through temporary
+        # state, read by the parser LLM's instruction provider), an empty one
+        # gets the full prompt again.
+        record = None
+        for attempt in range(settings.parser_max_repairs + 1):
+            last_event, response_text, parsed_data, delta = await self._complete(ctx)
+            if delta:
+                # The parser LLM's own events are not yielded; forward what its
+                # callbacks recorded (token usage) so the session service keeps it.
+                yield Event(
+                    invocation_id=ctx.invocation_id,
+                    author=self.name,
+                    branch=ctx.branch,
+                    actions=EventActions(state_delta=delta),
+                )
+            try:
+                record = (
+                    validate_intake(parsed_data)
+                    if parsed_data is not None
+                    else parse_intake(response_text)
+                )
+                break
+            except IntakeParseError as exc:
+                print(f"[JsonParser] Attempt {attempt + 1} failed validation: {exc}")
+                if response_text.strip():
+                    ctx.session.state[PARSER_REPAIR_KEY] = {
+                        "response": response_text,
+                        "errors": str(exc),
+                    }
+                else:
+                    ctx.session.state.pop(PARSER_REPAIR_KEY, None)
+
+        ctx.session.state.pop(PARSER_REPAIR_KEY, None)
+        ctx.session.state["parse_attempts"] = attempt + 1
+        if record is None:
+            print("[JsonParser] No valid intake record after all attempts")
+            # Store raw response as fallback
+            ctx.session.state["parsed"] = {"raw_response": response_text}
+            if last_event is not None:
+                yield last_event
+            return
 
-        llm = LlmAgent(
-            name="JsonParserLLM",
-            model=settings.google_ai_model,
-            instruction=prompt,
+        parsed_data = record.model_dump()
+        if cache is not None:
+            await asyncio.to_thread(cache.put, intake_transcript, prompt_version, parsed_data)
+        yield self._parsed_event(ctx, parsed_data)
+
+    def _parsed_event(self, ctx, parsed_data: dict[str, Any]) -> Event:
+        """Store *parsed_data* in state and return the success event."""
+        ctx.session.state["parsed"] = parsed_data
+        if (
+            settings.pdf_staged_render
+            and settings.report_format == "pdf"
+            and get_report_stages().enabled
+        ):
+            # Lay out the report's intake section while the analysis runs.
+            get_report_stages().start(ctx.session.id, parsed_data)
+        print(f"[JsonParser] Successfully parsed JSON: {list(parsed_data.keys())}")
+
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=Content(
+                parts=[
+                    Part(
+                        text=f"Successfully extracted intake data:\n{json.dumps(parsed_data, indent=2)}"
+                    )
+                ]
+            ),
+            # Also through the delta, so the session service stores the record.
+            actions=EventActions(
+                state_delta={
+                    "parsed": parsed_data,
+                    "parse_attempts": ctx.session.state.get("parse_attempts", 0),
+                }
+            ),
         )
 
-        # Process through LLM
+    async def _complete(
+        self, ctx
+    ) -> tuple[Event | None, str, dict[str, Any] | None, dict[str, Any]]:
+        """Run the parser LLM once.
+
+        Returns its last event, text, first JSON object and the state delta of
+        all its events.
+        """
+        llm = parser_llm(settings.parser_structured_output)
+
+        # Streamed chunks go through one incremental extractor, complete
+        # responses are scanned on their own.
+        stream = JsonObjectExtractor()
+        last_event, response_text, parsed_data = None, "", None
+        delta: dict[str, Any] = {}
         async for llm_event in llm.run_async(ctx):
-            if llm_event.content and llm_event.content.parts:
-                # Extract JSON from the response
-                response_text = ""
-                for part in llm_event.content.parts:
-                    if hasattr(part, "text") and part.text:
-                        response_text += part.text
-
-                # Try to extract JSON
-                import json
-                import re
-
-                # Look for JSON in the response
-                json_match = re.search(r"\{[\s\S]*\}", response_text)
-                if json_match:
-                    try:
-                        parsed_data = json.loads(json_match.group())
-                        ctx.session.state["parsed"] = parsed_data
-                        print(f"[JsonParser] Successfully parsed JSON: {list(parsed_data.keys())}")
-
-                        yield Event(
-                            author=self.name,
-                            content=Content(
-                                parts=[
-                                    Part(
-                                        text=f"Successfully extracted intake data:\n{json.dumps(parsed_data, indent=2)}"
-                                    )
-                                ]
-                            ),
-                        )
-                    except json.JSONDecodeError as e:
-                        print(f"[JsonParser] Failed to parse JSON: {e}")
-                        # Store raw response as fallback
-                        ctx.session.state["parsed"] = {"raw_response": response_text}
-                        yield llm_event
-                else:
-                    # No JSON found, store raw response
-                    ctx.session.state["parsed"] = {"raw_response": response_text}
-                    yield llm_event
+            delta.update(llm_event.actions.state_delta)
+            if parsed_data is not None or not (llm_event.content and llm_event.content.parts):
+                continue
+
+            text = "".join(
+                part.text for part in llm_event.content.parts if getattr(part, "text", None)
+            )
+            if llm_event.partial:
+                parsed_data = stream.feed(text)
+                response_text += text
+            else:
+                last_event, response_text = llm_event, text
+                parsed_data = extract_json_object(text)
+        return last_event, response_text, parsed_data, delta
 
 
 json_parser = JsonParserAgent(name="JsonParser")
@@ -1,14 +1,32 @@
 """PdfAgent - deterministic final step that builds a PDF and saves it as an artifact."""
 
+import asyncio
+import time
+
 from google.adk.agents import BaseAgent
-from google.adk.events import Event
+from google.adk.events import Event, EventActions
 from google.genai.types import Blob, Content, Part
 
 from app.config.base import Settings
+from app.services.cache.renders import get_render_cache, render_key
+from app.services.persistence.blobs import get_blob_store
+from app.services.rendering.lazy import (
+    REPORT_PDF,
+    REPORT_SOURCE,
+    LazyPdfArtifactService,
+    report_source,
+)
+from app.services.rendering.markup import MARKUP_FORMATS, render_markup
+from app.services.rendering.pool import RenderError, get_render_pool
+from app.services.rendering.report import ReportData
+from app.services.rendering.staged import get_report_stages
 from app.tools.pdf_generator import build_pdf_bytes
 
 settings = Settings()
 
+URL_EXPIRY = 120  # seconds a signed artifact link stays valid
+URL_MIN_VALIDITY = 30  # re-sign a saved link that expires sooner than this
+
 
 class PdfAgent(BaseAgent):
     def __init__(self) -> None:
@@ -40,61 +58,182 @@ class PdfAgent(BaseAgent):
         print(f"  [PdfAgent] Building PDF with intake_data keys: {list(intake_data.keys())}")
         print(f"  [PdfAgent] Analysis output length: {len(analysis_output)}")
 
-        pdf_bytes = build_pdf_bytes(
-            intake_data=intake_data,
-            analysis_output=analysis_output,
+        has_artifact_service = callable(getattr(ctx, "save_artifact", None)) or (
+            getattr(ctx, "artifact_service", None) is not None
+        )
+        if settings.report_format != "pdf":
+            async for event in self._produce_markup(
+                ctx, intake_data, analysis_output, has_artifact_service
+            ):
+                yield event
+            return
+
+        cache = get_render_cache()
+        key = render_key(intake_data, analysis_output)
+        # The report whose intake section was laid out when the parser stored
+        # the record, if it was staged in this process from the same record.
+        session_id = getattr(ctx.session, "id", None)
+        staged = (
+            get_report_stages().take(session_id, intake_data)
+            if settings.pdf_staged_render and session_id is not None and get_report_stages().enabled
+            else None
         )
 
+        # Same inputs as the artifact saved earlier in this session: reuse its
+        # version (and its link while it is still valid) instead of rendering
+        # and uploading the same PDF again.
+        previous = state.get("pdf_output") or {}
+        if (
+            has_artifact_service
+            and previous.get("render_key") == key
+            and previous.get("version") is not None
+        ):
+            url = previous.get("url")
+            if not url or previous.get("url_expires_at", 0) <= time.time() + URL_MIN_VALIDITY:
+                url = await _artifact_url(ctx, previous["pdf_filename"], previous["version"])
+            cache.record_hit(previous.get("pdf_size", 0))
+            print(f"  [PdfAgent] Reusing artifact version {previous['version']}")
+            pdf_output = {**previous, "url": url, "url_expires_at": time.time() + URL_EXPIRY}
+            yield self._output_event(ctx, pdf_output, f"📄 PDF generated: {url or REPORT_PDF}")
+            return
+
+        pdf_bytes = cache.get(key)
+        if pdf_bytes is not None:
+            print("  [PdfAgent] Reusing the cached render of these inputs")
+        elif staged is not None:
+            # Only the analysis section and the final assembly are left.
+            try:
+                pdf_bytes = await get_report_stages().finish(staged, analysis_output)
+            except RenderError as exc:  # fall back to a full render
+                print(f"  [PdfAgent] Staged report failed, rendering it in full: {exc!r}")
+            else:
+                print("  [PdfAgent] Finished the staged report")
+                cache.put(key, pdf_bytes)
+        if pdf_bytes is None:
+            # Render on the pool: reportlab layout would block the event loop.
+            try:
+                pdf_bytes = await get_render_pool().run(
+                    build_pdf_bytes,
+                    intake_data=dict(intake_data),
+                    analysis_output=analysis_output,
+                )
+            except RenderError as exc:
+                print(f"  [PdfAgent] PDF rendering failed: {exc}")
+                yield self._output_event(
+                    ctx,
+                    {"pdf_filename": "report.pdf", "error": str(exc)},
+                    "⚠️ The PDF report could not be generated right now.",
+                )
+                return
+            cache.put(key, pdf_bytes)
+
         # Check if we have artifact service available
-        if hasattr(ctx, "save_artifact") and callable(getattr(ctx, "save_artifact", None)):
+        if has_artifact_service:
             # Wrap bytes as a Part for save_artifact
             artifact_part = Part(inline_data=Blob(data=pdf_bytes, mime_type="application/pdf"))
             filename = "report.pdf"
-            version = await ctx.save_artifact(filename=filename, artifact=artifact_part)
-
-            url = await ctx.get_artifact_url(
-                filename=filename,
-                version=version,
-                expiry_seconds=120,  # 2-minute signed link
-            )
+            version = await _save_artifact(ctx, filename, artifact_part)
+            url = await _artifact_url(ctx, filename, version)
 
-            # Store output in session state
-            state["pdf_output"] = {
+            pdf_output = {
                 "pdf_filename": filename,
                 "version": version,
                 "url": url,
+                "url_expires_at": time.time() + URL_EXPIRY,
+                "pdf_size": len(pdf_bytes),
+                "render_key": key,
             }
 
             # Emit final message with PDF link
-            yield Event(
-                author=self.name,
-                content=Content(parts=[Part(text=f"📄 PDF generated: {url}")]),
-            )  # type: ignore[attr-defined]
+            yield self._output_event(ctx, pdf_output, f"📄 PDF generated: {url or REPORT_PDF}")
         else:
-            # Fallback: Store PDF in state as base64
-            import base64
-
-            pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
-
-            # Store in session state
-            state["pdf_output"] = {
+            # Fallback: keep the bytes out of the session - state and event only
+            # reference the PDF by content hash in the blob store.
+            pdf_ref = await asyncio.to_thread(get_blob_store().put, pdf_bytes, "application/pdf")
+            pdf_output = {
                 "pdf_filename": "report.pdf",
-                "pdf_base64": pdf_base64,
+                "pdf_blob": pdf_ref,
                 "pdf_size": len(pdf_bytes),
             }
 
-            # Include PDF as attachment in the event
-            pdf_part = Part(inline_data=Blob(data=pdf_bytes, mime_type="application/pdf"))
-
-            # Emit final message with PDF data
-            yield Event(
-                author=self.name,
-                content=Content(
-                    parts=[
-                        Part(
-                            text=f"📄 PDF generated ({len(pdf_bytes)} bytes). The PDF data is included in the session state as base64."
-                        ),
-                        pdf_part,
-                    ]
-                ),
-            )  # type: ignore[attr-defined]
+            # Emit final message with the PDF reference
+            yield self._output_event(
+                ctx,
+                pdf_output,
+                f"📄 PDF generated ({len(pdf_bytes)} bytes). Stored as {pdf_ref['digest']}.",
+            )
+
+    async def _produce_markup(
+        self, ctx, intake_data, analysis_output: str, has_artifact_service: bool
+    ):  # type: ignore[attr-defined]
+        """Save the report as HTML or Markdown; report.pdf is rendered when it is loaded."""
+        report_format = settings.report_format
+        filename, mime_type = MARKUP_FORMATS[report_format]
+        data = ReportData.from_session(intake_data, analysis_output)
+        report = render_markup(data, report_format).encode()
+
+        if has_artifact_service:
+            version = await _save_artifact(
+                ctx, filename, Part(inline_data=Blob(data=report, mime_type=mime_type))
+            )
+            # The inputs of the PDF, for LazyPdfArtifactService: report.pdf
+            # version n is rendered from report.json version n.
+            pdf_version = await _save_artifact(
+                ctx, REPORT_SOURCE, report_source(dict(intake_data), analysis_output, data.date)
+            )
+            url = await _artifact_url(ctx, filename, version)
+            pdf_output = {
+                "report_filename": filename,
+                "report_format": report_format,
+                "version": version,
+                "url": url,
+                "url_expires_at": time.time() + URL_EXPIRY,
+                "report_size": len(report),
+            }
+            # report.pdf only exists where the artifact service renders it.
+            if isinstance(getattr(ctx, "artifact_service", None), LazyPdfArtifactService):
+                pdf_output.update(pdf_filename=REPORT_PDF, pdf_version=pdf_version)
+            yield self._output_event(ctx, pdf_output, f"📄 Report generated: {url or filename}")
+        else:
+            report_ref = await asyncio.to_thread(get_blob_store().put, report, mime_type)
+            pdf_output = {
+                "report_filename": filename,
+                "report_format": report_format,
+                "report_blob": report_ref,
+                "report_size": len(report),
+            }
+            yield self._output_event(
+                ctx,
+                pdf_output,
+                f"📄 Report generated ({len(report)} bytes). Stored as {report_ref['digest']}.",
+            )
+
+    def _output_event(self, ctx, pdf_output: dict, text: str) -> Event:
+        """Return the final event, storing *pdf_output* through its state delta."""
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=Content(parts=[Part(text=text)]),
+            actions=EventActions(state_delta={"pdf_output": pdf_output}),
+        )
+
+
+async def _save_artifact(ctx, filename: str, artifact: Part) -> int:
+    """Save *artifact* through *ctx*, or to the invocation's artifact service."""
+    if callable(getattr(ctx, "save_artifact", None)):
+        return await ctx.save_artifact(filename=filename, artifact=artifact)
+    return await ctx.artifact_service.save_artifact(
+        app_name=ctx.app_name,
+        user_id=ctx.user_id,
+        session_id=ctx.session.id,
+        filename=filename,
+        artifact=artifact,
+    )
+
+
+async def _artifact_url(ctx, filename: str, version: int) -> str | None:
+    """Return a signed link to the artifact, or None when *ctx* cannot sign one."""
+    if not callable(getattr(ctx, "get_artifact_url", None)):
+        return None
+    return await ctx.get_artifact_url(filename=filename, version=version, expiry_seconds=URL_EXPIRY)
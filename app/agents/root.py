@@ -1,11 +1,10 @@
-from google.adk.agents import SequentialAgent
-
 from app.agents.analysis_loop import analysis_loop
 from app.agents.collect_loop import collector_loop
 from app.agents.parser import json_parser
 from app.agents.pdf_agent import PdfAgent
+from app.agents.turn_gate import TurnGatedPipeline
 
-root_agent = SequentialAgent(
+root_agent = TurnGatedPipeline(
     name="ReframePipeline",
     sub_agents=[
         collector_loop,
@@ -0,0 +1,66 @@
+"""Hand control back to the client while the intake waits for the user.
+
+``CollectorLoop`` asks one question per user message.  ADK's ``LoopAgent``
+does not know that: within a single ``/run`` call it invoked ``CollectorLLM``
+again right after the question, without any new user input, and the model
+answered with "continue processing" / "no more outputs" filler.  Every one of
+those calls cost a Gemini round trip, and test clients had to filter them out.
+
+The gate has two halves:
+
+* ``BudgetedLoopAgent(await_user_after_reply=True)`` stops its loop once the
+  model has replied in text without calling a tool, sets
+  ``ctx.end_invocation`` and records the current invocation id under
+  :data:`AWAITING_USER_KEY` (temporary state, never persisted);
+* :class:`TurnGatedPipeline` is a ``SequentialAgent`` whose sub-agents get
+  :func:`skip_while_awaiting_user` as their first ``before_agent_callback``.
+  Once that key names the current invocation, every remaining sub-agent ends
+  before it runs.  ``end_invocation`` is set on the loop's own copy of the
+  invocation context, so the pipeline cannot see it there.
+
+The next user message starts a new invocation, and the pipeline runs the
+collector again, which asks its next question (or calls ``exit_loop`` and lets
+the parser run).
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from google.adk.agents import BaseAgent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+
+# Temporary state key holding the id of the invocation that awaits the user.
+AWAITING_USER_KEY = "temp:awaiting_user"
+
+
+def awaiting_user(ctx: InvocationContext) -> bool:
+    """Return whether a sub-agent handed the current invocation back to the user."""
+    return ctx.session.state.get(AWAITING_USER_KEY) == ctx.invocation_id
+
+
+def skip_while_awaiting_user(callback_context: CallbackContext) -> None:
+    """``before_agent_callback`` that ends the agent before it runs while the user is due."""
+    ctx = callback_context._invocation_context
+    if awaiting_user(ctx):
+        # Ends this agent's run without an event; the pipeline moves on to the
+        # next sub-agent, which is skipped the same way.
+        ctx.end_invocation = True
+
+
+def _gate(agent: BaseAgent) -> None:
+    callbacks: list[Any] = agent.before_agent_callback or []
+    if not isinstance(callbacks, list):
+        callbacks = [callbacks]
+    if skip_while_awaiting_user not in callbacks:
+        agent.before_agent_callback = [skip_while_awaiting_user, *callbacks]
+
+
+class TurnGatedPipeline(SequentialAgent):
+    """SequentialAgent that skips its remaining sub-agents once one awaits the user."""
+
+    def model_post_init(self, context: Any, /) -> None:
+        super().model_post_init(context)
+        for sub_agent in self.sub_agents:
+            _gate(sub_agent)
@@ -0,0 +1,146 @@
+"""Abuse filter used as *before_model_callback*.
+
+Every user message is scored locally by
+:class:`app.services.safety.toxicity.LexiconScorer` - no network call, a few
+microseconds for a typical message.  The parts of the message are scored as one
+batch and messages longer than ``_OFFLOAD_CHARS`` are scored in a worker thread
+(``asyncio.to_thread``) so a pasted wall of text never stalls the event loop.
+
+* score >= ``Settings.content_filter_threshold`` - the message is flagged;
+* score in the gray zone (at least ``gray_zone_floor`` but under the
+  threshold) and ``Settings.enable_perspective_api`` - a Perspective-compatible
+  endpoint gets the final word, flagging the message when its ``TOXICITY``
+  probability reaches ``Settings.toxicity_threshold``.  If the remote scorer
+  fails, the local verdict stands;
+* anything else passes untouched, which is the common path.
+
+Verdicts are memoised per session in
+:data:`app.services.cache.verdicts.verdict_cache`.  A flagged message is
+recorded under ``callback_context.state["content_flagged"]`` and answered with
+a short canned response instead of a model call.  Unlike ``SafetyGuard`` we do
+not escalate: the user can rephrase and the intake simply continues.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, ClassVar, NamedTuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from app.services.cache.verdicts import VerdictCache, verdict_cache, verdict_scope
+from app.services.safety.perspective import PerspectiveClient, PerspectiveError
+from app.services.safety.toxicity import LexiconScorer, scorer
+
+logger = logging.getLogger(__name__)
+
+
+class ContentVerdict(NamedTuple):
+    flagged: bool
+    score: float
+    source: str  # "local" or "perspective"
+    categories: tuple[str, ...]
+
+
+class ContentFilter:
+    # Messages longer than this are scored off the event loop.
+    _OFFLOAD_CHARS: ClassVar[int] = 2000
+
+    def __init__(
+        self,
+        *,
+        threshold: float = 2.8,
+        toxicity_threshold: float = 0.7,
+        gray_zone_floor: float = 1.0,
+        remote: PerspectiveClient | None = None,
+        lexicon_scorer: LexiconScorer = scorer,
+        cache: VerdictCache = verdict_cache,
+    ) -> None:
+        self.threshold = threshold
+        self.toxicity_threshold = toxicity_threshold
+        self.gray_zone_floor = gray_zone_floor
+        self.remote = remote
+        self.scorer = lexicon_scorer
+        self.cache = cache
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> ContentFilter:
+        """Build the filter from ``app.config.base.Settings``."""
+        remote = None
+        if settings.enable_perspective_api and settings.perspective_api_key:
+            remote = PerspectiveClient(
+                settings.perspective_api_key,
+                url=settings.perspective_api_url,
+                timeout=settings.perspective_timeout,
+            )
+        return cls(
+            threshold=settings.content_filter_threshold,
+            toxicity_threshold=settings.toxicity_threshold,
+            remote=remote,
+        )
+
+    async def __call__(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> LlmResponse | None:  # type: ignore[override]
+        # 1. Extract user text for scoring.
+        user_content = callback_context.user_content
+        if not user_content or not user_content.parts:
+            return None  # Nothing to check.
+
+        segments = [part.text for part in user_content.parts if getattr(part, "text", None)]
+        if not segments:
+            return None
+
+        # 2. Score - once per message and session.
+        verdict = await self.cache.aget_or_compute(
+            verdict_scope(callback_context),
+            "content",
+            "\n".join(segments),
+            lambda _text: self._verdict(segments, callback_context.state.get("lang")),
+        )
+        if not verdict.flagged:
+            return None  # Common path - let the model run.
+
+        # 3. Record and short-circuit - no escalation, the user may rephrase.
+        callback_context.state["content_flagged"] = {
+            "score": verdict.score,
+            "source": verdict.source,
+            "categories": list(verdict.categories),
+        }
+        response_text = (
+            "I want to keep this conversation safe and respectful for both of us. "
+            "Could you rephrase your last message?"
+        )
+        return LlmResponse(content=types.Content(parts=[types.Part(text=response_text)]))
+
+    # ---------------------------------------------------------------------
+    # Internal helpers
+    # ---------------------------------------------------------------------
+    async def _verdict(self, segments: list[str], lang: str | None) -> ContentVerdict:
+        if sum(map(len, segments)) > self._OFFLOAD_CHARS:
+            scores = await asyncio.to_thread(self.scorer.score_batch, segments)
+        else:
+            scores = self.scorer.score_batch(segments)
+
+        score = sum(item.score for item in scores)
+        categories = tuple(sorted({cat for item in scores for cat in item.categories}))
+        if score >= self.threshold:
+            return ContentVerdict(True, score, "local", categories)
+        if self.remote is None or score < self.gray_zone_floor:
+            return ContentVerdict(False, score, "local", categories)
+
+        # Gray zone - ask the remote scorer, off the event loop.
+        try:
+            toxicity = await asyncio.to_thread(
+                self.remote.score, "\n".join(segments), [lang] if lang else []
+            )
+        except PerspectiveError as exc:
+            logger.warning("Falling back to the local content score: %s", exc)
+            return ContentVerdict(False, score, "local", categories)
+        return ContentVerdict(
+            toxicity >= self.toxicity_threshold, toxicity, "perspective", categories
+        )
@@ -0,0 +1,100 @@
+"""After-model callback that ends the intake once every field is covered.
+
+Left alone, the collector ends the intake only when the model decides to call
+``exit_loop``, and it often keeps asking redundant questions until the loop's
+``max_iterations``.  This callback checks the draft record filled by
+:class:`app.callbacks.intake_tracker.IntakeTracker` after every collector turn
+instead: as soon as situation, thoughts, feelings, behaviors and outcome are
+all covered it performs the same hand-off as the tool
+(:func:`app.tools.exit_loop.finish_intake` - mark the transcript complete and
+escalate on the model response event) and replaces the collector's next,
+now redundant, question with a closing message in the session's language
+(``state["lang"]``, English when unknown).  The transcript entry the
+accumulator recorded for the replaced question is rewritten too, so the parser
+sees the message the user actually got.
+
+It must run after the accumulator and the tracker, and last in the list:
+returning a response skips the callbacks after it.  Each intake is handed over
+once; the tracker opens a fresh draft for the next one.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.genai.types import Content, Part
+
+from app.services.parsing.slots import INTAKE_SLOTS_KEY, handed_over
+from app.services.transcript.store import Transcript
+from app.tools.exit_loop import finish_intake
+
+# One per language we serve (see app.services.language.detector).
+CLOSING_MESSAGES = {
+    "en": (
+        "Thank you for walking me through this. I have everything I need and will "
+        "put together your reflection now."
+    ),
+    "es": (
+        "Gracias por contármelo con detalle. Ya tengo todo lo que necesito y ahora "
+        "prepararé tu reflexión."
+    ),
+    "fr": (
+        "Merci de m'avoir raconté tout cela. J'ai tout ce qu'il me faut et je prépare "
+        "maintenant ta réflexion."
+    ),
+    "de": (
+        "Danke, dass du mir das so genau erzählt hast. Ich habe alles, was ich brauche, "
+        "und stelle jetzt deine Reflexion zusammen."
+    ),
+    "it": (
+        "Grazie per avermi raccontato tutto questo. Ho tutto ciò che mi serve e ora "
+        "preparo la tua riflessione."
+    ),
+    "pt": (
+        "Obrigado por compartilhar isso comigo. Já tenho tudo o que preciso e vou "
+        "preparar sua reflexão agora."
+    ),
+    "ca": (
+        "Gràcies per explicar-m'ho amb detall. Ja tinc tot el que necessito i ara "
+        "prepararé la teva reflexió."
+    ),
+}
+CLOSING_MESSAGE = CLOSING_MESSAGES["en"]
+
+
+class IntakeReadiness:
+    def __init__(self, closing_messages: Mapping[str, str] = CLOSING_MESSAGES) -> None:
+        self.closing_messages = closing_messages
+
+    def closing_message(self, lang: str | None) -> str:
+        """Return the closing message in *lang*, falling back to English."""
+        return self.closing_messages.get(lang or "en") or self.closing_messages["en"]
+
+    def __call__(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_response: LlmResponse,
+    ) -> LlmResponse | None:  # type: ignore[override]
+        if llm_response.partial or callback_context.actions.escalate:
+            return None
+        state = callback_context.state
+        if handed_over(state) or not (state.get(INTAKE_SLOTS_KEY) or {}).get("complete"):
+            return None
+        parts = llm_response.content.parts if llm_response.content else None
+        if any(part.function_call for part in parts or ()):
+            # The model is calling a tool (e.g. exit_loop) itself.
+            return None
+
+        closing = self.closing_message(state.get("lang"))
+        # The accumulator already recorded the question we are about to replace.
+        Transcript(state).replace_last("assistant", closing)
+        intake_len = finish_intake(state, callback_context.actions)
+        print(
+            f"[IntakeReadiness] All intake fields covered, intake complete ({intake_len} entries)"
+        )
+        return llm_response.model_copy(
+            update={"content": Content(role="model", parts=[Part(text=closing)])}
+        )
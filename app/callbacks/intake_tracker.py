@@ -0,0 +1,85 @@
+"""After-model callback that fills the intake record while the user is talking.
+
+After every collector turn the user's answer is placed in the slot of the
+previous collector question, and the new question sets the slot of the next
+answer (see :mod:`app.services.parsing.slots`).  Once every field is filled
+the validated record is also stored in ``state["parsed"]``, so when the
+collector calls ``exit_loop`` the parsed intake already exists and
+``JsonParserAgent`` does not need a model call of its own.
+
+With ``redact_pii=True`` the answer is masked like the transcript (see
+:func:`app.callbacks.safety_filters.redact_pii`).
+
+An invocation's answer is recorded once, however often the collector's model
+is called within it (e.g. again after a tool call).
+
+Once an intake has been handed to the parser (``exit_loop`` or
+:class:`app.callbacks.intake_readiness.IntakeReadiness`), the next user turn
+the collector answers starts a new draft, so a second intake in the same
+session is tracked, and can end, on its own.
+
+We do **not** modify the model response, therefore we always return ``None``.
+"""
+
+from __future__ import annotations
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+
+from app.callbacks.safety_filters import redact_pii
+from app.services.parsing.slots import (
+    INTAKE_SLOTS_KEY,
+    empty_draft,
+    fill,
+    handed_over,
+    is_complete,
+    question_slot,
+    tracked_record,
+)
+from app.services.transcript.store import INTAKE_LEN_KEY
+
+
+class IntakeTracker:
+    def __init__(self, *, redact_pii: bool = False) -> None:
+        self.redact_pii = redact_pii
+
+    def __call__(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_response: LlmResponse,
+    ) -> LlmResponse | None:  # type: ignore[override]
+        if llm_response.partial:
+            return None
+
+        state = callback_context.state
+        stored = state.get(INTAKE_SLOTS_KEY)
+        draft = {**stored, "record": dict(stored["record"])} if stored else empty_draft()
+        turn_id = str(callback_context.invocation_id)
+        if draft["turn"] != turn_id and handed_over(state):
+            # The previous intake went to the parser; this turn opens a new one.
+            draft = empty_draft(since=state[INTAKE_LEN_KEY])
+
+        # --------------------------- user answer ---------------------------- #
+        user_content = callback_context.user_content
+        if draft["turn"] != turn_id and user_content and user_content.parts:
+            answer = "".join(part.text or "" for part in user_content.parts).strip()
+            if answer and self.redact_pii:
+                answer = redact_pii(callback_context, answer)
+            if answer:
+                fill(draft, draft["pending"], answer)
+            draft["turn"] = turn_id
+
+        # ------------------------ collector question ------------------------ #
+        if llm_response.content and llm_response.content.parts:
+            question = "".join(part.text or "" for part in llm_response.content.parts).strip()
+            if question:
+                draft["pending"] = question_slot(question)
+
+        draft["complete"] = is_complete(draft["record"])
+        # Reassign so the change lands in the state delta.
+        state[INTAKE_SLOTS_KEY] = draft
+        record = tracked_record(state) if draft["complete"] else None
+        if record is not None:
+            state["parsed"] = record
+        return None
@@ -2,10 +2,19 @@
 
 The callback inspects the incoming user message (present in the `CallbackContext`)
 and sets a lightweight language flag in the session state (``ctx.state["lang"]``)
-so that downstream agents/prompts can localise their responses.  The detection
-itself purposefully stays **naïve** - we only differentiate between Spanish and
-English because those are the two languages the therapeutic POC currently
-supports.
+so that downstream agents/prompts can localise their responses.  Detection is
+done offline by the precompiled n-gram detector in
+:mod:`app.services.language.detector`, which covers the languages we serve
+(es/en/fr/de/it/pt/ca).
+
+Rather than locking the language in on the first message, the callback keeps a
+small running model per session: the posterior of each new user message,
+weighted by how much text it contains, is folded into exponentially decayed
+per-language scores (``ctx.state["lang_scores"]``).  Earlier messages are never
+re-scanned, so the per-turn cost does not depend on the conversation length.
+The language switches once another language leads the running scores by a
+clear margin, and ``ctx.state["lang_confidence"]`` holds the leader's share of
+the total evidence.
 
 Signature accepted by ADK for *before_model_callback*:
 
@@ -22,28 +31,43 @@ from typing import ClassVar
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
 
+from app.services.cache.verdicts import VerdictCache, verdict_cache, verdict_scope
+from app.services.language.detector import detector
+from app.services.transcript.store import content_digest
+
 
 class LangCallback:
-    _ES_CHARS: ClassVar[set[str]] = set("áéíóúÁÉÍÓÚñÑ¿¡")
+    # Weight kept by the running scores from one user message to the next.
+    _DECAY: ClassVar[float] = 0.7
+    # Messages with at least this many words count as full evidence.
+    _FULL_EVIDENCE_WORDS: ClassVar[int] = 8
+    # Lead another language needs over the current one before we switch.
+    _SWITCH_MARGIN: ClassVar[float] = 0.3
+    # Evidence assumed for a language detected before running scores existed.
+    _LEGACY_PRIOR: ClassVar[float] = 1.0
+
+    def __init__(self, cache: VerdictCache = verdict_cache) -> None:
+        self.cache = cache
 
     def __call__(
         self, *, callback_context: CallbackContext, llm_request: LlmRequest
     ) -> None:  # type: ignore[override]
-        """Detect language of the **user message** and store it in state.
+        """Fold the language of the **user message** into the session's running scores.
 
         We examine the *latest* user message only - available on
-        ``callback_context.user_content``.  If the language was already
-        detected in a previous turn (``state['lang']``), we exit early.
+        ``callback_context.user_content``.  ``LoopAgent`` re-runs the model
+        against the same message, so each message is folded in once per
+        invocation (tracked under ``state['lang_turn']``), and the detector
+        verdict for a given text is memoised per session in ``self.cache``.
         """
-
-        # Exit early if language is already detected for this session.
-        if "lang" in callback_context.state:
-            return
+        state = callback_context.state
 
         user_content = callback_context.user_content
         if not user_content or not user_content.parts:
             # Nothing to analyse - default to English.
-            callback_context.state["lang"] = "en"
+            if "lang" not in state:
+                state["lang"] = "en"
+                state["lang_confidence"] = 0.0
             return
 
         text_segments: list[str] = []
@@ -53,8 +77,20 @@ class LangCallback:
 
         joined = " ".join(text_segments)
 
-        detected = self._detect_lang(joined)
-        callback_context.state["lang"] = detected or "en"
+        turn = f"{callback_context.invocation_id}:{content_digest('user', joined)}"
+        if state.get("lang_turn") == turn:
+            return
+
+        probabilities, n_words = self.cache.get_or_compute(
+            verdict_scope(callback_context), "lang", joined, detector.probabilities
+        )
+        running = self._fold(state.get("lang_scores"), state.get("lang"), probabilities, n_words)
+        lang, confidence = self._choose(running, state.get("lang"))
+
+        state["lang_turn"] = turn
+        state["lang_scores"] = running
+        state["lang"] = lang
+        state["lang_confidence"] = confidence
 
         # We don't need to modify the request or return custom LLM output.
         return
@@ -63,15 +99,34 @@ class LangCallback:
     # Internal helpers
     # ---------------------------------------------------------------------
     @classmethod
-    def _detect_lang(cls, text: str) -> str | None:
-        """Very lightweight language heuristic (Spanish vs. English).
-
-        Returns ``'es'`` if we find *any* Spanish-specific character, otherwise
-        returns ``'en'``.  The heuristic is **good enough** for the current POC
-        and has no external dependencies.
-        """
+    def _fold(
+        cls,
+        running: dict[str, float] | None,
+        current: str | None,
+        probabilities: list[float],
+        n_words: int,
+    ) -> dict[str, float]:
+        """Return the running scores after decaying them and adding one message's evidence."""
+        if running is None:
+            # Sessions that detected a language before running scores existed
+            # start from that language instead of from scratch.
+            running = {current: cls._LEGACY_PRIOR} if current else {}
+
+        weight = min(1.0, n_words / cls._FULL_EVIDENCE_WORDS)
+        return {
+            lang: round(cls._DECAY * running.get(lang, 0.0) + weight * probability, 6)
+            for lang, probability in zip(detector.languages, probabilities, strict=True)
+        }
 
-        for ch in text:
-            if ch in cls._ES_CHARS:
-                return "es"
-        return "en"
+    @classmethod
+    def _choose(cls, running: dict[str, float], current: str | None) -> tuple[str, float]:
+        """Pick the session language from the running scores, with hysteresis."""
+        total = sum(running.values())
+        if not total:
+            lang = current or "en"
+            return lang, 0.0
+
+        best = max(running, key=running.__getitem__)
+        if current in running and running[best] - running[current] < cls._SWITCH_MARGIN:
+            best = current
+        return best, round(running[best] / total, 4)
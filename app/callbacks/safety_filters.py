@@ -1,47 +1,89 @@
-"""Simple PII-oriented safety filter used as *before_model_callback*.
+"""PII-oriented safety filter used as *before_model_callback*.
 
 If the user message contains obvious Personally Identifiable Information (PII)
 such as a Social Security Number, the callback flags the event and *escalates*
 so that the supervising agent (or human) can decide how to proceed.
 
-Current logic - intentionally minimal for the POC:
-    • Detect the literal token ``ssn`` (case-insensitive)
-    • Detect bare US SSN numbers in the form ``123-45-6789`` or ``123456789``
+Detection is delegated to the single-pass scanner in
+:mod:`app.services.safety.pii`, which covers e-mails, phone numbers, IBANs,
+credit cards (Luhn), Spanish DNI/NIE, US SSNs and the literal token ``ssn``.
 
 When a match is found we:
     1. Set ``callback_context.actions.escalate = True`` so ADK knows the
        message requires manual intervention.
-    2. Replace the model request with a short canned response informing the
+    2. Record the matched categories (never the values) under
+       ``callback_context.state["pii_detected"]`` for the reviewing clinician.
+    3. Replace the model request with a short canned response informing the
        user that we cannot process that information.
 
+With ``SafetyGuard(mode="redact")`` (``Settings.pii_mode``) the turn is not
+blocked: the matched spans are masked (``[EMAIL]``, ``[IBAN]``...) inside
+``llm_request.contents`` in one linear pass, only the parts that actually
+contain PII are copied, the categories are recorded under
+``callback_context.state["pii_redacted"]`` and the model call goes ahead.
+
+Redacting the model request is not enough: the transcript and the intake
+record are written by other callbacks from the raw user message, and the
+parser and analyst prompts are built from them.  In redact mode those
+callbacks (``TranscriptAccumulator``, ``IntakeTracker``) mask the text with
+:func:`redact_pii` before storing it, so no later prompt, ``parsed`` record or
+report sees the raw values.
+
+Scan results are memoised per session in
+:data:`app.services.cache.verdicts.verdict_cache`, so a message is scanned once
+however many loop iterations and agents see it.
+
 The canned response is returned as an ``LlmResponse`` object, which short-
 circuits the model call (that's the contract of *before_model_callback*).
 """
 
 from __future__ import annotations
 
-import re
-
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
 from google.adk.models.llm_response import LlmResponse
 from google.genai import types
 
-# ---------------------------------------------------------------------------
-# Pre-compiled regexes
-# ---------------------------------------------------------------------------
+from app.services.cache.verdicts import VerdictCache, verdict_cache, verdict_scope
+from app.services.safety.pii import REDACTABLE, PiiMatch, PiiScanner, redact, scanner
+
+PII_MODES = ("block", "redact")
 
-_SSN_REGEXES: list[re.Pattern[str]] = [
-    re.compile(r"\bssn\b", re.IGNORECASE),  # literal token
-    re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # 123-45-6789
-    re.compile(r"\b\d{9}\b"),  # 123456789
-]
+
+def redact_pii(
+    callback_context: CallbackContext,
+    text: str,
+    pii_scanner: PiiScanner = scanner,
+    cache: VerdictCache = verdict_cache,
+) -> str:
+    """Return *text* with its PII masked, sharing the scan with ``SafetyGuard``."""
+    matches = cache.get_or_compute(
+        verdict_scope(callback_context), "pii", text, lambda t: tuple(pii_scanner.scan(t))
+    )
+    return redact(text, matches)
 
 
 class SafetyGuard:
+    def __init__(
+        self,
+        pii_scanner: PiiScanner = scanner,
+        cache: VerdictCache = verdict_cache,
+        *,
+        mode: str = "block",
+    ) -> None:
+        if mode not in PII_MODES:
+            raise ValueError(f"Unknown PII mode {mode!r}, expected one of {PII_MODES}")
+        self.scanner = pii_scanner
+        self.cache = cache
+        self.mode = mode
+
     def __call__(
         self, *, callback_context: CallbackContext, llm_request: LlmRequest
     ) -> LlmResponse | None:  # type: ignore[override]
+        if self.mode == "redact":
+            self._redact_request(callback_context, llm_request)
+            return None  # Masked in place - let the model run.
+
         # 1. Extract user text for scanning.
         user_content = callback_context.user_content
         if not user_content or not user_content.parts:
@@ -53,12 +95,17 @@ class SafetyGuard:
                 text_segments.append(part.text)
         combined_text = " ".join(text_segments)
 
-        # 2. Search for PII.
-        if not any(regex.search(combined_text) for regex in _SSN_REGEXES):
+        # 2. Search for PII - once per message and session, the verdict is
+        #    reused by later loop iterations and by the other agents.
+        matches = self.cache.get_or_compute(
+            verdict_scope(callback_context), "pii", combined_text, self._scan
+        )
+        if not matches:
             return None  # Looks safe - let the model run.
 
         # 3. Flag and short-circuit - escalate.
         callback_context._event_actions.escalate = True  # pylint: disable=protected-access
+        callback_context.state["pii_detected"] = sorted({match.category for match in matches})
 
         response_text = (
             "I'm sorry, but I cannot help with that. A clinician will review "
@@ -68,3 +115,32 @@ class SafetyGuard:
         # Returning LlmResponse causes ADK to skip the model call and use this
         # response instead.
         return LlmResponse(content=types.Content(parts=[types.Part(text=response_text)]))
+
+    # ---------------------------------------------------------------------
+    # Internal helpers
+    # ---------------------------------------------------------------------
+    def _scan(self, text: str) -> tuple[PiiMatch, ...]:
+        return tuple(self.scanner.scan(text))
+
+    def _redact_request(self, callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+        """Mask PII in every text part of the request, copying only the parts that change."""
+        scope = verdict_scope(callback_context)
+        categories: set[str] = set()
+
+        for content in llm_request.contents or ():
+            parts = content.parts
+            if not parts:
+                continue
+            for index, part in enumerate(parts):
+                text = part.text
+                if not text:
+                    continue
+                matches = self.cache.get_or_compute(scope, "pii", text, self._scan)
+                redacted = redact(text, matches)
+                if redacted is text:
+                    continue
+                parts[index] = part.model_copy(update={"text": redacted})
+                categories.update(match.category for match in matches)
+
+        if categories:
+            callback_context.state["pii_redacted"] = sorted(categories & REDACTABLE)
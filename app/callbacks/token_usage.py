@@ -0,0 +1,47 @@
+"""After-model callback that records the tokens each agent actually spends.
+
+``app.services.prompts.compact`` estimates the size of the session data it puts
+in a prompt (``state["prompt_tokens"]``); this callback records what the model
+reports in ``LlmResponse.usage_metadata``, summed per agent over every call of
+the session::
+
+    state["token_usage"] = {
+        "AnalystLLMCore": {"calls": 3, "prompt": 4120, "output": 910},
+        ...
+    }
+
+so the savings of the compact prompts show up per stage.  Streamed chunks carry
+no usage, so only complete responses are counted.
+
+We do **not** modify the model response, therefore we always return ``None``.
+"""
+
+from __future__ import annotations
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+
+TOKEN_USAGE_KEY = "token_usage"
+
+
+class TokenUsageRecorder:
+    def __call__(
+        self,
+        *,
+        callback_context: CallbackContext,
+        llm_response: LlmResponse,
+    ) -> LlmResponse | None:  # type: ignore[override]
+        usage = llm_response.usage_metadata
+        if llm_response.partial or usage is None:
+            return None
+
+        totals = dict(callback_context.state.get(TOKEN_USAGE_KEY) or {})
+        current = totals.get(callback_context.agent_name) or {"calls": 0, "prompt": 0, "output": 0}
+        totals[callback_context.agent_name] = {
+            "calls": current["calls"] + 1,
+            "prompt": current["prompt"] + (usage.prompt_token_count or 0),
+            "output": current["output"] + (usage.candidates_token_count or 0),
+        }
+        # Reassign so the change lands in the state delta.
+        callback_context.state[TOKEN_USAGE_KEY] = totals
+        return None
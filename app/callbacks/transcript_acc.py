@@ -4,26 +4,49 @@ The callback appends **two** entries per turn:
     1. The user message (role == ``"user"``)
     2. The assistant/model reply (role == ``"assistant"``)
 
-The entire transcript lives under ``state["conv_raw"]`` as a simple list so it
-can be easily serialised or displayed later on.
+Two storage layouts are supported:
+
+* **legacy** (default) - the entire transcript lives under ``state["conv_raw"]``
+  as a simple list so it can be easily serialised or displayed later on.
+* **append-only** (``TranscriptAccumulator(append_only=True)``) - every entry is
+  written under its own key (``conv_raw.0``, ``conv_raw.1``, ...) and only the
+  entry count is rewritten (``state["conv_len"]``).  The state delta of a turn
+  therefore contains the new entries only, so the cost of persisting it with
+  ``DatabaseSessionService`` stays flat however long the conversation gets.
+  Appends are idempotent per invocation: when ``LoopAgent`` re-runs the agent
+  against the same user message, that message (or an identical reply) is not
+  recorded again.
+
+With ``redact_pii=True`` (``Settings.pii_mode == "redact"``) PII is masked
+before an entry is stored, as ``SafetyGuard`` masks it in the model request.
+
+Neither layout stores the joined ``"role: text"`` text; consumers render it
+lazily through :class:`app.services.transcript.store.Transcript`.
 """
 
 from __future__ import annotations
 
+from typing import Any
+
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_response import LlmResponse
 
+from app.callbacks.safety_filters import redact_pii
+from app.services.transcript.store import CONV_RAW_KEY, Transcript
+
 
 class TranscriptAccumulator:
+    def __init__(self, *, append_only: bool = False, redact_pii: bool = False) -> None:
+        self.append_only = append_only
+        self.redact_pii = redact_pii
+
     def __call__(
         self,
         *,
         callback_context: CallbackContext,
         llm_response: LlmResponse,
     ) -> LlmResponse | None:  # type: ignore[override]
-        state = callback_context.state
-
-        transcript: list[dict[str, str]] = state.get("conv_raw", [])  # type: ignore[assignment]
+        new_entries: list[tuple[str, str]] = []
 
         # --------------------------- user message --------------------------- #
         user_content = callback_context.user_content
@@ -32,7 +55,7 @@ class TranscriptAccumulator:
                 part.text or "" for part in user_content.parts if hasattr(part, "text")
             ).strip()
             if user_text:
-                transcript.append({"role": "user", "text": user_text})
+                new_entries.append(("user", user_text))
 
         # ------------------------ assistant message ------------------------ #
         if llm_response and llm_response.content and llm_response.content.parts:
@@ -40,15 +63,31 @@ class TranscriptAccumulator:
                 part.text or "" for part in llm_response.content.parts if hasattr(part, "text")
             ).strip()
             if assistant_text:
-                transcript.append({"role": "assistant", "text": assistant_text})
+                new_entries.append(("assistant", assistant_text))
 
-        # Persist back to state - the object returned by ``state[...]`` is delta-aware
-        # so direct mutation registers a state_delta in the event.
-        state["conv_raw"] = transcript
+        if self.redact_pii:
+            new_entries = [(role, redact_pii(callback_context, text)) for role, text in new_entries]
 
-        # Also save a simple text transcript for easier processing
-        transcript_text = "\n".join(f"{entry['role']}: {entry['text']}" for entry in transcript)
-        state["transcript"] = transcript_text
+        if self.append_only:
+            transcript = Transcript(callback_context.state)
+            turn_id = str(callback_context.invocation_id)
+            for role, text in new_entries:
+                transcript.append_once(role, text, turn_id)
+        else:
+            self._rewrite(callback_context.state, new_entries)
 
         # We do **not** modify the model response, therefore return ``None``.
         return None
+
+    # ---------------------------------------------------------------------
+    # Internal helpers
+    # ---------------------------------------------------------------------
+    @staticmethod
+    def _rewrite(state: Any, new_entries: list[tuple[str, str]]) -> None:
+        """Legacy layout: read the whole list, extend it and write it back."""
+        transcript: list[dict[str, str]] = state.get(CONV_RAW_KEY, [])
+        transcript.extend({"role": role, "text": text} for role, text in new_entries)
+
+        # Persist back to state - the object returned by ``state[...]`` is delta-aware
+        # so direct mutation registers a state_delta in the event.
+        state[CONV_RAW_KEY] = transcript
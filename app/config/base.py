@@ -3,6 +3,7 @@
 import base64
 import logging
 import sys
+from typing import Literal
 
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
@@ -51,6 +52,65 @@ class Settings(BaseSettings):
     parser_agent_instruction_key: str = "intake-parser-agent-adk-instructions"
     synthesis_agent_instruction_key: str = "synthesis-agent-adk-instructions"
 
+    # Intake Parser
+    # Constrain the parser LLM to the IntakeRecord response schema.
+    parser_structured_output: bool = True
+    # Extra parser calls allowed when a response does not validate.
+    parser_max_repairs: int = Field(default=1, ge=0)
+    # Use the record filled in during the intake (app.callbacks.intake_tracker)
+    # instead of a parser call once every field is filled.  Opt-in: it saves the
+    # parser call, but the rule-based draft can misplace an answer the parser
+    # LLM would not, so deployments enable it once they accept that trade.
+    parser_use_tracked_record: bool = False
+    # End the intake as soon as every field is covered instead of waiting for
+    # the collector to call exit_loop (app.callbacks.intake_readiness).  The
+    # parser LLM still reads the whole transcript, unless
+    # parser_use_tracked_record is set.
+    intake_auto_exit: bool = True
+    # Where validated parses are cached: "memory", "sqlite", "postgres" (the
+    # Supabase session database) or "none".  The sqlite file holds intake
+    # records, so it lives in the private .adk/ directory like the blob store.
+    parse_cache_backend: Literal["memory", "sqlite", "postgres", "none"] = "memory"
+    parse_cache_path: str = ".adk/parse_cache.sqlite3"
+    parse_cache_ttl: float = 7 * 24 * 3600  # seconds
+    parse_cache_max_entries: int = 1024
+
+    # Loop Budgets - per user turn for the collector, per session for the
+    # analysis; see app.agents.budgeted_loop
+    collector_loop_max_seconds: float = 120.0
+    collector_loop_max_tokens: int = 30_000
+    analysis_loop_max_seconds: float = 180.0
+    analysis_loop_max_tokens: int = 60_000
+    loop_max_stalls: int = 2
+
+    # Prompt Budgets - estimated tokens of session data embedded in each prompt
+    parser_token_budget: int = 6000  # intake transcript
+    analysis_token_budget: int = 1500  # parsed intake record
+
+    # PDF Rendering - see app.services.rendering.pool
+    pdf_render_pool: Literal["process", "thread"] = "process"
+    pdf_render_workers: int = Field(default=2, ge=1)
+    pdf_render_max_pending: int = Field(default=8, ge=1)  # queued + running renders
+    pdf_render_timeout: float = 30.0  # seconds
+    # Total size of the rendered PDFs kept by app.services.cache.renders.
+    render_cache_max_bytes: int = 64 * 1024 * 1024
+    # "html" or "markdown": save the report as text and render report.pdf only
+    # when it is loaded (app.services.rendering.lazy).
+    report_format: Literal["pdf", "html", "markdown"] = "pdf"
+    # Lay out the report's intake section as soon as the parser stores the
+    # record (app.services.rendering.staged); at most this many per process.
+    # Opt-in, and only takes effect with pdf_render_pool = "thread": a staged
+    # document stays in-process.
+    pdf_staged_render: bool = False
+    report_stage_max_sessions: int = Field(default=256, ge=1)
+
+    # PDF Blob Store - used when no artifact service is configured; see
+    # app.services.persistence.blobs.  "postgres" stores large objects in the
+    # Supabase session database; the directory sits next to ADK's local
+    # session and artifact stores.
+    blob_store_backend: Literal["filesystem", "postgres"] = "filesystem"
+    blob_store_path: str = ".adk/blobs"
+
     # GCS Artifact Storage Configuration (OPTIONAL)
     gcs_bucket_name: str = Field(default="re-frame", alias="GCS_BUCKET_NAME")
     gcs_project_id: str = Field(default="", alias="GOOGLE_API_KEY")
@@ -70,6 +130,11 @@ class Settings(BaseSettings):
     perspective_api_key: str | None = Field(default=None, alias="PERSPECTIVE_API_KEY")
     toxicity_threshold: float = 0.7
     enable_perspective_api: bool = False
+    perspective_api_url: str = "https://commentanalyzer.googleapis.com/v1alpha1/comments:analyze"
+    perspective_timeout: float = 2.0
+    # "block" escalates and answers with a canned message; "redact" masks the
+    # PII spans in the model request and lets the turn continue.
+    pii_mode: Literal["block", "redact"] = "block"
 
     # Supabase Configuration (OPTIONAL)
     supabase_connection_string: str | None = Field(
@@ -0,0 +1,299 @@
+"""Content-addressed cache of intake parses.
+
+``JsonParserAgent`` turns the intake transcript into an
+:class:`app.services.parsing.intake.IntakeRecord` with an LLM call.  The result
+only depends on the transcript and on the parser prompt, so retries, replays of
+the same session and re-runs after an analysis failure can reuse it.
+
+Entries are keyed by the blake2b hash of
+
+* the *normalised* transcript - Unicode NFC, whitespace runs collapsed, blank
+  lines dropped - so cosmetic differences still hit;
+* the parser prompt version (see ``app.agents.parser.parser_prompt_version``),
+  so editing the prompt or the schema never serves a stale parse.
+
+Values are the JSON of the validated record.  Three interchangeable backends
+implement the small :class:`ParseCacheBackend` protocol:
+
+* :class:`MemoryBackend` - a per-process LRU, the default;
+* :class:`SqliteBackend` - one file on disk, shared by the workers of a host;
+* :class:`PostgresBackend` - a ``parse_cache`` table next to the session store.
+
+Each one expires entries after ``ttl`` seconds and evicts the least recently
+used ones beyond ``max_entries``.  :class:`ParseCache` counts hits and misses
+(:meth:`ParseCache.stats`) to check the hit rate under real traffic.
+
+The cache is an optimisation only: a backend error is logged and read as a
+miss, and a failed write is dropped, so a database outage never fails a
+parse.  The sqlite and postgres backends block, so ``JsonParserAgent`` calls
+the cache on a worker thread.  The sqlite file holds parsed intake records
+and defaults to ``.adk/`` in the working directory, next to the blob store.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import json
+import logging
+from pathlib import Path
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Protocol
+import unicodedata
+
+from app.config.base import Settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"[^\S\n]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def normalise_transcript(transcript: str) -> str:
+    """Return *transcript* with cosmetic whitespace and Unicode differences removed."""
+    text = unicodedata.normalize("NFC", transcript)
+    text = _WHITESPACE.sub(" ", text)
+    text = _BLANK_LINES.sub("\n", text)
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
+
+
+class ParseCacheBackend(Protocol):
+    """Storage for ``key -> JSON`` entries with TTL and size eviction."""
+
+    def get(self, key: bytes) -> str | None: ...
+
+    def set(self, key: bytes, value: str) -> None: ...
+
+    def __len__(self) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """Per-process LRU with a TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 7 * 24 * 3600) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: bytes, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SqliteBackend:
+    """Single-file cache shared by every process on the host."""
+
+    def __init__(self, path: str, max_entries: int = 1024, ttl: float = 7 * 24 * 3600) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parse_cache ("
+            " key BLOB PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS parse_cache_used_at ON parse_cache (used_at)"
+        )
+
+    def get(self, key: bytes) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM parse_cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE parse_cache SET used_at = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: bytes, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM parse_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM parse_cache WHERE key IN ("
+                " SELECT key FROM parse_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM parse_cache")
+
+
+class PostgresBackend:
+    """``parse_cache`` table in the Postgres database that holds the sessions."""
+
+    def __init__(self, dsn: str, max_entries: int = 1024, ttl: float = 7 * 24 * 3600) -> None:
+        import psycopg2  # Only needed when this backend is configured.
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # SQLAlchemy URLs name the driver ("postgresql+psycopg2://"); libpq does not.
+        self._conn = psycopg2.connect(re.sub(r"^postgres(?:ql)?\+\w+://", "postgresql://", dsn))
+        self._conn.autocommit = True
+        with self._conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                " key BYTEA PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at DOUBLE PRECISION NOT NULL, used_at DOUBLE PRECISION NOT NULL)"
+            )
+            cur.execute("CREATE INDEX IF NOT EXISTS parse_cache_used_at ON parse_cache (used_at)")
+
+    def get(self, key: bytes) -> str | None:
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute(
+                "UPDATE parse_cache SET used_at = %s WHERE key = %s AND expires_at > %s"
+                " RETURNING value",
+                (time.time(), key, time.time()),
+            )
+            row = cur.fetchone()
+            return None if row is None else row[0]
+
+    def set(self, key: bytes, value: str) -> None:
+        now = time.time()
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO parse_cache VALUES (%s, %s, %s, %s) ON CONFLICT (key) DO UPDATE"
+                " SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at,"
+                " used_at = EXCLUDED.used_at",
+                (key, value, now + self.ttl, now),
+            )
+            cur.execute("DELETE FROM parse_cache WHERE expires_at <= %s", (now,))
+            cur.execute(
+                "DELETE FROM parse_cache WHERE key IN ("
+                " SELECT key FROM parse_cache ORDER BY used_at DESC OFFSET %s)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) FROM parse_cache")
+            return cur.fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock, self._conn.cursor() as cur:
+            cur.execute("DELETE FROM parse_cache")
+
+
+class ParseCache:
+    """Intake parses keyed by normalised transcript and prompt version."""
+
+    def __init__(self, backend: ParseCacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(transcript: str, prompt_version: str) -> bytes:
+        """Return the cache key of *transcript* parsed with *prompt_version*."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(prompt_version.encode())
+        digest.update(b"\0")
+        digest.update(normalise_transcript(transcript).encode())
+        return digest.digest()
+
+    def get(self, transcript: str, prompt_version: str) -> dict[str, Any] | None:
+        """Return the cached parse of *transcript*, or ``None`` on a miss."""
+        try:
+            value = self.backend.get(self.key(transcript, prompt_version))
+        except Exception as exc:  # the parser LLM still works without the cache
+            logger.warning("Parse cache lookup failed, treating it as a miss: %r", exc)
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def put(self, transcript: str, prompt_version: str, parsed: dict[str, Any]) -> None:
+        """Store the validated parse of *transcript*; a failed write is logged and dropped."""
+        try:
+            self.backend.set(
+                self.key(transcript, prompt_version),
+                json.dumps(parsed, ensure_ascii=False, separators=(",", ":")),
+            )
+        except Exception as exc:
+            logger.warning("Parse cache write failed: %r", exc)
+
+    def stats(self) -> dict[str, float]:
+        """Return hits, misses, hit rate and the number of stored entries."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.backend),
+        }
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self.backend.clear()
+        self.hits = self.misses = 0
+
+
+@lru_cache
+def get_parse_cache() -> ParseCache | None:
+    """Return the parse cache configured in ``Settings``, or ``None`` when disabled.
+
+    ``postgres`` reuses ``SUPABASE_REFRAME_DB_CONNECTION_STRING`` (the session
+    store) and falls back to the in-process LRU when it is not set, like
+    ``get_session_service`` falls back to the in-memory session service.  A
+    backend that cannot be opened is logged and leaves the cache disabled.
+    """
+    settings = Settings()
+    options = {"max_entries": settings.parse_cache_max_entries, "ttl": settings.parse_cache_ttl}
+    backend = settings.parse_cache_backend
+    if backend == "none":
+        return None
+    try:
+        if backend == "sqlite":
+            return ParseCache(SqliteBackend(settings.parse_cache_path, **options))
+        if backend == "postgres" and settings.supabase_connection_string:
+            return ParseCache(PostgresBackend(settings.supabase_connection_string, **options))
+    except Exception as exc:
+        logger.warning("Parse cache backend %r unavailable, parsing uncached: %r", backend, exc)
+        return None
+    return ParseCache(MemoryBackend(**options))
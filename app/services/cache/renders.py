@@ -0,0 +1,131 @@
+"""Content-addressed cache of rendered PDF reports.
+
+A report only depends on the parsed intake record, the analysis text and the
+report layout, yet re-requesting it - or re-running ``PdfAgent`` after a
+transient artifact failure - used to render it from scratch.  Renders are now
+keyed by the blake2b hash of
+
+* the parsed record as canonical JSON (sorted keys, compact separators), so
+  two equal records always hash the same;
+* the analysis text;
+* :data:`app.services.rendering.report.TEMPLATE_VERSION`, so a layout change
+  never serves an old PDF.
+
+The key is also stored with the saved artifact in ``state["pdf_output"]``,
+which lets ``PdfAgent`` reuse the artifact version and signed URL of a session
+whose inputs have not changed without rendering or uploading anything.
+
+:class:`RenderCache` is a per-process LRU bounded by the total size of the
+PDFs it holds.  It counts hits, misses and the bytes that were not rendered
+again (:meth:`RenderCache.stats`).
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+import hashlib
+import json
+import threading
+from typing import Any
+
+from app.config.base import Settings
+from app.services.rendering.report import TEMPLATE_VERSION
+
+
+def _canonical(parsed: Mapping[str, Any]) -> bytes:
+    return json.dumps(parsed, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def render_key(parsed: Mapping[str, Any], analysis: str) -> str:
+    """Return the stable hash of a report's inputs and the template version."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(TEMPLATE_VERSION.encode())
+    digest.update(b"\0")
+    digest.update(_canonical(parsed))
+    digest.update(b"\0")
+    digest.update(analysis.encode())
+    return digest.hexdigest()
+
+
+def intake_key(parsed: Mapping[str, Any]) -> str:
+    """Return the stable hash of a parsed intake record and the template version."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(TEMPLATE_VERSION.encode())
+    digest.update(b"\0")
+    digest.update(_canonical(parsed))
+    return digest.hexdigest()
+
+
+class RenderCache:
+    """LRU of rendered PDFs, bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        """Return the cached PDF for *key*, or ``None`` on a miss."""
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        self.record_hit(len(pdf))
+        return pdf
+
+    def put(self, key: str, pdf: bytes) -> None:
+        """Store a rendered PDF, evicting the least recently used ones beyond ``max_bytes``."""
+        if len(pdf) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = pdf
+            self._size += len(pdf)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def record_hit(self, size: int) -> None:
+        """Count a render that was avoided, e.g. by reusing a saved artifact."""
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+
+    def stats(self) -> dict[str, float]:
+        """Return hits, misses, hit rate, bytes saved and the cache's size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.bytes_saved = 0
+
+
+@lru_cache
+def get_render_cache() -> RenderCache:
+    """Return the process-wide render cache configured in ``Settings``."""
+    return RenderCache(max_bytes=Settings().render_cache_max_bytes)
@@ -0,0 +1,101 @@
+"""In-process cache for per-message verdicts of the model callbacks.
+
+``SafetyGuard`` and ``LangCallback`` run as *before_model_callback* on both
+``collector_llm`` and the analyst agent, and ``LoopAgent`` calls the model
+several times for the same user message.  Both verdicts only depend on the
+text of that message, so they are computed once and memoised here.
+
+Entries are keyed by ``(scope, namespace, content hash)``:
+
+* ``scope`` - the session id (or the invocation id when there is no session),
+  so verdicts never leak between conversations;
+* ``namespace`` - which check produced the verdict (``"pii"``, ``"lang"``...);
+* the blake2b hash of the text, so the cache never holds the message itself.
+
+The cache is a bounded LRU and keeps per-namespace hit/miss counters, exposed
+through :meth:`VerdictCache.stats`, to confirm the savings under load.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable
+import hashlib
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_DEFAULT_MAX_ENTRIES = 4096
+
+
+def verdict_scope(callback_context: Any) -> str:
+    """Return the cache scope of a callback: its session id, else its invocation id."""
+    session = getattr(callback_context, "session", None)
+    session_id = getattr(session, "id", None)
+    return str(session_id or callback_context.invocation_id)
+
+
+class VerdictCache:
+    """Bounded LRU of verdicts keyed by scope, namespace and content hash."""
+
+    def __init__(self, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, bytes], Any] = OrderedDict()
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self, scope: str, namespace: str, text: str, compute: Callable[[str], T]
+    ) -> T:
+        """Return the verdict for *text*, calling ``compute(text)`` only on a miss."""
+        key = self._key(scope, namespace, text)
+        if key in self._entries:
+            return self._hit(key, namespace)
+        return self._store(key, namespace, compute(text))
+
+    async def aget_or_compute(
+        self, scope: str, namespace: str, text: str, compute: Callable[[str], Awaitable[T]]
+    ) -> T:
+        """Async variant of :meth:`get_or_compute` for verdicts computed off the event loop."""
+        key = self._key(scope, namespace, text)
+        if key in self._entries:
+            return self._hit(key, namespace)
+        return self._store(key, namespace, await compute(text))
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return ``{namespace: {"hits": n, "misses": n}}`` for every namespace seen."""
+        return {
+            namespace: {"hits": self.hits[namespace], "misses": self.misses[namespace]}
+            for namespace in sorted(self.hits.keys() | self.misses.keys())
+        }
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self.hits.clear()
+        self.misses.clear()
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                    #
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _key(scope: str, namespace: str, text: str) -> tuple[str, str, bytes]:
+        return scope, namespace, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def _hit(self, key: tuple[str, str, bytes], namespace: str) -> Any:
+        self.hits[namespace] += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def _store(self, key: tuple[str, str, bytes], namespace: str, verdict: T) -> T:
+        self.misses[namespace] += 1
+        self._entries[key] = verdict
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return verdict
+
+
+verdict_cache = VerdictCache()
@@ -0,0 +1,162 @@
+"""Offline n-gram language detector for user messages.
+
+A small multinomial naive-Bayes model over two feature families:
+
+* whole words (function words such as ``que``, ``the``, ``und`` carry most of
+  the signal for short messages), and
+* character trigrams of each word padded with spaces (``" ¿c"``, ``"ção"``,
+  ``"sch"``), which handle content words, accents and inflections.
+
+The profiles are compiled **once per process** from the samples in
+:mod:`app.services.language.profiles` into a single lookup table per feature
+family.  Each table maps a feature to the languages it was seen in and the
+log-likelihood boost it gives them.  Per-word scores are memoised as well, so
+scoring a message is one regex pass over the text plus one dictionary hit per
+word - no network call, no LLM round-trip, typically a few microseconds.
+
+``detect()`` returns the most likely language together with its posterior
+probability, which callers can use as a confidence score.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterator, Mapping
+import math
+import re
+from typing import NamedTuple
+
+from app.services.language.profiles import TRAINING_SAMPLES
+
+# Words: letters, optionally joined by an apostrophe or the Catalan middle dot
+# (``l'home``, ``col·legi``).  The Spanish opening marks are tokens of their own.
+_TOKEN_RE = re.compile(r"[¿¡]|[^\W\d_]+(?:['·][^\W\d_]+)*")
+
+# Messages are scored on a bounded prefix; the first few hundred characters
+# carry all the evidence we need and keep the cost flat for pasted walls of text.
+_MAX_CHARS = 1000
+
+# Laplace smoothing for the naive-Bayes estimates.
+_ALPHA = 0.5
+
+# Upper bound on memoised per-word profiles (see ``NgramLanguageDetector._profile``).
+_PROFILE_CACHE_SIZE = 50_000
+
+
+class LanguageGuess(NamedTuple):
+    lang: str
+    confidence: float
+
+
+class NgramLanguageDetector:
+    """Naive-Bayes detector over word and character-trigram features."""
+
+    def __init__(self, samples: Mapping[str, str] = TRAINING_SAMPLES) -> None:
+        self.languages: tuple[str, ...] = tuple(samples)
+        word_counts = {lang: Counter(self._words(text.lower())) for lang, text in samples.items()}
+        gram_counts = {lang: Counter(self._grams(text.lower())) for lang, text in samples.items()}
+
+        # ``feature -> ((lang index, log boost), ...)`` for languages that saw it.
+        self._word_table = self._compile(word_counts)
+        self._gram_table = self._compile(gram_counts)
+
+        # Log-likelihood of an *unseen* feature, per language and family.
+        self._word_base = self._baselines(word_counts)
+        self._gram_base = self._baselines(gram_counts)
+
+        # ``word -> per-language score`` including its trigrams and baselines.
+        self._profiles: dict[str, tuple[float, ...]] = {}
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                          #
+    # ------------------------------------------------------------------ #
+    def scores(self, text: str) -> tuple[list[float], int]:
+        """Return per-language log-likelihoods and the number of words seen."""
+        words = _TOKEN_RE.findall(text[:_MAX_CHARS].lower().replace("\u2019", "'"))
+        if not words:
+            return [0.0] * len(self.languages), 0
+        profiles = self._profiles
+        rows = [profiles.get(word) or self._profile(word) for word in words]
+        return [sum(column) for column in zip(*rows, strict=True)], len(words)
+
+    def probabilities(self, text: str) -> tuple[list[float], int]:
+        """Return the per-language posterior (uniform prior) and the word count."""
+        scores, n_words = self.scores(text)
+        if not n_words:
+            return [0.0] * len(self.languages), 0
+        top = max(scores)
+        weights = [math.exp(score - top) for score in scores]
+        total = sum(weights)
+        return [weight / total for weight in weights], n_words
+
+    def detect(self, text: str, default: str = "en") -> LanguageGuess:
+        """Return the most likely language of *text* and its posterior probability.
+
+        Text without any letters yields ``default`` with zero confidence.
+        """
+        probabilities, n_words = self.probabilities(text)
+        if not n_words:
+            return LanguageGuess(default, 0.0)
+        best = max(range(len(probabilities)), key=probabilities.__getitem__)
+        return LanguageGuess(self.languages[best], probabilities[best])
+
+    # ------------------------------------------------------------------ #
+    # Compilation helpers                                                 #
+    # ------------------------------------------------------------------ #
+    def _profile(self, word: str) -> tuple[float, ...]:
+        """Score one word (word feature + padded trigrams) and memoise the result.
+
+        Vocabulary is heavily skewed, so after warm-up almost every token of a
+        message is a single dictionary hit.
+        """
+        profile = [
+            word_base + len(word) * gram_base
+            for word_base, gram_base in zip(self._word_base, self._gram_base, strict=True)
+        ]
+        for idx, boost in self._word_table.get(word, ()):
+            profile[idx] += boost
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            for idx, boost in self._gram_table.get(padded[i : i + 3], ()):
+                profile[idx] += boost
+
+        if len(self._profiles) >= _PROFILE_CACHE_SIZE:
+            self._profiles.clear()
+        result = self._profiles[word] = tuple(profile)
+        return result
+
+    @staticmethod
+    def _words(text: str) -> list[str]:
+        return _TOKEN_RE.findall(text.replace("\u2019", "'"))
+
+    @classmethod
+    def _grams(cls, text: str) -> Iterator[str]:
+        for word in cls._words(text):
+            padded = f" {word} "
+            for i in range(len(padded) - 2):
+                yield padded[i : i + 3]
+
+    def _compile(
+        self, counts: Mapping[str, Counter[str]]
+    ) -> dict[str, tuple[tuple[int, float], ...]]:
+        table: dict[str, list[tuple[int, float]]] = {}
+        for idx, lang in enumerate(self.languages):
+            for feature, count in counts[lang].items():
+                # log P(f | lang) - log P(unseen | lang) under Laplace smoothing.
+                table.setdefault(feature, []).append((idx, math.log1p(count / _ALPHA)))
+        return {feature: tuple(entries) for feature, entries in table.items()}
+
+    def _baselines(self, counts: Mapping[str, Counter[str]]) -> list[float]:
+        vocabulary = len(set().union(*counts.values()))
+        return [
+            math.log(_ALPHA / (sum(counts[lang].values()) + _ALPHA * vocabulary))
+            for lang in self.languages
+        ]
+
+
+detector = NgramLanguageDetector()
+
+
+def detect_language(text: str, default: str = "en") -> LanguageGuess:
+    """Detect the language of *text* with the process-wide precompiled detector."""
+    return detector.detect(text, default)
@@ -0,0 +1,149 @@
+"""Training text for the n-gram language detector.
+
+One sample per supported language.  The samples mix everyday function words
+with the vocabulary our users actually write about (social situations,
+thoughts, feelings), so the compiled profiles are tuned to intake messages
+rather than to news text.  They are compiled once at import time by
+:mod:`app.services.language.detector`; nothing here is read at request time.
+
+Keep the labelled evaluation corpus (``tests/data/lang_corpus.jsonl``) disjoint
+from these samples, otherwise the accuracy numbers are meaningless.
+"""
+
+from __future__ import annotations
+
+LANGUAGE_NAMES: dict[str, str] = {
+    "en": "English",
+    "es": "español",
+    "fr": "français",
+    "de": "Deutsch",
+    "it": "italiano",
+    "pt": "português",
+    "ca": "català",
+}
+
+TRAINING_SAMPLES: dict[str, str] = {
+    "en": """
+Hello, I would like some help with something that happened to me last week at work.
+I was in a meeting with my team and my manager asked me to share my ideas about the
+new project. I felt my heart racing and my face went red, so I just said that I did not
+have anything to add. Afterwards I kept thinking that everyone noticed how nervous I
+was and that they must think I am incompetent. I have been avoiding my colleagues since
+then and I eat lunch alone at my desk. It is always the same: when people look at me I
+feel anxious and I want to disappear. My friends say that I worry too much, but I can't
+stop these thoughts. What should I do? I think they would be happier without me there.
+There was also a party on Saturday and I didn't go because I was afraid of saying
+something stupid. I stayed at home and felt lonely and ashamed. Maybe I am just not good
+with people. Yesterday my sister called and I didn't answer the phone. The worst part
+is that I know it isn't rational, but the feeling is very strong and it comes every time.
+I would really like to understand why this happens and how I could handle it better.
+How are you? Thank you for listening, this is the first time I have talked about it.
+""",
+    "es": """
+Hola, me gustaría pedir ayuda con algo que me pasó la semana pasada en el trabajo.
+Estaba en una reunión con mi equipo y mi jefe me pidió que compartiera mis ideas sobre
+el nuevo proyecto. Sentí que el corazón se me aceleraba y me puse rojo, así que solo dije
+que no tenía nada que añadir. Después no dejaba de pensar que todos se habían dado cuenta
+de lo nervioso que estaba y que seguramente piensan que soy un incompetente. Desde
+entonces evito a mis compañeros y como solo en mi mesa. Siempre es lo mismo: cuando la
+gente me mira siento ansiedad y quiero desaparecer. Mis amigos dicen que me preocupo
+demasiado, pero no puedo parar estos pensamientos. ¿Qué debería hacer? Creo que
+estarían mejor sin mí. También hubo una fiesta el sábado y no fui porque tenía miedo de
+decir alguna tontería. Me quedé en casa y me sentí solo y avergonzado. Quizás no se me
+dan bien las personas. Ayer me llamó mi hermana y no contesté el teléfono. Lo peor es
+que sé que no es racional, pero la sensación es muy fuerte y aparece cada vez. ¿Cómo
+estás? Me encantaría entender por qué me pasa esto y cómo podría manejarlo mejor.
+Gracias por escucharme, es la primera vez que hablo de ello con alguien. Estoy muy
+cansado y tengo un problema con la vergüenza. ¡Qué difícil es todo esto!
+""",
+    "fr": """
+Bonjour, j'aimerais avoir de l'aide pour quelque chose qui m'est arrivé la semaine
+dernière au travail. J'étais en réunion avec mon équipe et mon responsable m'a demandé
+de partager mes idées sur le nouveau projet. J'ai senti mon cœur s'accélérer et mon
+visage est devenu rouge, alors j'ai seulement dit que je n'avais rien à ajouter. Ensuite
+je n'arrêtais pas de penser que tout le monde avait remarqué à quel point j'étais
+nerveux et qu'ils doivent penser que je suis incompétent. Depuis, j'évite mes collègues
+et je mange seul à mon bureau. C'est toujours la même chose : quand les gens me regardent
+je me sens anxieux et j'ai envie de disparaître. Mes amis disent que je m'inquiète trop,
+mais je ne peux pas arrêter ces pensées. Qu'est-ce que je devrais faire ? Je pense qu'ils
+seraient plus heureux sans moi. Il y avait aussi une fête samedi et je n'y suis pas allé
+parce que j'avais peur de dire une bêtise. Je suis resté chez moi et je me suis senti
+seul et honteux. Peut-être que je ne suis pas doué avec les gens. Hier ma sœur m'a appelé
+et je n'ai pas répondu au téléphone. Le pire, c'est que je sais que ce n'est pas
+rationnel, mais le sentiment est très fort et il revient à chaque fois. Je voudrais
+vraiment comprendre pourquoi cela arrive et comment mieux le gérer. Comment ça va ?
+Merci de m'écouter, c'est la première fois que j'en parle avec quelqu'un.
+""",
+    "de": """
+Hallo, ich hätte gerne Hilfe bei etwas, das mir letzte Woche bei der Arbeit passiert ist.
+Ich war in einer Besprechung mit meinem Team und mein Chef hat mich gebeten, meine Ideen
+zum neuen Projekt vorzustellen. Ich habe gespürt, wie mein Herz raste und mein Gesicht
+rot wurde, also habe ich nur gesagt, dass ich nichts hinzuzufügen habe. Danach musste
+ich ständig daran denken, dass alle gemerkt haben, wie nervös ich war, und dass sie mich
+jetzt für unfähig halten. Seitdem gehe ich meinen Kollegen aus dem Weg und esse allein
+an meinem Schreibtisch. Es ist immer dasselbe: Wenn mich Leute ansehen, bekomme ich
+Angst und möchte verschwinden. Meine Freunde sagen, dass ich mir zu viele Sorgen mache,
+aber ich kann diese Gedanken nicht stoppen. Was soll ich tun? Ich glaube, sie wären ohne
+mich glücklicher. Am Samstag gab es auch eine Feier und ich bin nicht hingegangen, weil
+ich Angst hatte, etwas Dummes zu sagen. Ich bin zu Hause geblieben und habe mich einsam
+und beschämt gefühlt. Vielleicht kann ich einfach nicht gut mit Menschen umgehen. Gestern
+hat meine Schwester angerufen und ich bin nicht ans Telefon gegangen. Das Schlimmste ist,
+dass ich weiß, dass es nicht vernünftig ist, aber das Gefühl ist sehr stark und kommt
+jedes Mal wieder. Ich würde wirklich gerne verstehen, warum das passiert und wie ich
+besser damit umgehen könnte. Wie geht es dir? Danke fürs Zuhören, es ist das erste Mal,
+dass ich mit jemandem darüber spreche. Ich bin sehr müde und schäme mich.
+""",
+    "it": """
+Ciao, vorrei un aiuto per una cosa che mi è successa la settimana scorsa al lavoro. Ero
+in riunione con il mio gruppo e il mio capo mi ha chiesto di condividere le mie idee sul
+nuovo progetto. Ho sentito il cuore che batteva forte e sono diventato rosso, quindi ho
+detto soltanto che non avevo niente da aggiungere. Dopo continuavo a pensare che tutti
+si fossero accorti di quanto ero nervoso e che adesso pensano che io sia un incapace. Da
+allora evito i miei colleghi e mangio da solo alla scrivania. È sempre la stessa cosa:
+quando la gente mi guarda sento ansia e vorrei sparire. I miei amici dicono che mi
+preoccupo troppo, ma non riesco a fermare questi pensieri. Cosa dovrei fare? Credo che
+sarebbero più felici senza di me. Sabato c'era anche una festa e non ci sono andato
+perché avevo paura di dire qualche stupidaggine. Sono rimasto a casa e mi sono sentito
+solo e pieno di vergogna. Forse non sono bravo con le persone. Ieri mia sorella mi ha
+chiamato e non ho risposto al telefono. La cosa peggiore è che so che non è razionale, ma
+la sensazione è molto forte e arriva ogni volta. Mi piacerebbe davvero capire perché
+succede e come potrei gestirlo meglio. Come stai? Grazie per l'ascolto, è la prima volta
+che ne parlo con qualcuno. Sono molto stanco e ho un problema con la timidezza.
+""",
+    "pt": """
+Olá, eu gostaria de pedir ajuda com uma coisa que me aconteceu na semana passada no
+trabalho. Estava numa reunião com a minha equipa e o meu chefe pediu-me para partilhar as
+minhas ideias sobre o novo projeto. Senti o coração a acelerar e fiquei vermelho, por
+isso só disse que não tinha nada a acrescentar. Depois não parava de pensar que todos
+tinham reparado em como eu estava nervoso e que agora acham que sou um incompetente.
+Desde então evito os meus colegas e almoço sozinho na minha secretária. É sempre a mesma
+coisa: quando as pessoas olham para mim sinto ansiedade e quero desaparecer. Os meus
+amigos dizem que eu me preocupo demais, mas não consigo parar estes pensamentos. O que
+é que eu devia fazer? Acho que eles seriam mais felizes sem mim. Também houve uma festa
+no sábado e não fui porque tinha medo de dizer alguma bobagem. Fiquei em casa e senti-me
+sozinho e envergonhado. Talvez eu não seja bom com as pessoas. Ontem a minha irmã
+ligou-me e não atendi o telefone. O pior é que sei que não é racional, mas a sensação é
+muito forte e aparece sempre. Eu queria muito entender por que isto acontece e como
+poderia lidar melhor com isso. Como você está? Obrigado por me ouvir, é a primeira vez
+que falo disto com alguém. Estou muito cansado e tenho um problema com a vergonha.
+Não sei o que fazer, não consigo, está tudo tão difícil, você acha que vai melhorar?
+""",
+    "ca": """
+Hola, m'agradaria demanar ajuda amb una cosa que em va passar la setmana passada a la
+feina. Estava en una reunió amb el meu equip i el meu cap em va demanar que compartís les
+meves idees sobre el nou projecte. Vaig sentir que el cor se m'accelerava i em vaig posar
+vermell, així que només vaig dir que no tenia res a afegir. Després no parava de pensar
+que tothom s'havia adonat de com n'estava de nerviós i que segurament pensen que sóc un
+incompetent. Des d'aleshores evito els meus companys i dino sol a la meva taula. Sempre
+és el mateix: quan la gent em mira sento ansietat i vull desaparèixer. Els meus amics
+diuen que em preocupo massa, però no puc aturar aquests pensaments. Què hauria de fer?
+Crec que estarien millor sense mi. També hi va haver una festa dissabte i no hi vaig anar
+perquè tenia por de dir alguna ximpleria. Em vaig quedar a casa i em vaig sentir sol i
+avergonyit. Potser no se'm donen bé les persones. Ahir la meva germana em va trucar i no
+vaig contestar el telèfon. El pitjor és que sé que no és racional, però la sensació és
+molt forta i apareix cada vegada. M'encantaria entendre per què em passa això i com ho
+podria gestionar millor. Com estàs? Gràcies per escoltar-me, és la primera vegada que en
+parlo amb algú. Estic molt cansat i tinc un problema amb la vergonya. Estic fatal, tinc
+molta por, no sé què fer amb tot això, amb els col·legues de la feina.
+""",
+}
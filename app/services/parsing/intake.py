@@ -0,0 +1,92 @@
+"""Schema of the structured intake record produced by ``JsonParserAgent``.
+
+:class:`IntakeRecord` is used twice:
+
+* as the parser LLM's ``output_schema`` - ADK turns it into the Gemini response
+  schema, so the model is constrained to emit exactly these fields as JSON;
+* to validate whatever came back.  Pydantic compiles the validator once, when
+  the class is created, so validating a response is a single pass of the
+  compiled core schema (``model_validate_json`` straight from the raw text when
+  the response is a bare object, which is what schema-constrained output is).
+
+The validators are lenient where models commonly drift - a single string where
+a list was asked for, ``null`` for an empty list, stray extra keys - and strict
+about the one field a report cannot do without: ``situation``.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+from app.services.parsing.json_stream import extract_json_object
+
+INTAKE_FIELDS = ("situation", "thoughts", "feelings", "behaviors", "outcome")
+
+
+class IntakeParseError(ValueError):
+    """A parser response did not contain a valid intake record."""
+
+
+class IntakeRecord(BaseModel):
+    """The five intake fields collected by the intake loop."""
+
+    model_config = ConfigDict(extra="ignore", str_strip_whitespace=True)
+
+    situation: str = Field(min_length=1, description="The challenging social situation.")
+    thoughts: list[str] = Field(default_factory=list, description="Thoughts the person had.")
+    feelings: list[str] = Field(default_factory=list, description="Emotions experienced.")
+    behaviors: list[str] = Field(default_factory=list, description="What the person did.")
+    outcome: str = Field(default="", description="What happened and how they felt afterward.")
+    timestamp: str | None = Field(default=None, description="ISO timestamp of the intake.")
+
+    @field_validator("thoughts", "feelings", "behaviors", mode="before")
+    @classmethod
+    def _as_list(cls, value: Any) -> Any:
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value] if value.strip() else []
+        return value
+
+    @field_validator("outcome", mode="before")
+    @classmethod
+    def _none_as_empty(cls, value: Any) -> Any:
+        return "" if value is None else value
+
+
+def parse_intake(text: str) -> IntakeRecord:
+    """Validate a parser response into an :class:`IntakeRecord`.
+
+    Raises :class:`IntakeParseError` with a message suitable for a repair
+    prompt when *text* holds no JSON object or the object does not validate.
+    """
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            return IntakeRecord.model_validate_json(stripped)
+        except ValidationError as exc:
+            if all(error["type"] != "json_invalid" for error in exc.errors()):
+                raise IntakeParseError(_describe(exc)) from exc
+            # Not a bare object after all - fall back to scanning for one.
+
+    data = extract_json_object(text)
+    if data is None:
+        raise IntakeParseError("the response does not contain a JSON object")
+    return validate_intake(data)
+
+
+def validate_intake(data: dict[str, Any]) -> IntakeRecord:
+    """Validate an already-decoded object, raising :class:`IntakeParseError`."""
+    try:
+        return IntakeRecord.model_validate(data)
+    except ValidationError as exc:
+        raise IntakeParseError(_describe(exc)) from exc
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'object'}: {error['msg']}"
+        for error in exc.errors(include_url=False)
+    )
@@ -0,0 +1,132 @@
+"""Incremental extractor for the first JSON object in an LLM response.
+
+Models wrap the object we ask for in prose and often in a Markdown fence::
+
+    Sure! Here is the data {as requested}:
+    ```json
+    {"situation": "a meeting", "thoughts": ["they think I'm {boring}"]}
+    ```
+
+A greedy ``\\{[\\s\\S]*\\}`` grabs everything from the first ``{`` in the prose
+to the last ``}`` in the response, so it breaks as soon as the prose contains a
+brace, and it needs the whole response in memory.  :class:`JsonObjectExtractor`
+instead tracks brace depth and string/escape state as chunks arrive:
+
+* braces inside JSON strings (and escaped quotes) are ignored;
+* a candidate that turns out not to be JSON (``{as requested}``) is dropped
+  and scanning resumes right after it, so every character is visited once;
+* a backtick outside a string or a raw newline inside one cannot be part of a
+  JSON object - the fence closed around a truncated object - so the candidate
+  is dropped too;
+* only the current candidate is buffered, never the prose around it.
+
+The first complete object is returned by :meth:`JsonObjectExtractor.feed` as
+soon as its closing brace arrives.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+# Characters that matter outside / inside a JSON string.
+_STRUCTURAL = re.compile(r'[{}"`]')
+_STRING_STOP = re.compile(r'["\\\n]')
+
+
+class JsonObjectExtractor:
+    """Find the first complete JSON object in a stream of text chunks."""
+
+    __slots__ = ("_buffer", "_depth", "_escape", "_in_string", "result")
+
+    def __init__(self) -> None:
+        self._buffer: list[str] = []  # pieces of the current candidate
+        self._depth = 0
+        self._in_string = False
+        self._escape = False  # a backslash ended the previous chunk
+        self.result: dict[str, Any] | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> dict[str, Any] | None:
+        """Consume *chunk*; return the first complete object once it has closed."""
+        if self.result is not None:
+            return self.result
+
+        pos, end = 0, len(chunk)
+        start = 0  # where the current candidate starts within this chunk
+        if self._escape and chunk:
+            self._escape = False
+            pos = 1
+
+        while pos < end:
+            if not self._depth:
+                start = chunk.find("{", pos)
+                if start < 0:
+                    return None
+                self._depth, self._in_string, self._buffer = 1, False, []
+                pos = start + 1
+                continue
+
+            if self._in_string:
+                match = _STRING_STOP.search(chunk, pos)
+                if match is None:
+                    break
+                char, pos = match.group(), match.end()
+                if char == "\\":
+                    if pos < end:
+                        pos += 1  # skip the escaped character
+                    else:
+                        self._escape = True
+                elif char == "\n":
+                    self._reset()  # raw newline: the string (and object) was cut off
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "`":
+                self._reset()  # fence closed around an unbalanced candidate
+            else:
+                self._depth -= 1
+                if not self._depth:
+                    self._buffer.append(chunk[start:pos])
+                    candidate = "".join(self._buffer)
+                    self._buffer = []
+                    if self._accept(candidate):
+                        return self.result
+
+        if self._depth:
+            self._buffer.append(chunk[start:])
+        return None
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                    #
+    # ------------------------------------------------------------------ #
+    def _accept(self, candidate: str) -> bool:
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            return False  # prose in braces - keep scanning after it
+        if not isinstance(value, dict):
+            return False
+        self.result = value
+        return True
+
+    def _reset(self) -> None:
+        self._depth, self._in_string, self._escape, self._buffer = 0, False, False, []
+
+
+def extract_json_object(text: str) -> dict[str, Any] | None:
+    """Return the first complete JSON object in *text*, or ``None``."""
+    return JsonObjectExtractor().feed(text)
@@ -0,0 +1,177 @@
+"""Cheap, rule-based slot filling of the intake record during the conversation.
+
+The collector asks one question per turn, and the question says which intake
+field the user's next answer belongs to: "What went through your mind?" asks
+for ``thoughts``, "How did you feel afterwards?" for the ``outcome``.  So the
+draft record is filled without another model call - each user answer goes to
+the slot of the question before it (the first message describes the
+``situation`` unless it only greets), and list slots are split into items on
+sentence, line or, for ``feelings``, comma and "and"/"y" boundaries.  Questions
+are recognised in English and Spanish; an answer to a question that names no
+field is not placed.
+
+The draft lives in ``state["intake_slots"]``::
+
+    {
+        "turn": "<invocation id of the last answer recorded>",
+        "pending": "feelings",           # slot of the collector's last question
+        "record": {"situation": "...", "thoughts": [...], ...},
+        "complete": False,
+    }
+
+It is written by :class:`app.callbacks.intake_tracker.IntakeTracker` and read
+by ``JsonParserAgent``, which skips its LLM call once every field is filled.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC, datetime
+import re
+from typing import Any
+
+from app.services.parsing.intake import INTAKE_FIELDS, IntakeParseError, validate_intake
+from app.services.transcript.store import INTAKE_LEN_KEY
+
+INTAKE_SLOTS_KEY = "intake_slots"
+LIST_SLOTS = ("thoughts", "feelings", "behaviors")
+
+# Checked in order, the first match wins: "what's on your mind?" opens the
+# intake and asks for the situation, and "how did you feel afterwards" is about
+# the outcome, not the feelings during the situation.  English and Spanish.
+_QUESTION_SLOTS = (
+    (
+        "situation",
+        re.compile(
+            r"\b(what'?s|what is) on your mind\b|\bwhat brings you\b|"
+            r"\bqu[eé] tienes en (la )?mente\b|\bqu[eé] te trae\b",
+            re.I,
+        ),
+    ),
+    (
+        "outcome",
+        re.compile(
+            r"\b(after(wards?)?|later|in the end|end(ed)? up|turn(ed)? out|outcome|"
+            r"result|aftermath|since then|"
+            r"despu[eé]s|luego|al final|termin[oó]|resultado|desde entonces)\b",
+            re.I,
+        ),
+    ),
+    (
+        "thoughts",
+        re.compile(
+            r"\b(think|thoughts?|thinking|mind|tell(ing)? yourself|belie\w*|"
+            r"pens\w*|mente|cabeza|te dijiste|crees|cre[ií]as|cre[ií]ste)\b",
+            re.I,
+        ),
+    ),
+    (
+        "feelings",
+        re.compile(
+            r"\b(feel|feelings?|felt|emotions?|mood|"
+            r"sientes|sentiste|sent[ií]as|sentimientos?|emoci[oó]n|emociones|[aá]nimo)\b",
+            re.I,
+        ),
+    ),
+    (
+        "behaviors",
+        re.compile(
+            r"\b(do|did|doing|react\w*|respond\w*|behav\w*|act(ed)?|handle\w*|"
+            r"hiciste|haces|hac[ií]as|reaccion\w*|respondiste|actuaste|comportaste|"
+            r"manejaste)\b",
+            re.I,
+        ),
+    ),
+    (
+        "situation",
+        re.compile(
+            r"\b(happen\w*|situation|describe|where|who|what was going on|"
+            r"pas[oó]|ocurri[oó]|sucedi[oó]|situaci[oó]n|descr[ií]b\w*|cu[eé]ntame|"
+            r"d[oó]nde|qui[eé]n)\b",
+            re.I,
+        ),
+    ),
+)
+# A message that only greets ("Hi!", "Hola, buenas") describes nothing yet.
+_GREETING = re.compile(
+    r"^\W*((hi|hello|hey|good (morning|afternoon|evening)|"
+    r"hola|buenas( tardes| noches)?|buenos d[ií]as)\W*)+$",
+    re.I,
+)
+_ITEM_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+_FEELING_SPLIT = re.compile(r",|;|\n|\b(?:and|or|y|e|o|u)\b", re.I)
+
+
+def question_slot(text: str) -> str | None:
+    """Return the intake field a collector question asks about, if any."""
+    for slot, pattern in _QUESTION_SLOTS:
+        if pattern.search(text):
+            return slot
+    return None
+
+
+def split_items(slot: str, text: str) -> list[str]:
+    """Split a user answer into the items of a list slot."""
+    pattern = _FEELING_SPLIT if slot == "feelings" else _ITEM_SPLIT
+    return [item.strip(" .") for item in pattern.split(text) if item and item.strip(" .")]
+
+
+def empty_draft(since: int = 0) -> dict[str, Any]:
+    """Return a draft with no slot filled yet.
+
+    *since* is the ``intake_len`` the draft starts from: an intake handed to
+    the parser after that belongs to this draft.
+    """
+    return {
+        "turn": None,
+        "pending": None,
+        "record": {field: [] if field in LIST_SLOTS else "" for field in INTAKE_FIELDS},
+        "complete": False,
+        "since": since,
+    }
+
+
+def handed_over(state: Mapping[str, Any]) -> bool:
+    """Return whether the intake of the draft in *state* was already handed to the parser."""
+    draft = state.get(INTAKE_SLOTS_KEY) or {}
+    return (state.get(INTAKE_LEN_KEY) or 0) > draft.get("since", 0)
+
+
+def fill(draft: dict[str, Any], slot: str | None, answer: str) -> None:
+    """Record a user *answer* to a question about *slot* in *draft*."""
+    record = draft["record"]
+    if slot is None:
+        # An answer we cannot place still describes the situation if nothing does
+        # yet - unless it is only a greeting.
+        if record["situation"] or _GREETING.match(answer):
+            return
+        slot = "situation"
+    if slot in LIST_SLOTS:
+        items = [item for item in split_items(slot, answer) if item not in record[slot]]
+        record[slot] = [*record[slot], *items]
+    else:
+        record[slot] = f"{record[slot]} {answer}".strip()
+
+
+def missing_fields(record: Mapping[str, Any]) -> list[str]:
+    """Return the intake fields of *record* that are still empty."""
+    return [field for field in INTAKE_FIELDS if not record.get(field)]
+
+
+def is_complete(record: Mapping[str, Any]) -> bool:
+    """Return whether every intake field of *record* is filled."""
+    return not missing_fields(record)
+
+
+def tracked_record(state: Mapping[str, Any]) -> dict[str, Any] | None:
+    """Return the validated record of a complete draft in *state*, else ``None``."""
+    draft = state.get(INTAKE_SLOTS_KEY) or {}
+    if not draft.get("complete"):
+        return None
+    try:
+        record = validate_intake(draft["record"])
+    except IntakeParseError:
+        return None
+    if record.timestamp is None:
+        record.timestamp = datetime.now(UTC).isoformat()
+    return record.model_dump()
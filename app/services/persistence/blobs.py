@@ -0,0 +1,224 @@
+"""Content-addressed side-store for large binary outputs (PDF reports).
+
+Without an artifact service, ``PdfAgent`` used to put each report in the
+session twice: base64 in ``state["pdf_output"]`` and as an inline ``Blob`` in
+its event.  ``DatabaseSessionService`` persisted both copies and sent them
+back on every session fetch.  Now the bytes go to a :class:`BlobStore`, and
+state and events only hold a small reference::
+
+    {"digest": "sha256:9f86d0...", "size": 48213, "mime_type": "application/pdf"}
+
+Blobs are keyed by the SHA-256 of their content, so a report regenerated with
+the same content is stored once.  Two backends implement :class:`BlobBackend`:
+
+* :class:`FilesystemBackend` - one file per blob under a directory, fanned out
+  by the first two hex digits; written to a temporary file and renamed, so a
+  reader never sees half a blob;
+* :class:`PostgresLargeObjectBackend` - a Postgres large object per blob plus a
+  ``blob_store`` table mapping digests to OIDs, in the session database.
+
+The filesystem backend defaults to ``.adk/blobs`` in the working directory, next
+to the local session and artifact stores of ``adk web``/``adk api_server``, so
+reports survive a restart.  Reports are read back with :func:`load_report`
+(from a session's ``state["pdf_output"]``) or from the command line:
+
+    python -m app.services.persistence.blobs sha256:9f86d0... -o report.pdf
+    python -m app.services.persistence.blobs --session sessions/session-<id>.json -o report.pdf
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Mapping
+from functools import lru_cache
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import sys
+import tempfile
+import threading
+from typing import Any, Protocol
+
+from app.config.base import Settings
+
+DIGEST_PREFIX = "sha256:"
+
+
+def content_digest(data: bytes) -> str:
+    """Return the content address of *data* (``"sha256:<hex>"``)."""
+    return DIGEST_PREFIX + hashlib.sha256(data).hexdigest()
+
+
+class BlobBackend(Protocol):
+    """Storage for immutable ``hex digest -> bytes`` blobs."""
+
+    def put(self, digest: str, data: bytes) -> None: ...
+
+    def get(self, digest: str) -> bytes | None: ...
+
+    def __contains__(self, digest: str) -> bool: ...
+
+
+class FilesystemBackend:
+    """One file per blob under *root*."""
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, digest: str) -> bytes | None:
+        try:
+            return self._path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+
+class PostgresLargeObjectBackend:
+    """Postgres large objects, indexed by the ``blob_store`` table."""
+
+    def __init__(self, dsn: str) -> None:
+        import psycopg2  # Only needed when this backend is configured.
+
+        self._lock = threading.Lock()
+        # SQLAlchemy URLs name the driver ("postgresql+psycopg2://"); libpq does not.
+        self._conn = psycopg2.connect(re.sub(r"^postgres(?:ql)?\+\w+://", "postgresql://", dsn))
+        with self._conn, self._conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS blob_store ("
+                " digest TEXT PRIMARY KEY, oid OID NOT NULL, size BIGINT NOT NULL,"
+                " created_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+            )
+
+    def put(self, digest: str, data: bytes) -> None:
+        # Large objects are transactional: the object and its row commit together.
+        with self._lock, self._conn, self._conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM blob_store WHERE digest = %s", (digest,))
+            if cur.fetchone() is not None:
+                return
+            lobj = self._conn.lobject(0, "wb")
+            lobj.write(data)
+            lobj.close()
+            cur.execute(
+                "INSERT INTO blob_store (digest, oid, size) VALUES (%s, %s, %s)"
+                " ON CONFLICT (digest) DO NOTHING",
+                (digest, lobj.oid, len(data)),
+            )
+            if cur.rowcount == 0:
+                # Another worker stored the same content first.
+                self._conn.lobject(lobj.oid, "n").unlink()
+
+    def get(self, digest: str) -> bytes | None:
+        with self._lock, self._conn, self._conn.cursor() as cur:
+            cur.execute("SELECT oid FROM blob_store WHERE digest = %s", (digest,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            lobj = self._conn.lobject(row[0], "rb")
+            try:
+                return lobj.read()
+            finally:
+                lobj.close()
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock, self._conn, self._conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM blob_store WHERE digest = %s", (digest,))
+            return cur.fetchone() is not None
+
+
+class BlobStore:
+    """Stores bytes by content hash and hands out small references to them."""
+
+    def __init__(self, backend: BlobBackend) -> None:
+        self.backend = backend
+
+    def put(self, data: bytes, mime_type: str) -> dict[str, Any]:
+        """Store *data* (once per content) and return its reference."""
+        digest = content_digest(data)
+        self.backend.put(digest.removeprefix(DIGEST_PREFIX), data)
+        return {"digest": digest, "size": len(data), "mime_type": mime_type}
+
+    def get(self, ref: dict[str, Any] | str) -> bytes | None:
+        """Return the bytes of a reference (or a digest), or ``None`` if unknown."""
+        digest = ref if isinstance(ref, str) else ref["digest"]
+        return self.backend.get(digest.removeprefix(DIGEST_PREFIX))
+
+
+@lru_cache
+def get_blob_store() -> BlobStore:
+    """Return the blob store configured in ``Settings``.
+
+    ``postgres`` reuses ``SUPABASE_REFRAME_DB_CONNECTION_STRING`` (the session
+    store) and falls back to the local directory when it is not set, like
+    ``get_session_service`` falls back to the in-memory session service.
+    """
+    settings = Settings()
+    if settings.blob_store_backend == "postgres" and settings.supabase_connection_string:
+        return BlobStore(PostgresLargeObjectBackend(settings.supabase_connection_string))
+    return BlobStore(FilesystemBackend(settings.blob_store_path))
+
+
+def load_report(
+    pdf_output: Mapping[str, Any], store: BlobStore | None = None
+) -> tuple[bytes, str] | None:
+    """Return the bytes and MIME type of the report ``PdfAgent`` put in the blob store.
+
+    *pdf_output* is the session's ``state["pdf_output"]``; ``None`` when it
+    references no blob (e.g. the report was saved as an artifact) or the blob
+    is gone.
+    """
+    ref = pdf_output.get("pdf_blob") or pdf_output.get("report_blob")
+    if not ref:
+        return None
+    data = (store or get_blob_store()).get(ref)
+    return None if data is None else (data, ref["mime_type"])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Write a stored report to a file or stdout.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("digest", nargs="?", help="content address, sha256:<hex>")
+    source.add_argument("--session", help="exported session JSON with a pdf_output reference")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.session:
+        state = json.loads(Path(args.session).read_text()).get("state") or {}
+        report = load_report(state.get("pdf_output") or {})
+        data = report[0] if report else None
+    else:
+        data = get_blob_store().get(args.digest)
+    if data is None:
+        print("No stored report found.", file=sys.stderr)
+        return 1
+
+    if args.output:
+        Path(args.output).write_bytes(data)
+    else:
+        sys.stdout.buffer.write(data)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Prompts of the parser and analyst LLMs, rendered from session state.
+
+The LLM agents in :mod:`app.agents.factory` are built once per process, so the
+per-session data - the intake transcript, the parsed record - can no longer be
+baked into their ``instruction`` string.  Each agent gets an
+``InstructionProvider`` instead, which calls the builders below with the
+session state of the current invocation.  An ``InstructionProvider`` also
+bypasses ADK's ``{placeholder}`` templating, so braces in the user's own words
+or in the JSON examples are sent as written.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from app.config.base import Settings
+from app.services.parsing.intake import INTAKE_FIELDS
+from app.services.prompts.compact import (
+    compact_json,
+    estimate_tokens,
+    fit_record,
+    fit_transcript,
+)
+from app.services.prompts.langfuse_cli import prompt_manager
+from app.services.transcript.store import Transcript
+
+settings = Settings()
+
+# Temporary state key with the failed answer and its errors during a parser repair.
+PARSER_REPAIR_KEY = "temp:parser_repair"
+# ``{stage: {"raw": tokens, "sent": tokens}}`` - estimated size of the session
+# data before and after compaction, per prompt.
+PROMPT_TOKENS_KEY = "prompt_tokens"
+
+
+def build_parser_prompt(intake_transcript: str) -> str:
+    """Return the full parser prompt for the given intake transcript."""
+    # Get the parser instruction
+    parser_instruction = prompt_manager.fetch_prompt(settings.parser_agent_instruction_key)
+
+    # Create the prompt with the transcript
+    return f"""{parser_instruction}
+
+Here is the intake conversation transcript to process:
+
+{intake_transcript}
+
+Please extract and structure this information as JSON as specified in the instructions."""
+
+
+def build_repair_prompt(intake_transcript: str, response_text: str, errors: str) -> str:
+    """Return a prompt asking the model to fix its own invalid answer."""
+    return f"""Your previous answer was not a valid intake record.
+
+Previous answer:
+{response_text}
+
+Problems: {errors}
+
+Intake conversation transcript, for reference:
+
+{intake_transcript}
+
+Return only the corrected JSON object with the fields {", ".join(INTAKE_FIELDS)}.
+Keep the content of the previous answer where it is valid and use the user's own words."""
+
+
+def build_analysis_prompt(parsed_data: Mapping[str, Any]) -> str:
+    """Return the analyst prompt for the given parsed intake record."""
+    # Get the analysis instruction
+    analysis_instruction = prompt_manager.fetch_prompt(settings.analysis_agent_instruction_key)
+
+    # Create the prompt with the parsed data
+    return f"""{analysis_instruction}
+
+Here is the structured intake data to analyze (JSON):
+
+{analysis_data(parsed_data)}
+
+Please provide a comprehensive CBT analysis as specified in the instructions."""
+
+
+def parser_prompt_from_state(state: Mapping[str, Any]) -> str:
+    """Render the parser prompt - or the repair prompt during a repair - from *state*."""
+    intake_transcript = parser_transcript(state)
+    repair = state.get(PARSER_REPAIR_KEY)
+    if repair:
+        return build_repair_prompt(intake_transcript, repair["response"], repair["errors"])
+    return build_parser_prompt(intake_transcript)
+
+
+def analysis_prompt_from_state(state: Mapping[str, Any]) -> str:
+    """Render the analyst prompt from the parsed record in *state*."""
+    return build_analysis_prompt(state.get("parsed", {}))
+
+
+def analysis_data(parsed_data: Mapping[str, Any]) -> str:
+    """Return the parsed record as compact JSON, fitted to the analysis token budget."""
+    return compact_json(fit_record(dict(parsed_data), settings.analysis_token_budget))
+
+
+def parser_transcript(state: Mapping[str, Any]) -> str:
+    """Return the intake transcript of *state*, fitted to the parser token budget."""
+    entries = Transcript(state).intake_entries()  # type: ignore[arg-type]
+    return fit_transcript(entries, settings.parser_token_budget)
+
+
+def prompt_tokens_delta(
+    state: Mapping[str, Any], stage: str, raw_text: str, sent_text: str
+) -> dict[str, Any]:
+    """Return the state delta recording a stage's estimated tokens before and after compaction.
+
+    Agents send it in an event's ``EventActions(state_delta=...)`` so the session
+    service persists it.
+    """
+    counts = dict(state.get(PROMPT_TOKENS_KEY) or {})
+    counts[stage] = {"raw": estimate_tokens(raw_text), "sent": estimate_tokens(sent_text)}
+    return {PROMPT_TOKENS_KEY: counts}
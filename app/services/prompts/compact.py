@@ -0,0 +1,134 @@
+"""Token-lean serialisation of the session data embedded in prompts.
+
+The analyst prompt used to embed ``json.dumps(parsed, indent=2)`` and the
+parser prompt the whole intake transcript, and the analyst prompt is sent
+again on every iteration of ``AnalysisLoop``.  The helpers below keep that
+data small:
+
+* :func:`compact_json` - no indentation or spaces after separators, non-ASCII
+  kept as is (``\\u00e9`` costs more tokens than ``é``), empty values pruned;
+* :func:`fit_transcript` / :func:`fit_record` - trim the data to a token budget
+  (``Settings.parser_token_budget`` / ``Settings.analysis_token_budget``)
+  instead of letting a long session inflate every call.
+
+Token counts are *estimates* (:func:`estimate_tokens`, about four bytes of
+UTF-8 per token for the languages we serve) - good enough for budgeting without
+a tokenizer round trip.  The real counts reported by the model are recorded by
+:class:`app.callbacks.token_usage.TokenUsageRecorder`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import json
+from typing import Any
+
+from app.services.transcript.store import TranscriptEntry
+
+_BYTES_PER_TOKEN = 4
+_OMITTED = "[... earlier messages omitted ...]"
+_ELLIPSIS = "..."
+
+
+def estimate_tokens(text: str) -> int:
+    """Return an estimate of the number of model tokens in *text*."""
+    return -(-len(text.encode()) // _BYTES_PER_TOKEN)
+
+
+def prune_empty(value: Any) -> Any:
+    """Return *value* without ``None``, empty strings, lists and mappings (recursively)."""
+    if isinstance(value, dict):
+        pruned = {key: prune_empty(item) for key, item in value.items()}
+        return {key: item for key, item in pruned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        pruned_items = [prune_empty(item) for item in value]
+        return [item for item in pruned_items if item not in (None, "", [], {})]
+    return value
+
+
+def compact_json(value: Any) -> str:
+    """Serialise *value* with empty values pruned and no optional whitespace."""
+    return json.dumps(prune_empty(value), ensure_ascii=False, separators=(",", ":"))
+
+
+def fit_transcript(entries: Sequence[TranscriptEntry], max_tokens: int) -> str:
+    """Render *entries* as ``"role: text"`` lines within *max_tokens*.
+
+    When the full rendering is over budget, the assistant's questions go first
+    (the parser extracts what the *user* said), then messages from the middle
+    of the conversation, keeping the opening ones (the situation) and the
+    latest ones (the outcome).
+    """
+    lines = [entry.render() for entry in entries]
+    rendered = "\n".join(lines)
+    if estimate_tokens(rendered) <= max_tokens:
+        return rendered
+
+    lines = [entry.render() for entry in entries if entry.role != "assistant"]
+    rendered = "\n".join(lines)
+    if not lines or estimate_tokens(rendered) <= max_tokens:
+        return rendered
+
+    # Alternate between the head and the tail until the budget is spent.
+    budget = max_tokens - estimate_tokens(_OMITTED) - 1
+    head: list[str] = []
+    tail: list[str] = []
+    low, high = 0, len(lines) - 1
+    take_head = True
+    while low <= high:
+        line = lines[low] if take_head else lines[high]
+        cost = estimate_tokens(line) + 1  # plus the newline
+        if cost > budget:
+            break
+        budget -= cost
+        if take_head:
+            head.append(line)
+            low += 1
+        else:
+            tail.append(line)
+            high -= 1
+        take_head = not take_head
+
+    if not head:  # a single message over budget - keep its beginning
+        return lines[0].encode()[: max_tokens * _BYTES_PER_TOKEN].decode(errors="ignore")
+    return "\n".join([*head, _OMITTED, *reversed(tail)])
+
+
+def fit_record(record: dict[str, Any], max_tokens: int) -> dict[str, Any]:
+    """Return *record* pruned and, when over *max_tokens*, with its longest strings cut."""
+    record = prune_empty(record)
+    max_bytes = max_tokens * _BYTES_PER_TOKEN
+    size = len(compact_json(record).encode())
+    while size > max_bytes:
+        path, longest = _longest_string(record)
+        if path is None or len(longest) <= 2 * len(_ELLIPSIS):
+            break
+        shortened = longest[: max(len(_ELLIPSIS), len(longest) - (size - max_bytes) - 1)]
+        shortened = shortened[: len(shortened) - len(_ELLIPSIS)] + _ELLIPSIS
+        _assign(record, path, shortened)
+        size = len(compact_json(record).encode())
+    return record
+
+
+def _longest_string(value: Any, path: tuple = ()) -> tuple[tuple | None, str]:
+    """Return the path to the longest string inside *value*, and the string."""
+    if isinstance(value, str):
+        return path, value
+    if isinstance(value, dict):
+        items: Any = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return None, ""
+    best: tuple[tuple | None, str] = (None, "")
+    for key, item in items:
+        candidate = _longest_string(item, (*path, key))
+        if candidate[0] is not None and len(candidate[1]) > len(best[1]):
+            best = candidate
+    return best
+
+
+def _assign(container: Any, path: tuple, value: str) -> None:
+    for key in path[:-1]:
+        container = container[key]
+    container[path[-1]] = value
@@ -0,0 +1,314 @@
+"""Regenerate the PDF reports of stored sessions after a layout change.
+
+Reports are rendered once, at the end of a session.  After the layout in
+:mod:`app.services.rendering.report` changes, the stored sessions still point
+at PDFs in the old layout, and replaying the pipeline to refresh them would
+call the models again.  This command re-renders them from the ``parsed``
+record and the ``cbt_analysis`` text in each session's state:
+
+* sessions are streamed one at a time, either from the session store
+  (``get_session_service``) or from exported ``sessions/*.json`` files;
+* a report keeps the date of its session (its last update), not the day of
+  the run;
+* PDFs render on a process :class:`~app.services.rendering.pool.RenderPool`
+  with at most ``--window`` sessions in flight, so memory stays bounded however
+  many sessions there are;
+* each report is saved as a new version of the session's ``report.pdf``
+  artifact (``--artifacts``, the GCS bucket by default);
+* every saved report is appended to a checkpoint file, keyed by app, user and
+  session, together with its :func:`~app.services.cache.renders.render_key`.  A re-run skips the sessions
+  already done with the same inputs and template version, so an interrupted
+  run resumes where it stopped, and bumping ``TEMPLATE_VERSION`` renders
+  everything again;
+* progress and throughput (reports per second) are printed as it goes.
+
+Run from the repository root:
+
+    python -m app.services.rendering.batch --files 'sessions/*.json' --artifacts file:///tmp/reports
+    python -m app.services.rendering.batch --store --app-name reframe_agent
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import glob
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+from google.adk.artifacts import BaseArtifactService
+from google.genai.types import Blob, Part
+
+from app.config.base import Settings
+from app.services.cache.renders import render_key
+from app.services.parsing.json_stream import extract_json_object
+from app.services.rendering.pool import RenderPool
+from app.tools.pdf_generator import build_pdf_bytes
+
+settings = Settings()
+
+REPORT_FILENAME = "report.pdf"
+
+
+def report_date(last_update_time: float | None) -> str | None:
+    """Return the report date of a session last updated at *last_update_time* (epoch seconds)."""
+    if not last_update_time:
+        return None
+    return datetime.fromtimestamp(last_update_time, UTC).strftime("%Y-%m-%d")
+
+
+@dataclass(frozen=True, slots=True)
+class SessionJob:
+    """The inputs of one session's report."""
+
+    app_name: str
+    user_id: str
+    session_id: str
+    parsed: dict[str, Any]
+    analysis: str
+    date: str | None = None  # None renders today's date
+
+    @property
+    def scope(self) -> tuple[str, str, str]:
+        """The session's ``(app_name, user_id, session_id)``."""
+        return self.app_name, self.user_id, self.session_id
+
+    @classmethod
+    def from_state(
+        cls,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        state: dict[str, Any],
+        last_update_time: float | None = None,
+    ) -> SessionJob | None:
+        """Return the job of a session, or ``None`` when it never reached the parser."""
+        parsed = state.get("parsed")
+        if isinstance(parsed, str):
+            # Early sessions stored the parser's raw text.
+            parsed = extract_json_object(parsed)
+        if not isinstance(parsed, dict) or not parsed or "raw_response" in parsed:
+            return None
+        analysis = state.get("cbt_analysis", state.get("final_analysis", ""))
+        return cls(
+            app_name, user_id, session_id, dict(parsed), analysis, report_date(last_update_time)
+        )
+
+
+@dataclass
+class BatchStats:
+    """Counters of a regeneration run."""
+
+    rendered: int = 0
+    skipped: int = 0
+    incomplete: int = 0
+    failed: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.rendered / elapsed if elapsed else 0.0
+        return (
+            f"rendered={self.rendered} skipped={self.skipped} incomplete={self.incomplete} "
+            f"failed={self.failed} {self.bytes / 1e6:.1f} MB in {elapsed:.1f}s "
+            f"({rate:.1f} reports/s)"
+        )
+
+
+class Checkpoint:
+    """Append-only record of the reports saved so far, for resuming a run."""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        # Session ids are only unique within an app and user.
+        self._done: dict[tuple[str, str, str], str] = {}
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    scope = (
+                        entry.get("app_name", ""),
+                        entry.get("user_id", ""),
+                        entry["session_id"],
+                    )
+                    self._done[scope] = entry["render_key"]
+        self._file = self.path.open("a")
+
+    def is_done(self, job: SessionJob, key: str) -> bool:
+        return self._done.get(job.scope) == key
+
+    def record(self, job: SessionJob, key: str, version: int) -> None:
+        self._done[job.scope] = key
+        entry = {
+            "app_name": job.app_name,
+            "user_id": job.user_id,
+            "session_id": job.session_id,
+            "render_key": key,
+            "version": version,
+        }
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def exported_sessions(patterns: Iterable[str]) -> Iterable[SessionJob | None]:
+    """Yield the jobs of exported session files, loading one file at a time."""
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                data = json.loads(Path(path).read_text())
+            except (OSError, UnicodeDecodeError, json.JSONDecodeError):
+                continue  # not a session export
+            if not isinstance(data, dict) or "state" not in data:
+                continue
+            yield SessionJob.from_state(
+                data.get("appName", ""),
+                data.get("userId", ""),
+                data.get("id", ""),
+                data["state"],
+                data.get("lastUpdateTime"),
+            )
+
+
+async def stored_sessions(app_name: str, user_id: str | None) -> AsyncIterator[SessionJob | None]:
+    """Yield the jobs of the sessions in the configured session store."""
+    from google.adk.sessions.base_session_service import GetSessionConfig
+
+    from app.services.persistence.supabase import get_session_service
+
+    service = get_session_service()
+    listing = await service.list_sessions(app_name=app_name, user_id=user_id)
+    for summary in listing.sessions:
+        # The listing may leave out state; load it without the event history.
+        session = await service.get_session(
+            app_name=app_name,
+            user_id=summary.user_id,
+            session_id=summary.id,
+            config=GetSessionConfig(num_recent_events=0),
+        )
+        if session is not None:
+            yield SessionJob.from_state(
+                app_name, session.user_id, session.id, session.state, session.last_update_time
+            )
+
+
+def artifact_service(uri: str) -> BaseArtifactService:
+    """Return the artifact service for *uri* from ADK's service registry.
+
+    The URIs are those of ``adk web --artifact_service_uri``: ``gs://bucket``,
+    ``file:///dir``, ``memory://`` or any scheme registered by ``services.py``.
+    """
+    from google.adk.cli.service_registry import get_service_registry
+
+    service = get_service_registry().create_artifact_service(uri)
+    if service is None:
+        raise ValueError(f"unsupported artifact service URI: {uri}")
+    return service
+
+
+async def regenerate(
+    jobs: AsyncIterator[SessionJob | None],
+    artifacts: BaseArtifactService,
+    pool: RenderPool,
+    checkpoint: Checkpoint,
+    *,
+    window: int,
+    progress_every: int = 100,
+) -> BatchStats:
+    """Render and save the report of every job, at most *window* at a time."""
+    stats = BatchStats()
+    slots = asyncio.Semaphore(window)
+    tasks: set[asyncio.Task] = set()
+
+    async def one(job: SessionJob, key: str) -> None:
+        try:
+            pdf = await pool.run(
+                build_pdf_bytes,
+                intake_data=job.parsed,
+                analysis_output=job.analysis,
+                date=job.date,
+            )
+            version = await artifacts.save_artifact(
+                app_name=job.app_name,
+                user_id=job.user_id,
+                session_id=job.session_id,
+                filename=REPORT_FILENAME,
+                artifact=Part(inline_data=Blob(data=pdf, mime_type="application/pdf")),
+            )
+        except Exception as exc:  # one bad session must not stop the batch
+            stats.failed += 1
+            print(f"[regenerate] {job.session_id}: {exc}")
+            return
+        finally:
+            slots.release()
+        checkpoint.record(job, key, version)
+        stats.rendered += 1
+        stats.bytes += len(pdf)
+        if stats.rendered % progress_every == 0:
+            print(f"[regenerate] {stats.line()}")
+
+    async for job in jobs:
+        if job is None:
+            stats.incomplete += 1
+            continue
+        key = render_key(job.parsed, job.analysis)
+        if checkpoint.is_done(job, key):
+            stats.skipped += 1
+            continue
+        await slots.acquire()
+        task = asyncio.create_task(one(job, key))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await asyncio.gather(*tasks)
+    return stats
+
+
+async def _aiter(items: Iterable[SessionJob | None]) -> AsyncIterator[SessionJob | None]:
+    for item in items:
+        yield item
+
+
+async def main_async(args: argparse.Namespace) -> BatchStats:
+    jobs = (
+        stored_sessions(args.app_name, args.user_id)
+        if args.store
+        else _aiter(exported_sessions(args.files))
+    )
+    pool = RenderPool("process", max_workers=args.workers, max_pending=args.window, timeout=120)
+    checkpoint = Checkpoint(args.checkpoint)
+    try:
+        stats = await regenerate(
+            jobs, artifact_service(args.artifacts), pool, checkpoint, window=args.window
+        )
+    finally:
+        checkpoint.close()
+        pool.shutdown()
+    print(f"[regenerate] done: {stats.line()}")
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--files", nargs="+", help="glob(s) of exported session JSON files")
+    source.add_argument("--store", action="store_true", help="read the session store")
+    parser.add_argument("--app-name", default="reframe_agent")
+    parser.add_argument("--user-id", default=None, help="only this user's sessions")
+    parser.add_argument("--artifacts", default=f"gs://{settings.gcs_bucket_name}")
+    parser.add_argument("--checkpoint", default="regenerated_reports.jsonl")
+    parser.add_argument("--workers", type=int, default=settings.pdf_render_workers)
+    parser.add_argument("--window", type=int, default=32, help="sessions in flight at once")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Artifact service wrapper that renders ``report.pdf`` only when it is loaded.
+
+With ``report_format`` set to ``"html"`` or ``"markdown"``, ``PdfAgent`` saves
+the report as text (:mod:`app.services.rendering.markup`) and, next to it, the
+report's inputs as a small JSON artifact, ``report.json``: the parsed record,
+the analysis text and the report date.  No PDF is rendered or uploaded.
+
+:class:`LazyPdfArtifactService` wraps the app's artifact service (GCS, file or
+memory) and serves ``report.pdf`` from that source:
+
+* loading ``report.pdf`` renders version *n* of ``report.json`` on the render
+  pool - the same ``build_pdf_bytes`` and date as an eager render - and keeps
+  the PDF in the render cache under its
+  :func:`~app.services.cache.renders.render_key`, so reports nobody opens as a
+  PDF are never rendered, and one that is opened again is served from memory;
+* listing keys and versions shows ``report.pdf`` with the versions of its
+  source, so clients see the same artifacts as with eager PDFs;
+* sessions without a ``report.json`` - eager reports, or reports saved by the
+  batch command - are served from the wrapped service unchanged.
+
+Rendered PDFs are not written back to the wrapped service: a render costs a
+few milliseconds, less than a round trip to the bucket.
+
+``adk web`` and ``adk api_server`` build the artifact service from
+``--artifact_service_uri``; ``services.py`` in the agents directory calls
+:func:`register_artifact_schemes`, so prefixing a URI with ``lazypdf+`` wraps
+the service it names::
+
+    adk web --artifact_service_uri=lazypdf+gs://re-frame
+
+``PdfAgent`` only advertises ``report.pdf`` in ``state["pdf_output"]`` when the
+session's artifact service is a :class:`LazyPdfArtifactService`.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from google.adk.artifacts import BaseArtifactService
+from google.genai.types import Blob, Part
+
+from app.services.cache.renders import RenderCache, get_render_cache, render_key
+from app.services.rendering.pool import RenderPool, get_render_pool
+from app.tools.pdf_generator import build_pdf_bytes
+
+if TYPE_CHECKING:
+    from google.adk.artifacts.base_artifact_service import ArtifactVersion
+    from google.adk.cli.service_registry import ServiceRegistry
+
+REPORT_PDF = "report.pdf"
+REPORT_SOURCE = "report.json"
+SCHEME_PREFIX = "lazypdf+"
+
+
+def report_source(parsed: dict[str, Any], analysis: str, date: str) -> Part:
+    """Return the ``report.json`` artifact the PDF is rendered from."""
+    payload = {"parsed": parsed, "analysis": analysis, "date": date}
+    return Part(
+        inline_data=Blob(
+            data=json.dumps(payload, ensure_ascii=False).encode(), mime_type="application/json"
+        )
+    )
+
+
+class LazyPdfArtifactService(BaseArtifactService):
+    """Wraps an artifact service; ``report.pdf`` is rendered from ``report.json`` on load."""
+
+    def __init__(
+        self,
+        inner: BaseArtifactService,
+        *,
+        pool: RenderPool | None = None,
+        cache: RenderCache | None = None,
+    ) -> None:
+        self.inner = inner
+        self.pool = pool if pool is not None else get_render_pool()
+        self.cache = cache if cache is not None else get_render_cache()
+        self.rendered = 0  # PDFs rendered on load, i.e. not served from the cache
+
+    async def render(self, source: Part) -> bytes:
+        """Return the PDF of a ``report.json`` artifact."""
+        payload = json.loads(source.inline_data.data)
+        parsed, analysis = payload["parsed"], payload["analysis"]
+        key = render_key(parsed, analysis)
+        pdf = self.cache.get(key)
+        if pdf is None:
+            pdf = await self.pool.run(
+                build_pdf_bytes, intake_data=parsed, analysis_output=analysis, date=payload["date"]
+            )
+            self.cache.put(key, pdf)
+            self.rendered += 1
+        return pdf
+
+    async def save_artifact(self, *, filename: str, **kwargs: Any) -> int:
+        return await self.inner.save_artifact(filename=filename, **kwargs)
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+        version: int | None = None,
+    ) -> Part | None:
+        scope = {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+        if filename == REPORT_PDF:
+            source = await self.inner.load_artifact(
+                filename=REPORT_SOURCE, version=version, **scope
+            )
+            if source is not None and source.inline_data is not None:
+                pdf = await self.render(source)
+                return Part(inline_data=Blob(data=pdf, mime_type="application/pdf"))
+        return await self.inner.load_artifact(filename=filename, version=version, **scope)
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: str | None = None
+    ) -> list[str]:
+        keys = await self.inner.list_artifact_keys(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        if REPORT_SOURCE in keys and REPORT_PDF not in keys:
+            keys = sorted([*keys, REPORT_PDF])
+        return keys
+
+    async def delete_artifact(
+        self, *, app_name: str, user_id: str, filename: str, session_id: str | None = None
+    ) -> None:
+        scope = {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+        await self.inner.delete_artifact(filename=filename, **scope)
+        if filename == REPORT_PDF:
+            await self.inner.delete_artifact(filename=REPORT_SOURCE, **scope)
+
+    async def list_versions(
+        self, *, app_name: str, user_id: str, filename: str, session_id: str | None = None
+    ) -> list[int]:
+        scope = {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+        if filename == REPORT_PDF:
+            versions = await self.inner.list_versions(filename=REPORT_SOURCE, **scope)
+            if versions:
+                return versions
+        return await self.inner.list_versions(filename=filename, **scope)
+
+    async def list_artifact_versions(
+        self, *, app_name: str, user_id: str, filename: str, session_id: str | None = None
+    ) -> list[ArtifactVersion]:
+        scope = {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+        if filename == REPORT_PDF:
+            versions = await self.inner.list_artifact_versions(filename=REPORT_SOURCE, **scope)
+            if versions:
+                return [v.model_copy(update={"mime_type": "application/pdf"}) for v in versions]
+        return await self.inner.list_artifact_versions(filename=filename, **scope)
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: str | None = None,
+        version: int | None = None,
+    ) -> ArtifactVersion | None:
+        scope = {"app_name": app_name, "user_id": user_id, "session_id": session_id}
+        if filename == REPORT_PDF:
+            source = await self.inner.get_artifact_version(
+                filename=REPORT_SOURCE, version=version, **scope
+            )
+            if source is not None:
+                return source.model_copy(update={"mime_type": "application/pdf"})
+        return await self.inner.get_artifact_version(filename=filename, version=version, **scope)
+
+
+def lazy_artifact_service(uri: str, **kwargs: Any) -> LazyPdfArtifactService:
+    """Artifact service factory for ``lazypdf+<uri>``: the service of *uri*, wrapped."""
+    if not uri.startswith(SCHEME_PREFIX):
+        raise ValueError(f"not a {SCHEME_PREFIX} artifact service URI: {uri}")
+    from google.adk.cli.service_registry import get_service_registry
+
+    inner_uri = uri.removeprefix(SCHEME_PREFIX)
+    inner = get_service_registry().create_artifact_service(inner_uri, **kwargs)
+    if inner is None:
+        raise ValueError(f"unsupported artifact service URI: {inner_uri}")
+    return LazyPdfArtifactService(inner)
+
+
+def register_artifact_schemes(
+    registry: ServiceRegistry | None = None, schemes: tuple[str, ...] = ("gs", "file", "memory")
+) -> None:
+    """Register ``lazypdf+<scheme>`` for each artifact service scheme in *schemes*."""
+    from google.adk.cli.service_registry import get_service_registry
+
+    registry = registry if registry is not None else get_service_registry()
+    for scheme in schemes:
+        registry.register_artifact_service(SCHEME_PREFIX + scheme, lazy_artifact_service)
@@ -0,0 +1,134 @@
+"""HTML and Markdown versions of the report, rendered from :class:`ReportData`.
+
+Most users open the report in a browser, yet every session paid for a full
+reportlab layout and a binary PDF upload.  With ``report_format`` set to
+``"html"`` or ``"markdown"``, ``PdfAgent`` saves the report as a small text
+artifact rendered here instead - string formatting, no layout - and the PDF is
+only rendered when ``report.pdf`` is actually loaded (see
+:mod:`app.services.rendering.lazy`).
+
+Both renderers follow :meth:`ReportTemplate.story` section by section, from the
+same :class:`ReportData`, so the three formats always show the same content.
+Session text is escaped: unlike the PDF's ``Paragraph`` mini-markup, it is
+never interpreted as markup.
+"""
+
+from __future__ import annotations
+
+from html import escape
+
+from app.services.rendering.report import DISCLAIMER, ReportData
+
+TITLE = "CBT Micro-Session Report"
+
+# report_format -> (artifact filename, MIME type)
+MARKUP_FORMATS = {
+    "html": ("report.html", "text/html"),
+    "markdown": ("report.md", "text/markdown"),
+}
+
+_HTML_STYLE = (
+    "body{font-family:Helvetica,Arial,sans-serif;max-width:40em;margin:2em auto;padding:0 1em}"
+    "h1{color:#2563EB}table{border-collapse:collapse;width:100%}"
+    "th,td{border:1px solid #000;padding:.3em .5em;text-align:left;vertical-align:top}"
+    "th{background:grey;color:whitesmoke}td{background:beige}"
+    ".disclaimer{font-size:.8em;color:grey}"
+)
+
+
+def render_html(data: ReportData) -> str:
+    """Return the report as a standalone HTML page."""
+    rows = "".join(
+        f"<tr><td>{escape(str(field))}</td><td>{escape(str(entry))}</td></tr>"
+        for field, entry in data.snapshot
+    )
+    parts = [
+        '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">',
+        f"<title>{TITLE}</title><style>{_HTML_STYLE}</style></head><body>",
+        f"<h1>{TITLE}</h1>",
+        f"<p><b>Date:</b> {escape(data.date)}</p>",
+        "<h2>1. Your Situation Snapshot</h2>",
+        f"<table><tr><th>Field</th><th>Your Entry</th></tr>{rows}</table>",
+        "<h2>2. CBT Analysis</h2>",
+    ]
+    if data.structured:
+        if data.distortions:
+            parts.append(
+                "<p><b>Cognitive Distortions Identified:</b> "
+                f"{escape(', '.join(data.distortions))}</p>"
+            )
+        else:
+            parts.append("<p><b>No Cognitive Distortions Identified:</b></p>")
+        if data.balanced_thought:
+            parts.append(
+                "<p><b>A More Balanced Perspective:</b></p>"
+                f"<p><i>{escape(data.balanced_thought)}</i></p>"
+            )
+        if data.micro_action:
+            parts.append(
+                f"<p><b>Your Micro-Action Plan:</b></p><p><i>{escape(data.micro_action)}</i></p>"
+            )
+        if data.certainty is not None:
+            before, after = data.certainty
+            parts.append(
+                f"<p><b>Confidence Shift:</b> {escape(str(before))}% → {escape(str(after))}%</p>"
+            )
+    else:
+        parts += [f"<p>{escape(paragraph)}</p>" for paragraph in data.paragraphs]
+    parts.append(f'<p class="disclaimer">{DISCLAIMER}</p></body></html>\n')
+    return "\n".join(parts)
+
+
+def _md(text: object) -> str:
+    """Escape Markdown syntax in session text."""
+    out = str(text).replace("\\", "\\\\")
+    for char in "*_`[]<>#|":
+        out = out.replace(char, "\\" + char)
+    return out
+
+
+def render_markdown(data: ReportData) -> str:
+    """Return the report as Markdown."""
+    lines = [
+        f"# {TITLE}",
+        "",
+        f"**Date:** {_md(data.date)}",
+        "",
+        "## 1. Your Situation Snapshot",
+        "",
+        "| Field | Your Entry |",
+        "| --- | --- |",
+        *(f"| {_md(field)} | {' '.join(_md(entry).split())} |" for field, entry in data.snapshot),
+        "",
+        "## 2. CBT Analysis",
+        "",
+    ]
+    if data.structured:
+        if data.distortions:
+            lines += [
+                f"**Cognitive Distortions Identified:** {_md(', '.join(data.distortions))}",
+                "",
+            ]
+        else:
+            lines += ["**No Cognitive Distortions Identified:**", ""]
+        if data.balanced_thought:
+            lines += ["**A More Balanced Perspective:**", "", f"*{_md(data.balanced_thought)}*", ""]
+        if data.micro_action:
+            lines += ["**Your Micro-Action Plan:**", "", f"*{_md(data.micro_action)}*", ""]
+        if data.certainty is not None:
+            before, after = data.certainty
+            lines += [f"**Confidence Shift:** {_md(before)}% → {_md(after)}%", ""]
+    else:
+        for paragraph in data.paragraphs:
+            lines += [_md(paragraph), ""]
+    lines += ["---", "", f"*{DISCLAIMER}*", ""]
+    return "\n".join(lines)
+
+
+def render_markup(data: ReportData, report_format: str) -> str:
+    """Return the report in *report_format* (``"html"`` or ``"markdown"``)."""
+    if report_format == "html":
+        return render_html(data)
+    if report_format == "markdown":
+        return render_markdown(data)
+    raise ValueError(f"unsupported report format: {report_format}")
@@ -0,0 +1,168 @@
+"""Bounded worker pool that renders reports off the event loop.
+
+``build_pdf_bytes`` is pure CPU work - reportlab layout and PDF serialisation -
+and used to run straight inside ``PdfAgent``'s async generator, stalling the
+event loop, and with it every other session on the worker, for the whole
+render.  :class:`RenderPool` runs it on an executor instead and exposes an
+async API::
+
+    pdf_bytes = await get_render_pool().run(build_pdf_bytes, intake_data=..., analysis_output=...)
+
+* ``kind="process"`` (the default) renders in separate processes, so layout
+  does not even compete with the server for the GIL.  The function and its
+  arguments must be picklable.  Workers are started with ``spawn``: forking a
+  server that already runs threads is not safe.
+* ``kind="thread"`` renders on threads - cheaper to start, but the render still
+  holds the GIL for most of its runtime.
+
+At most ``max_pending`` renders are queued or running at a time; one more is
+rejected with :class:`RenderQueueFullError` instead of queueing without bound
+behind a slow worker.  A render that takes longer than ``timeout`` seconds
+raises :class:`RenderTimeoutError`.  A render that has already started cannot be
+interrupted, so its slot is only freed once it finishes.  Any other failure of
+the render itself is raised as :class:`RenderError` with the original exception
+as its cause, so callers handle one exception type.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import multiprocessing
+import threading
+from typing import Any, Literal, TypeVar
+
+from app.config.base import Settings
+
+settings = Settings()
+
+T = TypeVar("T")
+
+
+class RenderError(RuntimeError):
+    """A report could not be rendered by the pool."""
+
+
+class RenderQueueFullError(RenderError):
+    """The pool already has ``max_pending`` renders queued or running."""
+
+
+class RenderTimeoutError(RenderError):
+    """A render did not finish within the pool's timeout."""
+
+
+class RenderPool:
+    """Process or thread pool with an async API, bounded depth and a timeout."""
+
+    def __init__(
+        self,
+        kind: Literal["process", "thread"] = "process",
+        *,
+        max_workers: int = 2,
+        max_pending: int = 8,
+        timeout: float | None = 30.0,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"completed": 0, "rejected": 0, "timed_out": 0, "failed": 0}
+
+    @property
+    def pending(self) -> int:
+        """Renders queued or running right now."""
+        return self._pending
+
+    def stats(self) -> dict[str, int]:
+        """Return the pool's counters and current depth."""
+        with self._lock:
+            return {**self._stats, "pending": self._pending}
+
+    async def run(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the pool and return its result."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise RenderQueueFullError(f"{self._pending} renders already queued or running")
+            self._pending += 1
+
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._finished)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self._stats["timed_out"] += 1
+            raise RenderTimeoutError(f"render did not finish within {self.timeout}s") from None
+        except BrokenProcessPool as exc:
+            # A worker died (e.g. killed for memory); start a fresh pool next time.
+            self._reset_executor()
+            raise RenderError("the render worker process died") from exc
+        except Exception as exc:
+            raise RenderError(f"render failed: {exc!r}") from exc
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; the next render starts a new executor."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                    #
+    # ------------------------------------------------------------------ #
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="render"
+                    )
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finished(self, future: Future) -> None:
+        # Runs on the executor's thread once the render is done, even when the
+        # caller stopped waiting for it.
+        with self._lock:
+            if future.cancelled() or future.exception() is not None:
+                self._stats["failed"] += 1
+            else:
+                self._stats["completed"] += 1
+        self._release()
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+@lru_cache
+def get_render_pool() -> RenderPool:
+    """Return the process-wide render pool configured by ``Settings``."""
+    return RenderPool(
+        settings.pdf_render_pool,
+        max_workers=settings.pdf_render_workers,
+        max_pending=settings.pdf_render_max_pending,
+        timeout=settings.pdf_render_timeout,
+    )
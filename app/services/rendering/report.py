@@ -0,0 +1,241 @@
+"""Report template built once per process, rendered from a small data model.
+
+``build_pdf_bytes`` used to call ``getSampleStyleSheet()``, create its
+``ParagraphStyle``/``TableStyle`` objects and rebuild the distortion map on
+every report, work that is the same for every report.  Now:
+
+* :class:`ReportData` holds what changes between reports - the rows of the
+  situation snapshot and the analysis, either its structured fields or its
+  plain-text paragraphs - extracted from the session's ``parsed`` record and
+  ``cbt_analysis`` text by :meth:`ReportData.from_session`;
+* :class:`ReportTemplate` builds the style sheet, the custom paragraph styles
+  and the snapshot table style once (``get_report_template`` is an
+  ``lru_cache`` factory, like ``get_render_pool``) and only lays out the
+  flowables of one report in :meth:`ReportTemplate.render`.  The flowables
+  come in two parts, :meth:`ReportTemplate.intake_story` and
+  :meth:`ReportTemplate.analysis_story`, so the intake section can be laid out
+  before the analysis exists (see :mod:`app.services.rendering.staged`).
+
+Styles are only read while a document is built, so one template serves every
+render thread.  Flowables hold layout state and are created per report.
+
+Session text is escaped before it goes into a ``Paragraph``: its mini-markup
+would otherwise interpret ``<i>`` in the user's words, and reject a stray
+``<`` with a ``ValueError``.  Table cells are plain strings and need no escaping.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+from io import BytesIO
+from typing import Any
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.services.parsing.json_stream import extract_json_object
+
+# Bump when the layout changes: rendered PDFs are cached under this version
+# (see app.services.cache.renders).
+TEMPLATE_VERSION = "2"
+
+DISTORTION_NAMES = {
+    "MW": "Mind Reading",
+    "FT": "Fortune Telling",
+    "CT": "Catastrophizing",
+    "AO": "All-or-Nothing",
+    "MF": "Mental Filter",
+    "PR": "Personalization",
+    "LB": "Labeling",
+    "SH": "Should Statements",
+    "ER": "Emotional Reasoning",
+    "DP": "Discounting Positive",
+}
+DISCLAIMER = "This is an educational tool, not a substitute for clinical diagnosis or therapy."
+
+
+@dataclass(frozen=True, slots=True)
+class ReportData:
+    """Everything that differs between two reports."""
+
+    date: str
+    snapshot: tuple[tuple[Any, Any], ...]
+    """``(field, entry)`` rows of the situation snapshot table."""
+    structured: bool = False
+    """The analysis was JSON; otherwise it is rendered from ``paragraphs``."""
+    distortions: tuple[str, ...] = ()
+    balanced_thought: str = ""
+    micro_action: str = ""
+    certainty: tuple[Any, Any] | None = None
+    paragraphs: tuple[str, ...] = ()
+
+    @classmethod
+    def from_session(
+        cls, intake_data: Mapping[str, Any], analysis_output: str, *, date: str | None = None
+    ) -> ReportData:
+        """Extract the report data from the parsed intake record and the analysis text."""
+        if date is None:
+            date = datetime.now(UTC).strftime("%Y-%m-%d")
+
+        # Handle both old format and new parsed format
+        if "situation" in intake_data:
+            snapshot: tuple[tuple[Any, Any], ...] = (
+                ("Situation", intake_data.get("situation", "Not provided")),
+                ("Thoughts", ", ".join(intake_data.get("thoughts", ["Not provided"]))),
+                ("Feelings", ", ".join(intake_data.get("feelings", ["Not provided"]))),
+                ("Behaviors", ", ".join(intake_data.get("behaviors", ["Not provided"]))),
+                ("Outcome", intake_data.get("outcome", "Not provided")),
+            )
+        else:
+            emotion = intake_data.get("emotion_data", {})
+            snapshot = (
+                ("Situation", intake_data.get("trigger_situation", "Not provided")),
+                ("Automatic Thought", f'"{intake_data.get("automatic_thought", "Not provided")}"'),
+                (
+                    "Initial Emotion",
+                    f'{emotion.get("emotion", "Unknown")} ({emotion.get("intensity", 0)}/10)',
+                ),
+            )
+
+        # Parse analysis JSON if it contains JSON (fenced or inline)
+        analysis = extract_json_object(analysis_output) or {}
+        if not analysis:
+            paragraphs = tuple(p.strip() for p in analysis_output.split("\n\n") if p.strip())
+            return cls(date=date, snapshot=snapshot, paragraphs=paragraphs)
+
+        certainty = None
+        if "certainty_before" in analysis and "certainty_after" in analysis:
+            certainty = (analysis["certainty_before"], analysis["certainty_after"])
+        return cls(
+            date=date,
+            snapshot=snapshot,
+            structured=True,
+            distortions=tuple(
+                str(DISTORTION_NAMES.get(d, d)) for d in analysis.get("distortions", [])
+            ),
+            balanced_thought=analysis.get("balanced_thought") or "",
+            micro_action=analysis.get("micro_action") or "",
+            certainty=certainty,
+        )
+
+
+class ReportTemplate:
+    """Styles of the CBT micro-session report, built once."""
+
+    def __init__(self) -> None:
+        styles = getSampleStyleSheet()
+        self.normal = styles["Normal"]
+        self.heading = styles["Heading2"]
+        self.title = ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=24,
+            textColor=colors.HexColor("#2563EB"),
+            spaceAfter=30,
+        )
+        self.disclaimer = ParagraphStyle(
+            "Disclaimer", parent=styles["Normal"], fontSize=9, textColor=colors.grey
+        )
+        self.snapshot_style = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 12),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+            ]
+        )
+        self.snapshot_widths = [2 * inch, 4 * inch]
+
+    def render(self, data: ReportData) -> bytes:
+        """Lay out one report and return the PDF bytes."""
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        doc.build(self.story(data))
+        return buffer.getvalue()
+
+    def story(self, data: ReportData) -> list:
+        """Return the flowables of one report."""
+        return self.intake_story(data) + self.analysis_story(data)
+
+    def intake_story(self, data: ReportData) -> list:
+        """Return the flowables up to the situation snapshot, which only need the intake."""
+        story: list = [
+            Paragraph("CBT Micro-Session Report", self.title),
+            Spacer(1, 0.2 * inch),
+            Paragraph(f"<b>Date:</b> {escape(data.date)}", self.normal),
+            Spacer(1, 0.3 * inch),
+            # Section 1: Situation Snapshot
+            Paragraph("<b>1. Your Situation Snapshot</b>", self.heading),
+            Spacer(1, 0.1 * inch),
+        ]
+        table = Table(
+            [["Field", "Your Entry"], *map(list, data.snapshot)], colWidths=self.snapshot_widths
+        )
+        table.setStyle(self.snapshot_style)
+        return [*story, table, Spacer(1, 0.3 * inch)]
+
+    def analysis_story(self, data: ReportData) -> list:
+        """Return the flowables of the analysis section and the disclaimer."""
+        normal = self.normal
+        story: list = [
+            # Section 2: Analysis
+            Paragraph("<b>2. CBT Analysis</b>", self.heading),
+            Spacer(1, 0.1 * inch),
+        ]
+
+        if data.structured:
+            if data.distortions:
+                story.append(
+                    Paragraph(
+                        "<b>Cognitive Distortions Identified:</b> "
+                        + escape(", ".join(data.distortions)),
+                        normal,
+                    )
+                )
+            else:
+                story.append(Paragraph("<b>No Cognitive Distortions Identified:</b>", normal))
+            story.append(Spacer(1, 0.2 * inch))
+
+            if data.balanced_thought:
+                story += [
+                    Paragraph("<b>A More Balanced Perspective:</b>", normal),
+                    Paragraph(f"<i>{escape(data.balanced_thought)}</i>", normal),
+                    Spacer(1, 0.2 * inch),
+                ]
+            if data.micro_action:
+                story += [
+                    Paragraph("<b>Your Micro-Action Plan:</b>", normal),
+                    Paragraph(f"<i>{escape(data.micro_action)}</i>", normal),
+                    Spacer(1, 0.2 * inch),
+                ]
+            if data.certainty is not None:
+                before, after = data.certainty
+                story.append(
+                    Paragraph(
+                        f"<b>Confidence Shift:</b> {escape(str(before))}% → {escape(str(after))}%",
+                        normal,
+                    )
+                )
+        else:
+            for paragraph in data.paragraphs:
+                story += [Paragraph(escape(paragraph), normal), Spacer(1, 0.1 * inch)]
+
+        story += [Spacer(1, 0.3 * inch), Paragraph(DISCLAIMER, self.disclaimer)]
+        return story
+
+
+@lru_cache
+def get_report_template() -> ReportTemplate:
+    """Return the process-wide report template."""
+    return ReportTemplate()
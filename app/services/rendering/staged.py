@@ -0,0 +1,224 @@
+"""Reports laid out in two stages, the intake section ahead of the analysis.
+
+The situation snapshot on page one of the report depends only on the parsed
+intake record, yet ``PdfAgent`` used to lay out the whole report after
+``analysis_loop`` had finished, so all of the rendering added to the latency of
+the session's last turn.  The report is now built in two stages:
+
+1. when ``JsonParserAgent`` stores ``state["parsed"]``,
+   :meth:`ReportStages.start` opens the document and lays out the title, the
+   date and the snapshot table (:meth:`ReportTemplate.intake_story`) on the
+   render pool, while the analysis LLM runs;
+2. ``PdfAgent`` takes the staged report with :meth:`ReportStages.take` and
+   :meth:`ReportStages.finish` adds the analysis section, closes the last page
+   and serialises the PDF.
+
+reportlab lays out and draws a document in one ``build`` call, so
+:class:`StagedDocTemplate` runs the same loop in pieces: page one's intake
+section is already drawn on the canvas when the analysis arrives, and the PDF
+is the one ``ReportTemplate.render`` would have produced for the same data.
+
+A staged document lives in this process only and is keyed by the session id
+and :func:`~app.services.cache.renders.intake_key`.  It cannot be pickled into a
+render worker process, so staging is opt-in (``pdf_staged_render``) and only
+takes effect when the render pool runs on threads (``pdf_render_pool =
+"thread"``); both stages then run on that pool, under its depth limit and
+timeout.  Otherwise the whole report is rendered in one go, as are reports with
+no staged document or whose record changed since it was staged.  At most
+``max_sessions`` staged reports are kept; abandoned sessions are dropped oldest
+first.
+
+:class:`StagedDocTemplate` relies on reportlab internals (``_calc``,
+``_startBuild``, ``handle_flowable``, ``_endBuild``), so staging also stays off
+unless the installed reportlab is in :data:`REPORTLAB_VERSIONS`, the release
+series it was checked against, and still has them.  If they misbehave anyway,
+the staged render fails and ``PdfAgent`` renders in full.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Hashable, Mapping
+from functools import lru_cache
+from io import BytesIO
+import threading
+from typing import Any
+
+import reportlab
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Frame, PageTemplate, SimpleDocTemplate
+
+from app.config.base import Settings
+from app.services.cache.renders import intake_key
+from app.services.rendering.pool import RenderError, RenderPool, get_render_pool
+from app.services.rendering.report import ReportData, ReportTemplate, get_report_template
+
+settings = Settings()
+
+# Oldest and newest reportlab release series (major, minor) StagedDocTemplate
+# was checked against: the staged report matches a full render byte for byte.
+REPORTLAB_VERSIONS = ((4, 4), (5, 0))
+REPORTLAB_INTERNALS = ("_calc", "_startBuild", "handle_flowable", "clean_hanging", "_endBuild")
+
+
+class StagedDocTemplate(SimpleDocTemplate):
+    """``SimpleDocTemplate`` whose build is split into :meth:`begin`, :meth:`add` and :meth:`end`.
+
+    ``begin() + add(a) + add(b) + end()`` does what ``build(a + b)`` does, minus
+    the progress callbacks and ``PageBreakIfNotEmpty`` handling the report does
+    not use.
+    """
+
+    def begin(self, canvasmaker=canvas.Canvas) -> None:
+        """Set up the page templates and the canvas, as ``build`` does first."""
+        self._calc()
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id="normal")
+        self.addPageTemplates(
+            [
+                PageTemplate(id="First", frames=frame, pagesize=self.pagesize),
+                PageTemplate(id="Later", frames=frame, pagesize=self.pagesize),
+            ]
+        )
+        self._startBuild(canvasmaker=canvasmaker)
+        self._savedInfo = self.canv._doc.info
+
+    def add(self, flowables: list) -> None:
+        """Lay out and draw *flowables* after the ones added before."""
+        canv = self.canv
+        canv._doctemplate = self
+        try:
+            while flowables:
+                self.clean_hanging()
+                self.handle_flowable(flowables)
+        finally:
+            del canv._doctemplate
+
+    def end(self) -> None:
+        """Close the last page and write the PDF."""
+        self.canv._doc.info = self._savedInfo
+        self._endBuild()
+
+
+def reportlab_supported(version: str | None = None) -> bool:
+    """Return whether :class:`StagedDocTemplate` can split a build with this reportlab."""
+    try:
+        series = tuple(int(part) for part in (version or reportlab.Version).split(".")[:2])
+    except ValueError:
+        return False
+    oldest, newest = REPORTLAB_VERSIONS
+    return oldest <= series <= newest and all(
+        callable(getattr(StagedDocTemplate, name, None)) for name in REPORTLAB_INTERNALS
+    )
+
+
+class StagedReport:
+    """One report whose intake section can be laid out before its analysis exists."""
+
+    def __init__(
+        self,
+        intake_data: Mapping[str, Any],
+        template: ReportTemplate | None = None,
+        *,
+        date: str | None = None,
+    ) -> None:
+        self.intake_data = dict(intake_data)
+        self.key = intake_key(intake_data)
+        self.date = ReportData.from_session(intake_data, "", date=date).date
+        self._template = template or get_report_template()
+        self._buffer = BytesIO()
+        self._doc = StagedDocTemplate(self._buffer, pagesize=letter)
+        self._lock = threading.Lock()
+        self._stage = 0  # 0: nothing laid out, 1: intake section, 2: finished
+
+    @property
+    def intake_ready(self) -> bool:
+        """The intake section has been laid out."""
+        return self._stage >= 1
+
+    def lay_out_intake(self) -> None:
+        """Open the document and lay out the intake section (once)."""
+        with self._lock:
+            if self._stage:
+                return
+            data = ReportData.from_session(self.intake_data, "", date=self.date)
+            self._doc.begin()
+            self._doc.add(self._template.intake_story(data))
+            self._stage = 1
+
+    def finish(self, analysis_output: str) -> bytes:
+        """Add the analysis section and return the PDF bytes."""
+        self.lay_out_intake()  # a no-op unless the first stage never ran
+        with self._lock:
+            if self._stage != 1:
+                raise RuntimeError("staged report already finished")
+            data = ReportData.from_session(self.intake_data, analysis_output, date=self.date)
+            self._doc.add(self._template.analysis_story(data))
+            self._doc.end()
+            self._stage = 2
+            return self._buffer.getvalue()
+
+
+class ReportStages:
+    """Process-wide staged reports, keyed by session, laid out on the render pool."""
+
+    def __init__(self, max_sessions: int = 256, *, pool: RenderPool | None = None) -> None:
+        self.max_sessions = max_sessions
+        self.pool = pool if pool is not None else get_render_pool()
+        self._reports: OrderedDict[Hashable, StagedReport] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+    @property
+    def enabled(self) -> bool:
+        """Reports can be staged: the pool shares this process's memory and reportlab is supported."""
+        return self.pool.kind == "thread" and reportlab_supported()
+
+    def start(self, session_id: Hashable, intake_data: Mapping[str, Any]) -> StagedReport:
+        """Stage the report of *session_id* and lay out its intake section in the background.
+
+        Must be called on the event loop; the layout runs as a task on the render pool.
+        """
+        report = StagedReport(intake_data)
+        with self._lock:
+            self._reports.pop(session_id, None)
+            self._reports[session_id] = report
+            while len(self._reports) > self.max_sessions:
+                self._reports.popitem(last=False)
+        task = asyncio.get_running_loop().create_task(self._lay_out_intake(report))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return report
+
+    def take(self, session_id: Hashable, intake_data: Mapping[str, Any]) -> StagedReport | None:
+        """Remove and return the staged report of *session_id* if it was staged from *intake_data*."""
+        with self._lock:
+            report = self._reports.pop(session_id, None)
+        if report is None or report.key != intake_key(intake_data):
+            return None
+        return report
+
+    async def _lay_out_intake(self, report: StagedReport) -> None:
+        try:
+            await self.pool.run(report.lay_out_intake)
+        except RenderError as exc:  # e.g. the pool is full: finish() lays it out
+            print(f"[ReportStages] Intake section not laid out early: {exc}")
+
+    async def finish(self, report: StagedReport, analysis_output: str) -> bytes:
+        """Finish *report* on the render pool and return the PDF bytes."""
+        return await self.pool.run(report.finish, analysis_output)
+
+    def clear(self) -> None:
+        """Drop every staged report."""
+        with self._lock:
+            self._reports.clear()
+
+
+@lru_cache
+def get_report_stages() -> ReportStages:
+    """Return the process-wide staged reports configured in ``Settings``."""
+    return ReportStages(max_sessions=settings.report_stage_max_sessions)
@@ -0,0 +1,98 @@
+"""Word lists and weights for the local content scorer.
+
+The lexicon is deliberately small and conservative.  Our users routinely turn
+harsh words on *themselves* ("I'm so stupid", "soy un inútil") and talk about
+dark thoughts; that is exactly what the intake is for and must never be
+filtered.  Insults therefore carry a low weight on their own and only count in
+full when they are aimed at a second person ("you idiot", "eres un imbécil"),
+and threat phrases only match when they target "you".
+
+Words and phrases are written in their natural spelling (phrases without
+accents or punctuation); :mod:`app.services.safety.toxicity`
+normalises them (lowercase, no accents, leetspeak folded) when it compiles the
+lookup table at import time.
+"""
+
+from __future__ import annotations
+
+
+def _words(text: str) -> tuple[str, ...]:
+    return tuple(text.split())
+
+
+# category -> (base weight, words); languages: en, es, fr, de, it, pt, ca.
+WORD_LEXICON: dict[str, tuple[float, tuple[str, ...]]] = {
+    "insult": (
+        0.4,
+        _words("""
+            idiot stupid moron dumb loser pathetic worthless useless imbecile jerk
+            asshole bitch bastard scum trash garbage dickhead prick twat cunt
+            idiota estúpido estúpida imbécil gilipollas tonto tonta inútil subnormal
+            cabrón cabrona pendejo pendeja basura capullo zorra mamón
+            connard connasse conne débile abruti salaud salope
+            arschloch dummkopf vollidiot wichser miststück
+            stronzo stronza cretino coglione deficiente
+            otário imbecil babaca burro
+            imbècil capsigrany desgraciat
+            """),
+    ),
+    "profanity": (
+        0.6,
+        _words("""
+            fuck fucking fucker motherfucker shit bullshit
+            mierda joder coño hostia puta puto
+            putain merde scheiße scheisse cazzo porra merda caralho collons
+            """),
+    ),
+}
+
+# Words that aim an insult at the reader (en, es, fr, de, it, pt, ca).
+SECOND_PERSON: tuple[str, ...] = _words("""
+    you your youre yourself u ur ya
+    tu tú te eres usted vosotros sois
+    toi du bist dich dir sei ti você voce ets
+    """)
+
+# Multiplier for an insult that follows a second-person word closely.
+TARGETED_MULTIPLIER = 5.0
+# How many tokens after a second-person word an insult still counts as targeted.
+TARGET_WINDOW = 5
+
+# Verbs that introduce reported speech ("my boss said you're useless", "me dijo
+# que eres un inútil").  A second-person word shortly after one of them - or
+# inside quotes - addresses whoever the abuse was aimed at, not the reader: users
+# describing abuse they received must not be filtered for repeating it.
+REPORTING_VERBS: tuple[str, ...] = _words("""
+    said says told tells called calls yelled shouted screamed wrote texted
+    dijo dice decia llamo grito escribio insulto
+    dit disait sagte schrieb disse diceva scrisse falou
+    """)
+
+# Subjects that make a reporting verb the writer's own words ("I told you, you
+# idiot"), which still count.
+FIRST_PERSON: tuple[str, ...] = _words("i we yo nosotros je nous ich wir io noi eu nos jo")
+
+# How many tokens after a reporting verb are treated as reported speech.
+REPORTED_WINDOW = 8
+
+# Threats and harassment aimed at the reader, as regular expressions over the
+# normalised text.  Each one is a strong signal on its own.
+THREAT_PATTERNS: tuple[tuple[float, str], ...] = (
+    (3.0, r"\bi (?:will|ll|am going to|m going to|m gonna|gonna) (?:kill|hurt|find) you\b"),
+    (3.0, r"\byou(?: re| are) (?:dead|going to die)\b"),
+    (3.0, r"\b(?:go )?kill yourself\b|\bkys\b"),
+    (3.0, r"\bte (?:voy a|vamos a) (?:matar|encontrar|destrozar|reventar)\b"),
+    (3.0, r"\bte (?:mato|matare)\b|\bmatate\b|\bojala te mueras\b"),
+    (3.0, r"\bje vais te tuer\b|\bcreve\b"),
+    (3.0, r"\bich bring dich um\b|\bich bringe dich um\b"),
+    (3.0, r"\bti ammazzo\b|\bti uccido\b"),
+    (3.0, r"\bvou te matar\b"),
+    (3.0, r"\bet matare\b"),
+)
+
+# The threat patterns only run on messages containing one of these words.
+THREAT_TRIGGERS: tuple[str, ...] = _words("""
+    kill hurt find dead die yourself kys
+    matar encontrar destrozar reventar mato matare matate mueras
+    tuer creve um ammazzo uccido
+    """)
@@ -0,0 +1,52 @@
+"""Minimal client for a Perspective-compatible ``comments:analyze`` endpoint.
+
+Only used as a second opinion for messages the local scorer places in its gray
+zone (see :class:`app.callbacks.content_filter.ContentFilter`), so it is a
+small blocking ``urllib`` client meant to be called from a worker thread.  Any
+server speaking the same JSON - Google's Perspective API or a local stub in
+tests - can stand behind ``url``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+import json
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+DEFAULT_URL = "https://commentanalyzer.googleapis.com/v1alpha1/comments:analyze"
+
+
+class PerspectiveError(RuntimeError):
+    """The remote scorer could not be reached or answered something unexpected."""
+
+
+class PerspectiveClient:
+    """Ask a Perspective-compatible endpoint for a ``TOXICITY`` probability."""
+
+    def __init__(self, api_key: str, url: str = DEFAULT_URL, timeout: float = 2.0) -> None:
+        self.url = f"{url}?{urlencode({'key': api_key})}"
+        self.timeout = timeout
+
+    def score(self, text: str, languages: Sequence[str] = ()) -> float:
+        """Return the summary ``TOXICITY`` score of *text* (0.0 - 1.0)."""
+        body: dict = {
+            "comment": {"text": text},
+            "requestedAttributes": {"TOXICITY": {}},
+            "doNotStore": True,
+        }
+        if languages:
+            body["languages"] = list(languages)
+
+        request = Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+            return float(payload["attributeScores"]["TOXICITY"]["summaryScore"]["value"])
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            raise PerspectiveError(f"Perspective request failed: {exc}") from exc
@@ -0,0 +1,230 @@
+"""Local lexicon- and feature-based content scorer.
+
+Scores abusive language without any network call, so it can run on every
+model request.  The word lists in :mod:`app.services.safety.lexicon` are
+compiled **once per process** into a single ``word -> (category, weight)``
+table and the threat phrases into one alternation, which only runs on a few
+words around the handful of trigger words they contain.  Scoring a message is one
+normalisation pass, one tokenising regex and one set intersection; the
+per-token loop only runs for messages that contain a lexicon word.
+
+The score is additive and unbounded (compare it with
+``Settings.content_filter_threshold``):
+
+* every lexicon word adds its category weight; insults count
+  ``TARGETED_MULTIPLIER`` times when they closely follow a second-person word,
+  so self-talk ("I'm so stupid") stays far below the threshold;
+* every threat phrase aimed at the reader adds its (high) weight;
+* reported speech is not aimed at the reader: inside quotes, and for a few
+  words after a reporting verb ("my boss said ...", "me dijo ..."), a
+  second-person word does not target an insult and threat phrases do not
+  count, so users can describe abuse they received;
+* messages that already contain abuse get small boosts for shouting (mostly
+  uppercase) and for runs of exclamation marks.
+
+Normalisation lowercases, folds common leetspeak (``1d10t``) and strips
+accents; tokens are the remaining runs of ASCII letters, so the phrase patterns
+and the lexicon only ever see plain words.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+import re
+from typing import NamedTuple
+import unicodedata
+
+from app.services.safety.lexicon import (
+    FIRST_PERSON,
+    REPORTED_WINDOW,
+    REPORTING_VERBS,
+    SECOND_PERSON,
+    TARGET_WINDOW,
+    TARGETED_MULTIPLIER,
+    THREAT_PATTERNS,
+    THREAT_TRIGGERS,
+    WORD_LEXICON,
+)
+
+_LEET = str.maketrans("013457@$", "oieastas")
+# Typographic double quotes, folded to ``"`` before accents are stripped.
+_QUOTES = str.maketrans("“”„«»", '"""""')
+_QUOTED = re.compile(r'"[^"]*"')
+_WORD = re.compile(r"[a-z]+")
+# Three or more repetitions of a letter ("stuuupid", "fuuuck").
+_ELONGATED = re.compile(r"([a-z])\1\1+")
+
+# Words around a trigger word that a threat phrase may span.
+_THREAT_CONTEXT = 5
+
+# Feature boosts, only applied to messages with at least one lexicon or threat hit.
+_SHOUTING_BOOST = 0.5
+_SHOUTING_MIN_LETTERS = 10
+_SHOUTING_RATIO = 0.6
+_EXCLAMATION_BOOST = 0.3
+
+
+class ContentScore(NamedTuple):
+    score: float
+    categories: tuple[str, ...]
+
+
+def fold(text: str) -> str:
+    """Return *text* lowercased, de-leeted and without accents."""
+    folded = text.lower()
+    if not folded.isascii():
+        folded = folded.replace("ß", "ss").translate(_QUOTES)
+        folded = unicodedata.normalize("NFKD", folded).encode("ascii", "ignore").decode()
+    # ``str.translate`` has a fast path for ASCII-only strings, so fold leetspeak last.
+    return folded.translate(_LEET)
+
+
+def normalise(text: str) -> str:
+    """Return the folded words of *text* separated by single spaces."""
+    return " ".join(_WORD.findall(fold(text)))
+
+
+class LexiconScorer:
+    """Additive abuse scorer over precompiled word weights and threat phrases."""
+
+    def __init__(
+        self,
+        lexicon: Mapping[str, tuple[float, Iterable[str]]] = WORD_LEXICON,
+        threats: Iterable[tuple[float, str]] = THREAT_PATTERNS,
+        threat_triggers: Iterable[str] = THREAT_TRIGGERS,
+        second_person: Iterable[str] = SECOND_PERSON,
+        reporting_verbs: Iterable[str] = REPORTING_VERBS,
+        first_person: Iterable[str] = FIRST_PERSON,
+    ) -> None:
+        # ``word -> (category, weight)`` over normalised spellings.
+        self._words: dict[str, tuple[str, float]] = {}
+        for category, (weight, words) in lexicon.items():
+            for word in words:
+                self._words.setdefault(normalise(word), (category, weight))
+
+        self._second_person = frozenset(normalise(word) for word in second_person)
+        self._reporting_verbs = frozenset(normalise(word) for word in reporting_verbs)
+        self._first_person = frozenset(normalise(word) for word in first_person)
+
+        threats = tuple(threats)
+        # One alternation with a group per phrase (phrases must not capture), so
+        # ``match.lastindex`` identifies the phrase and its weight.
+        self._threat_re = re.compile("|".join(f"({pattern})" for _, pattern in threats))
+        self._threat_weights = [weight for weight, _ in threats]
+        self._threat_triggers = frozenset(threat_triggers)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                          #
+    # ------------------------------------------------------------------ #
+    def score(self, text: str) -> ContentScore:
+        """Score one message."""
+        folded = fold(text)
+        tokens = _WORD.findall(folded)
+        if not tokens:
+            return ContentScore(0.0, ())
+
+        total = 0.0
+        categories: set[str] = set()
+
+        token_set = set(tokens)
+        scored_words = not self._words.keys().isdisjoint(token_set) or _ELONGATED.search(folded)
+        scored_threats = not self._threat_triggers.isdisjoint(token_set)
+        if not (scored_words or scored_threats):
+            return ContentScore(0.0, ())
+
+        reported = self._reported(folded, tokens, token_set)
+        if scored_words:
+            total = self._score_words(tokens, categories, reported)
+        if scored_threats:
+            total += self._score_threats(tokens, categories, reported)
+
+        if total:
+            total += self._feature_boost(text, tokens)
+        return ContentScore(round(total, 4), tuple(sorted(categories)))
+
+    def score_batch(self, texts: Sequence[str]) -> list[ContentScore]:
+        """Score several messages (or message parts) in one call."""
+        score = self.score
+        return [score(text) for text in texts]
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                    #
+    # ------------------------------------------------------------------ #
+    def _reported(self, folded: str, tokens: list[str], token_set: set[str]) -> frozenset[int]:
+        """Return the indices of *tokens* in quotes or shortly after a reporting verb."""
+        if '"' not in folded and self._reporting_verbs.isdisjoint(token_set):
+            return frozenset()
+        reported: set[int] = set()
+        for match in _QUOTED.finditer(folded):
+            start = len(_WORD.findall(folded, 0, match.start()))
+            reported.update(range(start, start + len(_WORD.findall(match.group()))))
+        for i, token in enumerate(tokens):
+            if token in self._reporting_verbs and (
+                i == 0 or tokens[i - 1] not in self._first_person
+            ):
+                reported.update(range(i + 1, i + 1 + REPORTED_WINDOW))
+        return frozenset(reported)
+
+    def _score_words(
+        self, tokens: list[str], categories: set[str], reported: frozenset[int] = frozenset()
+    ) -> float:
+        """Sum the lexicon weights of *tokens*, boosting insults aimed at the reader."""
+        total = 0.0
+        since_second_person = TARGET_WINDOW + 1
+        for i, token in enumerate(tokens):
+            if token in self._second_person and i not in reported:
+                since_second_person = 0
+                continue
+            since_second_person += 1
+            hit = self._words.get(token) or self._lookup_elongated(token)
+            if hit is None:
+                continue
+            category, weight = hit
+            if category == "insult" and since_second_person <= TARGET_WINDOW:
+                weight *= TARGETED_MULTIPLIER
+            total += weight
+            categories.add(category)
+        return total
+
+    def _score_threats(
+        self, tokens: list[str], categories: set[str], reported: frozenset[int] = frozenset()
+    ) -> float:
+        """Match the threat phrases in windows of text around their trigger words."""
+        windows: list[list[int]] = []
+        for i, token in enumerate(tokens):
+            if token not in self._threat_triggers or i in reported:
+                continue
+            start, end = max(0, i - _THREAT_CONTEXT), i + _THREAT_CONTEXT + 1
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = end
+            else:
+                windows.append([start, end])
+
+        total = 0.0
+        for start, end in windows:
+            for match in self._threat_re.finditer(" ".join(tokens[start:end])):
+                total += self._threat_weights[match.lastindex - 1]
+                categories.add("threat")
+        return total
+
+    def _lookup_elongated(self, token: str) -> tuple[str, float] | None:
+        if len(token) < 4 or not _ELONGATED.search(token):
+            return None
+        return self._words.get(_ELONGATED.sub(r"\1", token)) or self._words.get(
+            _ELONGATED.sub(r"\1\1", token)
+        )
+
+    @staticmethod
+    def _feature_boost(text: str, tokens: list[str]) -> float:
+        boost = 0.0
+        letters = sum(map(len, tokens))
+        if letters >= _SHOUTING_MIN_LETTERS:
+            upper = sum(map(str.isupper, text))
+            if upper / letters >= _SHOUTING_RATIO:
+                boost += _SHOUTING_BOOST
+        if "!!!" in text:
+            boost += _EXCLAMATION_BOOST
+        return boost
+
+
+scorer = LexiconScorer()
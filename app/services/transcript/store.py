@@ -0,0 +1,183 @@
+"""Compact, state-backed conversation transcript shared by the intake pipeline.
+
+The session holds exactly **one** copy of the conversation: the append-only
+entries written by :class:`~app.callbacks.transcript_acc.TranscriptAccumulator`
+(``conv_raw.0``, ``conv_raw.1``, ... plus the ``conv_len`` counter).  Each entry
+is persisted as a compact ``[role, text]`` pair.
+
+Everything that needs the conversation - the accumulator, the ``exit_loop``
+tool and ``JsonParserAgent`` - goes through :class:`Transcript`, which wraps the
+state mapping, materialises slotted :class:`TranscriptEntry` objects on demand
+and caches the ``"role: text"`` rendering so it is only built once per object.
+The end of the intake is recorded as an entry count (``intake_len``) rather
+than as another rendered copy of the text.
+
+``LoopAgent`` re-runs its sub-agents against the same user message within one
+invocation, so appends can be made idempotent per turn with
+:meth:`Transcript.append_once`: a small index (``conv_turn``) keeps the content
+hashes already recorded for the current invocation and is reset when the next
+invocation starts, so it never grows with the conversation.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, MutableMapping
+from dataclasses import dataclass
+import hashlib
+from typing import Any
+
+CONV_RAW_KEY = "conv_raw"
+CONV_LEN_KEY = "conv_len"
+INTAKE_LEN_KEY = "intake_len"
+TURN_INDEX_KEY = "conv_turn"
+
+
+def entry_key(index: int) -> str:
+    """Return the state key holding the append-only entry at *index*."""
+    return f"{CONV_RAW_KEY}.{index}"
+
+
+def content_digest(role: str, text: str) -> str:
+    """Return a short, stable hash identifying one entry's content."""
+    return hashlib.blake2b(f"{role}\0{text}".encode(), digest_size=8).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class TranscriptEntry:
+    """One conversation turn from a single speaker."""
+
+    role: str
+    text: str
+
+    @classmethod
+    def from_record(cls, record: Any) -> TranscriptEntry:
+        """Build an entry from its persisted form (``[role, text]`` or a legacy dict)."""
+        if isinstance(record, dict):
+            return cls(record.get("role", "unknown"), record.get("text", ""))
+        role, text = record
+        return cls(role, text)
+
+    def to_record(self) -> list[str]:
+        """Return the compact, JSON-serialisable form stored in session state."""
+        return [self.role, self.text]
+
+    def render(self) -> str:
+        return f"{self.role}: {self.text}"
+
+
+class Transcript:
+    """View over the conversation stored in a session state mapping."""
+
+    __slots__ = ("_entries", "_rendered", "_rendered_count", "_state")
+
+    def __init__(self, state: MutableMapping[str, Any]) -> None:
+        self._state = state
+        self._entries: list[TranscriptEntry] | None = None
+        self._rendered = ""
+        self._rendered_count = 0
+
+    def __len__(self) -> int:
+        count = self._state.get(CONV_LEN_KEY)
+        if count is not None:
+            return int(count)
+        # Sessions written before the append-only layout keep a single list.
+        return len(self._state.get(CONV_RAW_KEY, []))
+
+    def __iter__(self) -> Iterator[TranscriptEntry]:
+        return iter(self.entries())
+
+    def entries(self) -> list[TranscriptEntry]:
+        """Return all entries, loading them from state on first access."""
+        if self._entries is None:
+            if CONV_LEN_KEY in self._state:
+                records = [self._state[entry_key(i)] for i in range(len(self))]
+            else:
+                records = self._state.get(CONV_RAW_KEY, [])
+            self._entries = [TranscriptEntry.from_record(record) for record in records]
+        return self._entries
+
+    def append(self, role: str, text: str) -> TranscriptEntry:
+        """Append one entry, writing only the new key and the counter to state."""
+        entry = TranscriptEntry(role, text)
+        if CONV_LEN_KEY not in self._state:
+            self._migrate_legacy()
+        count = len(self)
+        self._state[entry_key(count)] = entry.to_record()
+        self._state[CONV_LEN_KEY] = count + 1
+        if self._entries is not None:
+            self._entries.append(entry)
+        return entry
+
+    def _migrate_legacy(self) -> None:
+        """Copy a legacy ``conv_raw`` list into append-only keys before the first append."""
+        records = self._state.get(CONV_RAW_KEY, [])
+        for index, record in enumerate(records):
+            self._state[entry_key(index)] = TranscriptEntry.from_record(record).to_record()
+        self._state[CONV_LEN_KEY] = len(records)
+
+    def replace_last(self, role: str, text: str) -> TranscriptEntry:
+        """Replace the last entry if it is from *role*, else append a new one.
+
+        For a reply that a later callback rewrites after the accumulator
+        recorded it, so the transcript holds what was actually sent.
+        """
+        count = len(self)
+        if not count or self.entries()[-1].role != role:
+            return self.append(role, text)
+        entry = TranscriptEntry(role, text)
+        if CONV_LEN_KEY in self._state:
+            self._state[entry_key(count - 1)] = entry.to_record()
+        else:
+            records = list(self._state[CONV_RAW_KEY])
+            records[-1] = {"role": role, "text": text}
+            self._state[CONV_RAW_KEY] = records
+        self.entries()[-1] = entry
+        self._rendered, self._rendered_count = "", 0
+        return entry
+
+    def append_once(self, role: str, text: str, turn_id: str) -> TranscriptEntry | None:
+        """Append an entry unless the same content was already recorded in *turn_id*.
+
+        Returns the new entry, or ``None`` when the append was a duplicate.
+        """
+        digest = content_digest(role, text)
+        index = self._state.get(TURN_INDEX_KEY) or {}
+        seen: list[str] = index.get("seen", []) if index.get("id") == turn_id else []
+        if digest in seen:
+            return None
+
+        entry = self.append(role, text)
+        self._state[TURN_INDEX_KEY] = {"id": turn_id, "seen": [*seen, digest]}
+        return entry
+
+    def render(self, stop: int | None = None) -> str:
+        """Render the first *stop* entries (all by default) as ``"role: text"`` lines.
+
+        The rendering is cached and extended in place when more entries are
+        requested later, so repeated calls never re-join the whole history.
+        """
+        entries = self.entries()
+        stop = len(entries) if stop is None else min(stop, len(entries))
+        if stop < self._rendered_count:
+            return "\n".join(entry.render() for entry in entries[:stop])
+        if stop > self._rendered_count:
+            lines = [entry.render() for entry in entries[self._rendered_count : stop]]
+            if self._rendered:
+                lines.insert(0, self._rendered)
+            self._rendered = "\n".join(lines)
+            self._rendered_count = stop
+        return self._rendered
+
+    def mark_intake_complete(self) -> int:
+        """Record the current length as the end of the intake conversation."""
+        count = len(self)
+        self._state[INTAKE_LEN_KEY] = count
+        return count
+
+    def intake_entries(self) -> list[TranscriptEntry]:
+        """Return the entries of the intake conversation (all if not yet marked)."""
+        return self.entries()[: self._state.get(INTAKE_LEN_KEY)]
+
+    def render_intake(self) -> str:
+        """Render the intake part of the conversation (everything if not yet marked)."""
+        return self.render(self._state.get(INTAKE_LEN_KEY))
@@ -1,33 +1,35 @@
 """Exit loop tool."""
 
+from collections.abc import MutableMapping
+from typing import Any
+
+from google.adk.events import EventActions
 from google.adk.tools import LongRunningFunctionTool, ToolContext
 
+from app.services.transcript.store import Transcript
+
+
+def finish_intake(state: MutableMapping[str, Any], actions: EventActions) -> int:
+    """Hand the intake over to the parser: mark the transcript complete and escalate.
+
+    Shared by the ``exit_loop`` tool and the readiness callback
+    (:class:`app.callbacks.intake_readiness.IntakeReadiness`); returns the
+    number of intake entries.
+    """
+    # Mark where the intake ends; the parser renders the transcript from the
+    # entries the accumulator callback stored, so no second copy is written.
+    intake_len = Transcript(state).mark_intake_complete()
+    actions.escalate = True
+    return intake_len
+
 
 def _exit_loop(tool_context: ToolContext):
     """Call this function ONLY when the critique indicates no further changes are needed, signaling the iterative process should end."""
     print(f"  [Tool Call] exit_loop triggered by {tool_context.agent_name}")
 
-    # Access session through _invocation_context
-    session = tool_context._invocation_context.session
-
-    # Save the accumulated transcript to state for the next agent
-    # The transcript accumulator callback should have stored the conversation
-    if "transcript" in session.state:
-        # Ensure the transcript is available for the parser
-        session.state["intake_transcript"] = session.state.get("transcript", "")
-        print(
-            f"  [Tool Call] Saved intake transcript to state (length: {len(session.state['intake_transcript'])})"
-        )
-    elif "conv_raw" in session.state:
-        # Build transcript from conv_raw if transcript not available
-        conv_raw = session.state.get("conv_raw", [])
-        transcript = "\n".join(
-            f"{entry.get('role', 'unknown')}: {entry.get('text', '')}" for entry in conv_raw
-        )
-        session.state["intake_transcript"] = transcript
-        print(f"  [Tool Call] Built intake transcript from conv_raw (length: {len(transcript)})")
-
-    tool_context.actions.escalate = True
+    intake_len = finish_intake(tool_context.state, tool_context.actions)
+    print(f"  [Tool Call] Marked intake transcript complete ({intake_len} entries)")
+
     # Return empty dict as tools should typically return JSON-serializable output
     return {}
 
@@ -0,0 +1,128 @@
+"""Per-invocation set-up cost of the analyst and parser LLM sub-agents.
+
+Before ``app.agents.factory`` every run of ``AnalystLLMAgent`` and
+``JsonParserAgent`` built a new ``LlmAgent`` (pydantic validation of the whole
+model, three callback objects, the tool wrapper) around a prompt string holding
+the session's data.  Now the agents are built once per process and only the
+instruction is rendered from state on each model call.
+
+Both variants are timed for what they do before the model is called, and
+``tracemalloc`` reports the peak memory allocated while doing it.  No network
+call is made.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_agent_factory [--rounds 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from google.adk.agents import LlmAgent
+
+from app.agents.factory import analyst_core_llm, parser_llm
+from app.callbacks.content_filter import ContentFilter
+from app.callbacks.lang_detect import LangCallback
+from app.callbacks.safety_filters import SafetyGuard
+from app.callbacks.transcript_acc import TranscriptAccumulator
+from app.config.base import Settings
+from app.services.parsing.intake import IntakeRecord
+from app.services.prompts.builders import build_analysis_prompt, build_parser_prompt
+from app.services.transcript.store import Transcript
+from app.tools.save_analysis import save_analysis
+
+settings = Settings()
+
+PARSED = {
+    "situation": "My manager asked me a question in front of the whole team",
+    "thoughts": ["Everyone thinks I am incompetent", "I will get fired"],
+    "feelings": ["anxious", "ashamed"],
+    "behaviors": ["froze", "avoided eye contact"],
+    "outcome": "I stayed quiet for the rest of the meeting and felt drained",
+}
+
+
+def session_state(turns: int = 12) -> dict:
+    state: dict = {"parsed": PARSED}
+    transcript = Transcript(state)
+    for turn in range(turns):
+        transcript.append("user", f"I froze when my manager asked me a question ({turn})")
+        transcript.append("assistant", "That sounds hard. What went through your mind?")
+    transcript.mark_intake_complete()
+    return state
+
+
+def per_run_analyst(state: dict) -> str:
+    """What ``AnalystLLMAgent`` did on every run before the factory."""
+    llm = LlmAgent(
+        name="AnalystLLMCore",
+        model=settings.google_ai_model,
+        instruction=build_analysis_prompt(state["parsed"]),
+        before_model_callback=[
+            LangCallback(),
+            SafetyGuard(mode=settings.pii_mode),
+            ContentFilter.from_settings(settings),
+        ],
+        after_model_callback=[TranscriptAccumulator(append_only=True)],
+        tools=[save_analysis],
+    )
+    return llm.instruction
+
+
+def per_run_parser(state: dict) -> str:
+    """What ``JsonParserAgent`` did on every run before the factory."""
+    llm = LlmAgent(
+        name="JsonParserLLM",
+        model=settings.google_ai_model,
+        instruction=build_parser_prompt(Transcript(state).render_intake()),
+        output_schema=IntakeRecord,
+    )
+    return llm.instruction
+
+
+def prebuilt_analyst(state: dict) -> str:
+    return analyst_core_llm().instruction(SimpleNamespace(state=state))
+
+
+def prebuilt_parser(state: dict) -> str:
+    return parser_llm(True).instruction(SimpleNamespace(state=state))
+
+
+def measure(label: str, run, state: dict, rounds: int) -> None:
+    run(state)  # warm up caches (prompts, lru_cache, pydantic schemas)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run(state)
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<20} mean {statistics.fmean(samples) * 1e6:9.1f} µs"
+        f"   median {statistics.median(samples) * 1e6:9.1f} µs   peak alloc {peak:>9} B"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    state = session_state()
+    measure("analyst per-run", per_run_analyst, state, args.rounds)
+    measure("analyst prebuilt", prebuilt_analyst, state, args.rounds)
+    measure("parser per-run", per_run_parser, state, args.rounds)
+    measure("parser prebuilt", prebuilt_parser, state, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Latency of the local content scorer on the common (clean) path.
+
+Scores the labelled language corpus (``tests/data/lang_corpus.jsonl``, real
+intake-style messages in seven languages) one message at a time and as one
+batch, then a 10k-character message with and without abuse - the size above
+which ``ContentFilter`` moves scoring to a worker thread.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_content_filter [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import time
+
+from app.services.safety.toxicity import LexiconScorer
+
+CORPUS_PATH = Path(__file__).parents[1] / "tests" / "data" / "lang_corpus.jsonl"
+PROSE = "I felt really anxious at the meeting yesterday when my boss asked me about it. "
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<26} mean {statistics.fmean(samples) * 1e6:8.1f} µs"
+        f"   p99 {percentile(samples, 0.99) * 1e6:8.1f} µs"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with CORPUS_PATH.open(encoding="utf-8") as f:
+        messages = [json.loads(line)["text"] for line in f if line.strip()]
+
+    start = time.perf_counter()
+    scorer = LexiconScorer()
+    print(f"compile: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    flagged = sum(scorer.score(text).score >= 2.8 for text in messages)
+    print(f"corpus: {len(messages)} messages, {flagged} flagged at the default threshold\n")
+
+    single: list[float] = []
+    batch: list[float] = []
+    for _ in range(args.rounds):
+        for text in messages:
+            start = time.perf_counter()
+            scorer.score(text)
+            single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scorer.score_batch(messages)
+        batch.append((time.perf_counter() - start) / len(messages))
+    report("per message", single)
+    report("per message (batched)", batch)
+
+    clean = (PROSE * (10_000 // len(PROSE) + 1))[:10_000]
+    abusive = clean[:5_000] + " you stupid idiot, I'm gonna kill you!!! " + clean[5_000:]
+    for label, text in (("10k chars, clean", clean), ("10k chars, abusive", abusive)):
+        samples = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            scorer.score(text)
+            samples.append(time.perf_counter() - start)
+        report(label, samples)
+
+
+if __name__ == "__main__":
+    main()
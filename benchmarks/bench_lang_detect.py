@@ -0,0 +1,79 @@
+"""Latency and accuracy of the offline n-gram language detector.
+
+Scores every message of the labelled corpus (``tests/data/lang_corpus.jsonl``)
+and prints per-language accuracy plus per-message latency, cold (empty word
+cache, i.e. a freshly compiled detector) and warm.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_lang_detect [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import json
+from pathlib import Path
+import statistics
+import time
+
+from app.services.language.detector import NgramLanguageDetector
+
+CORPUS_PATH = Path(__file__).parents[1] / "tests" / "data" / "lang_corpus.jsonl"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with CORPUS_PATH.open(encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    start = time.perf_counter()
+    detector = NgramLanguageDetector()
+    print(f"compile: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    cold: list[float] = []
+    correct: Counter[str] = Counter()
+    confusion: Counter[tuple[str, str]] = Counter()
+    for row in corpus:
+        start = time.perf_counter()
+        guess = detector.detect(row["text"])
+        cold.append(time.perf_counter() - start)
+        if guess.lang == row["lang"]:
+            correct[row["lang"]] += 1
+        else:
+            confusion[(row["lang"], guess.lang)] += 1
+
+    warm: list[float] = []
+    for _ in range(args.rounds):
+        for row in corpus:
+            start = time.perf_counter()
+            detector.detect(row["text"])
+            warm.append(time.perf_counter() - start)
+
+    totals = Counter(row["lang"] for row in corpus)
+    print(f"\n{'lang':<5} {'accuracy':>9}")
+    for lang in detector.languages:
+        print(f"{lang:<5} {correct[lang] / totals[lang]:>9.1%}")
+    print(f"{'all':<5} {sum(correct.values()) / len(corpus):>9.1%}")
+    for (expected, got), count in confusion.most_common():
+        print(f"  {expected} -> {got}: {count}")
+
+    print(f"\n{'latency µs':<10} {'mean':>8} {'p50':>8} {'p99':>8}")
+    for label, samples in (("cold", cold), ("warm", warm)):
+        print(
+            f"{label:<10} {statistics.fmean(samples) * 1e6:>8.1f} "
+            f"{percentile(samples, 0.5) * 1e6:>8.1f} {percentile(samples, 0.99) * 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Throughput of the single-pass PII scanner on long messages.
+
+Compares the merged scanner with the previous approach (three separate regexes
+tried one after another, SSNs only) on 10k-character messages: clean prose,
+prose with a couple of PII items, and a digit-heavy message.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pii [--size 10000] [--rounds 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import time
+
+from app.services.safety.pii import scanner
+
+LEGACY_REGEXES = [
+    re.compile(r"\bssn\b", re.IGNORECASE),
+    re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),
+    re.compile(r"\b\d{9}\b"),
+]
+
+PROSE = (
+    "I felt really anxious at the meeting yesterday when my boss asked me about the "
+    "report, and afterwards I kept replaying it. Me quedé en blanco delante de todos. "
+)
+DIGITS = "Room 12, floor 3, on 2024-05-01 at 14:30, ticket 998877, 3 people, 45 minutes. "
+
+
+def build_messages(size: int) -> dict[str, str]:
+    prose = (PROSE * (size // len(PROSE) + 1))[:size]
+    third = size // 3
+    with_pii = (
+        prose[:third]
+        + " write to ana.garcia@example.com "
+        + prose[third : 2 * third]
+        + " or call +34 612 345 678 "
+        + prose[2 * third :]
+    )[:size]
+    return {
+        "clean prose": prose,
+        "prose + 2 PII": with_pii,
+        "digit-heavy": (DIGITS * (size // len(DIGITS) + 1))[:size],
+    }
+
+
+def time_calls(func, text: str, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(text)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def legacy_scan(text: str) -> bool:
+    return any(regex.search(text) for regex in LEGACY_REGEXES)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'message':<15} {'scanner':<8} {'mean µs':>9} {'p99 µs':>9} {'MB/s':>7} {'matches':>8}")
+    for label, text in build_messages(args.size).items():
+        for name, func in (("merged", scanner.scan), ("legacy", legacy_scan)):
+            samples = sorted(time_calls(func, text, args.rounds))
+            mean = statistics.fmean(samples)
+            p99 = samples[int(len(samples) * 0.99) - 1]
+            found = len(scanner.scan(text)) if name == "merged" else int(legacy_scan(text))
+            print(
+                f"{label:<15} {name:<8} {mean * 1e6:>9.1f} {p99 * 1e6:>9.1f} "
+                f"{len(text) / mean / 1e6:>7.1f} {found:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
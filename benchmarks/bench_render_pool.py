@@ -0,0 +1,129 @@
+"""Latency of concurrent collector turns while PDF reports render.
+
+Before ``app.services.rendering.pool``, ``PdfAgent`` called ``build_pdf_bytes``
+inside its async generator, so every other session on the worker stalled for
+the whole reportlab render.  This benchmark runs simulated collector turns - a
+model round trip (``asyncio.sleep``) plus the callbacks' CPU work - in several
+concurrent sessions while reports render:
+
+* ``inline``  - the old behaviour, ``build_pdf_bytes`` on the event loop;
+* ``thread``  - ``RenderPool("thread")``;
+* ``process`` - ``RenderPool("process")``, the default.
+
+For each mode it reports p50/p99 of the turn latency over the model's own
+latency, against a baseline without renders.  No network call is made.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_render_pool [--sessions 20] [--renders 16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.rendering.pool import RenderPool
+from app.tools.pdf_generator import build_pdf_bytes
+
+MODEL_LATENCY = 0.02  # seconds per simulated collector model call
+
+PARSED = {
+    "situation": "My manager asked me a question in front of the whole team",
+    "thoughts": ["Everyone thinks I am incompetent", "I will get fired"],
+    "feelings": ["anxious", "ashamed"],
+    "behaviors": ["froze", "avoided eye contact"],
+    "outcome": "I stayed quiet for the rest of the meeting and felt drained",
+}
+ANALYSIS = (
+    '{"distortions": ["MW", "FT", "CT"], "balanced_thought": "One pause does not define '
+    'my competence.", "micro_action": "Ask one question in the next meeting.", '
+    '"certainty_before": 80, "certainty_after": 40}'
+)
+
+
+async def collector_session(turns: int, latencies: list[float]) -> None:
+    """Run *turns* simulated collector turns and record their extra latency."""
+    for _ in range(turns):
+        started = time.perf_counter()
+        await asyncio.sleep(MODEL_LATENCY)
+        sum(i * i for i in range(2000))  # callbacks: transcript, tracker, filters
+        latencies.append(time.perf_counter() - started - MODEL_LATENCY)
+
+
+async def render_reports(mode: str, renders: int, pool: RenderPool | None) -> float:
+    """Render *renders* reports in *mode*; return the wall-clock seconds taken."""
+    started = time.perf_counter()
+
+    async def one() -> None:
+        if pool is None:
+            build_pdf_bytes(intake_data=PARSED, analysis_output=ANALYSIS)
+            await asyncio.sleep(0)
+        else:
+            await pool.run(build_pdf_bytes, intake_data=PARSED, analysis_output=ANALYSIS)
+
+    await asyncio.gather(*(one() for _ in range(renders)))
+    return time.perf_counter() - started
+
+
+async def measure(mode: str, sessions: int, turns: int, renders: int, workers: int) -> dict:
+    pool = None
+    if mode in ("thread", "process"):
+        pool = RenderPool(mode, max_workers=workers, max_pending=renders, timeout=120)
+        # Start the workers (and, for processes, import reportlab) up front.
+        await asyncio.gather(
+            *(
+                pool.run(build_pdf_bytes, intake_data=PARSED, analysis_output=ANALYSIS)
+                for _ in range(workers)
+            )
+        )
+
+    latencies: list[float] = []
+    render_seconds = 0.0
+    tasks = [collector_session(turns, latencies) for _ in range(sessions)]
+    if mode != "baseline":
+        render_task = asyncio.ensure_future(render_reports(mode, renders, pool))
+        await asyncio.gather(*tasks)
+        render_seconds = await render_task
+    else:
+        await asyncio.gather(*tasks)
+    if pool is not None:
+        pool.shutdown()
+
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "p50_ms": cuts[49] * 1000,
+        "p99_ms": cuts[98] * 1000,
+        "max_ms": max(latencies) * 1000,
+        "reports_per_s": renders / render_seconds if render_seconds else 0.0,
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(
+        f"{args.sessions} sessions x {args.turns} turns, {args.renders} reports, "
+        f"{args.workers} workers\n"
+    )
+    print(f"{'mode':<9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'reports/s':>10}")
+    for mode in ("baseline", "inline", "thread", "process"):
+        row = await measure(mode, args.sessions, args.turns, args.renders, args.workers)
+        print(
+            f"{row['mode']:<9} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+            f"{row['max_ms']:>8.2f} {row['reports_per_s']:>10.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--renders", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=2)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Per-session report cost: eager PDF vs HTML/Markdown with a lazy PDF.
+
+``PdfAgent`` renders a reportlab PDF and uploads it for every session.  With
+``report_format = "html"`` (or ``"markdown"``) it renders the report as text and
+saves it with the small ``report.json`` source; ``report.pdf`` is only rendered
+by ``LazyPdfArtifactService`` when it is loaded.  This benchmark times, per
+report on one core, rendering plus saving to an in-memory artifact service
+(so upload size shows up only as bytes, not network time):
+
+* ``pdf``      - ``build_pdf_bytes`` and one ``report.pdf`` artifact;
+* ``html``     - ``render_html``, ``report.html`` and ``report.json``;
+* ``markdown`` - ``render_markdown``, ``report.md`` and ``report.json``;
+
+and the lazy PDF when it is requested: the first load renders it, later loads
+are served from the render cache.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_report_formats [--reports 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.genai.types import Blob, Part
+
+from app.services.cache.renders import RenderCache
+from app.services.rendering.lazy import (
+    REPORT_PDF,
+    REPORT_SOURCE,
+    LazyPdfArtifactService,
+    report_source,
+)
+from app.services.rendering.markup import MARKUP_FORMATS, render_markup
+from app.services.rendering.pool import RenderPool
+from app.services.rendering.report import ReportData
+from app.tools.pdf_generator import build_pdf_bytes
+from benchmarks.bench_report_template import ANALYSIS, PARSED
+
+
+def scope(i: int) -> dict[str, str]:
+    return {"app_name": "bench", "user_id": "u", "session_id": f"s{i}"}
+
+
+async def eager_pdf(artifacts, i: int) -> int:
+    pdf = build_pdf_bytes(PARSED, ANALYSIS)
+    await artifacts.save_artifact(
+        filename=REPORT_PDF,
+        artifact=Part(inline_data=Blob(data=pdf, mime_type="application/pdf")),
+        **scope(i),
+    )
+    return len(pdf)
+
+
+def markup(report_format: str):
+    filename, mime_type = MARKUP_FORMATS[report_format]
+
+    async def save(artifacts, i: int) -> int:
+        data = ReportData.from_session(PARSED, ANALYSIS)
+        report = render_markup(data, report_format).encode()
+        source = report_source(PARSED, ANALYSIS, data.date)
+        await artifacts.save_artifact(
+            filename=filename,
+            artifact=Part(inline_data=Blob(data=report, mime_type=mime_type)),
+            **scope(i),
+        )
+        await artifacts.save_artifact(filename=REPORT_SOURCE, artifact=source, **scope(i))
+        return len(report) + len(source.inline_data.data)
+
+    return save
+
+
+async def per_report(save, reports: int) -> tuple[float, int]:
+    artifacts = InMemoryArtifactService()
+    await save(artifacts, -1)  # warm up imports and font metrics
+    size = 0
+    started = time.perf_counter()
+    for i in range(reports):
+        size = await save(artifacts, i)
+    return (time.perf_counter() - started) / reports * 1000, size
+
+
+async def lazy_loads(reports: int) -> tuple[float, float]:
+    inner = InMemoryArtifactService()
+    await markup("html")(inner, 0)
+    pool = RenderPool("thread", max_workers=1)
+
+    async def load(lazy: LazyPdfArtifactService) -> None:
+        await lazy.load_artifact(filename=REPORT_PDF, **scope(0))
+
+    await load(LazyPdfArtifactService(inner, pool=pool, cache=RenderCache()))  # warm up
+    # Cold: a fresh render cache per load, so each load renders.
+    started = time.perf_counter()
+    for _ in range(reports):
+        await load(LazyPdfArtifactService(inner, pool=pool, cache=RenderCache()))
+    cold = (time.perf_counter() - started) / reports * 1000
+    # Warm: one cache, every load after the first is a hit.
+    warm_service = LazyPdfArtifactService(inner, pool=pool, cache=RenderCache())
+    started = time.perf_counter()
+    for _ in range(reports):
+        await load(warm_service)
+    warm = (time.perf_counter() - started) / reports * 1000
+    pool.shutdown()
+    return cold, warm
+
+
+async def run(reports: int) -> None:
+    print(f"{reports} reports, one core\n")
+    pdf_ms, pdf_size = await per_report(eager_pdf, reports)
+    print(f"{'pdf':<9} {pdf_ms:>7.3f} ms/report  {pdf_size:>6} bytes saved")
+    for report_format in MARKUP_FORMATS:
+        ms, size = await per_report(markup(report_format), reports)
+        print(
+            f"{report_format:<9} {ms:>7.3f} ms/report  {size:>6} bytes saved"
+            f"  ({pdf_ms / ms:.0f}x faster)"
+        )
+    cold, warm = await lazy_loads(reports)
+    print(f"\nlazy report.pdf: {cold:.3f} ms on first load, {warm:.3f} ms from the render cache")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=300)
+    asyncio.run(run(parser.parse_args().reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Reports per second per core: per-report set-up vs the cached report template.
+
+Before ``app.services.rendering.report`` every ``build_pdf_bytes`` call built
+the sample style sheet, its custom paragraph and table styles and the
+distortion map before laying out a single line.  ``ReportTemplate`` builds
+them once per process.  This benchmark renders the same report in one process
+(one core) both ways:
+
+* ``per-report`` - a fresh ``ReportTemplate`` for every report, i.e. the old
+  set-up work;
+* ``cached``     - ``get_report_template()``, what ``build_pdf_bytes`` does now;
+
+and times the set-up on its own.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_report_template [--reports 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.services.rendering.report import ReportData, ReportTemplate, get_report_template
+
+PARSED = {
+    "situation": "My manager asked me a question in front of the whole team",
+    "thoughts": ["Everyone thinks I am incompetent", "I will get fired"],
+    "feelings": ["anxious", "ashamed"],
+    "behaviors": ["froze", "avoided eye contact"],
+    "outcome": "I stayed quiet for the rest of the meeting and felt drained",
+}
+ANALYSIS = (
+    '{"distortions": ["MW", "FT", "CT"], "balanced_thought": "One pause does not define '
+    'my competence.", "micro_action": "Ask one question in the next meeting.", '
+    '"certainty_before": 80, "certainty_after": 40}'
+)
+
+
+def per_report(data: ReportData) -> bytes:
+    return ReportTemplate().render(data)
+
+
+def cached(data: ReportData) -> bytes:
+    return get_report_template().render(data)
+
+
+def rate(render, data: ReportData, reports: int) -> float:
+    render(data)  # warm up imports and font metrics
+    started = time.perf_counter()
+    for _ in range(reports):
+        render(data)
+    return reports / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=300)
+    args = parser.parse_args()
+
+    data = ReportData.from_session(PARSED, ANALYSIS)
+
+    started = time.perf_counter()
+    for _ in range(args.reports):
+        ReportTemplate()
+    setup_ms = (time.perf_counter() - started) / args.reports * 1000
+
+    print(f"{args.reports} reports, one core\n")
+    print(f"template set-up alone: {setup_ms:.3f} ms per report")
+    slow = rate(per_report, data, args.reports)
+    fast = rate(cached, data, args.reports)
+    print(f"{'per-report':<12} {slow:>8.1f} reports/s")
+    print(f"{'cached':<12} {fast:>8.1f} reports/s  ({fast / slow:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
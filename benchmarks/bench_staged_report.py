@@ -0,0 +1,55 @@
+"""Rendering time left after the analysis: full render vs staged report.
+
+``PdfAgent`` used to lay out the whole report once ``analysis_loop`` had
+finished.  With ``app.services.rendering.staged`` the intake section is laid
+out while the analysis runs, and only the analysis section and the final
+assembly remain.  This benchmark times, per report on one core:
+
+* ``full``   - ``ReportTemplate.render``, the whole report after the analysis;
+* ``intake`` - the first stage, which now overlaps the analysis LLM;
+* ``finish`` - the second stage, what is left on the critical path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_staged_report [--reports 300]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.services.rendering.report import ReportData, get_report_template
+from app.services.rendering.staged import StagedReport
+from benchmarks.bench_report_template import ANALYSIS, PARSED
+
+
+def per_report_ms(step, items: list) -> float:
+    started = time.perf_counter()
+    for item in items:
+        step(item)
+    return (time.perf_counter() - started) / len(items) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=300)
+    args = parser.parse_args()
+
+    template = get_report_template()
+    data = ReportData.from_session(PARSED, ANALYSIS)
+    template.render(data)  # warm up imports and font metrics
+
+    full = per_report_ms(template.render, [data] * args.reports)
+    reports = [StagedReport(PARSED) for _ in range(args.reports)]
+    intake = per_report_ms(StagedReport.lay_out_intake, reports)
+    finish = per_report_ms(lambda report: report.finish(ANALYSIS), reports)
+
+    print(f"{args.reports} reports, one core\n")
+    print(f"{'full':<8} {full:>7.2f} ms after the analysis")
+    print(f"{'intake':<8} {intake:>7.2f} ms while the analysis runs")
+    print(f"{'finish':<8} {finish:>7.2f} ms after the analysis  ({1 - finish / full:.0%} less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Per-turn cost of TranscriptAccumulator: legacy list layout vs append-only layout.
+
+Simulates a long session the way ``DatabaseSessionService`` sees it: every turn
+runs the callback against a fresh ``State`` delta, and the delta is what gets
+serialised and persisted with the event.
+
+A second table compares the footprint of the finished session: the old three
+copies (``conv_raw`` + ``transcript`` + ``intake_transcript``) against the single
+compact copy read through ``Transcript``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_transcript [--turns 250]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from google.adk.models.llm_response import LlmResponse
+from google.adk.sessions.state import State
+from google.genai.types import Content, Part
+
+from app.callbacks.transcript_acc import TranscriptAccumulator
+from app.services.transcript.store import Transcript
+
+USER_TEXT = "I froze when my manager asked me a question in front of the whole team " * 2
+ASSISTANT_TEXT = "That sounds really hard. What went through your mind right at that moment? " * 2
+CHECKPOINTS = (1, 50, 100, 150, 200, 250, 500)
+
+
+def run_session(accumulator: TranscriptAccumulator, turns: int) -> list[tuple[float, int]]:
+    """Return ``(callback_seconds, delta_bytes)`` for every simulated turn."""
+    session_state: dict = {}
+    response = LlmResponse(content=Content(parts=[Part(text=ASSISTANT_TEXT)]))
+    results = []
+    for turn in range(turns):
+        delta: dict = {}
+        ctx = SimpleNamespace(
+            state=State(value=session_state, delta=delta),
+            invocation_id=f"inv-{turn}",
+            user_content=Content(parts=[Part(text=f"{USER_TEXT} (turn {turn})")]),
+        )
+        start = time.perf_counter()
+        accumulator(callback_context=ctx, llm_response=response)
+        payload = json.dumps(delta)  # what the session service persists with the event
+        elapsed = time.perf_counter() - start
+        results.append((elapsed, len(payload)))
+    return results
+
+
+def three_copy_state(turns: int) -> dict:
+    """Session state as it looked before the shared store: three copies of the text."""
+    conv_raw = []
+    for turn in range(turns):
+        conv_raw.append({"role": "user", "text": f"{USER_TEXT} (turn {turn})".strip()})
+        conv_raw.append({"role": "assistant", "text": ASSISTANT_TEXT.strip()})
+    joined = "\n".join(f"{entry['role']}: {entry['text']}" for entry in conv_raw)
+    return {"conv_raw": conv_raw, "transcript": joined, "intake_transcript": joined}
+
+
+def single_copy_state(turns: int) -> dict:
+    state: dict = {}
+    transcript = Transcript(state)
+    for turn in range(turns):
+        transcript.append("user", f"{USER_TEXT} (turn {turn})".strip())
+        transcript.append("assistant", ASSISTANT_TEXT.strip())
+    transcript.mark_intake_complete()
+    return state
+
+
+def traced_bytes(build) -> tuple[object, int]:
+    """Return ``(result, bytes still allocated by building it)``."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def footprint(turns: int) -> None:
+    """Compare a finished session as it is loaded back from the session store."""
+    print(f"{'layout':<12} {'serialised state bytes':>23} {'loaded in-memory bytes':>23}")
+
+    old_payload = json.dumps(three_copy_state(turns))
+    _, old_memory = traced_bytes(lambda: json.loads(old_payload))
+    print(f"{'three-copy':<12} {len(old_payload):>23} {old_memory:>23}")
+
+    new_payload = json.dumps(single_copy_state(turns))
+
+    def load_single_copy() -> Transcript:
+        # Consumers hold slotted entries plus one cached rendering on top of the state.
+        transcript = Transcript(json.loads(new_payload))
+        transcript.render_intake()
+        return transcript
+
+    _, new_memory = traced_bytes(load_single_copy)
+    print(f"{'single-copy':<12} {len(new_payload):>23} {new_memory:>23}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=250)
+    args = parser.parse_args()
+
+    modes = {
+        "legacy": TranscriptAccumulator(),
+        "append-only": TranscriptAccumulator(append_only=True),
+    }
+    print(f"{'mode':<12} {'turn':>5} {'callback+serialise µs':>22} {'delta bytes':>12}")
+    for mode, accumulator in modes.items():
+        results = run_session(accumulator, args.turns)
+        for turn in CHECKPOINTS:
+            if turn <= args.turns:
+                elapsed, size = results[turn - 1]
+                print(f"{mode:<12} {turn:>5} {elapsed * 1e6:>22.1f} {size:>12}")
+        total_bytes = sum(size for _, size in results)
+        total_us = sum(elapsed for elapsed, _ in results) * 1e6
+        print(f"{mode:<12} {'total':>5} {total_us:>22.1f} {total_bytes:>12}\n")
+
+    footprint(args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Custom services for ``adk web`` and ``adk api_server``, loaded from the agents directory.
+
+Registers the ``lazypdf+gs``, ``lazypdf+file`` and ``lazypdf+memory`` artifact
+service schemes (see :mod:`app.services.rendering.lazy`).
+"""
+
+from app.services.rendering.lazy import register_artifact_schemes
+
+register_artifact_schemes()
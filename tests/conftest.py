@@ -1,27 +1,65 @@
 from collections import deque
+from collections.abc import Iterable
+import os
 
 from google.adk.artifacts import InMemoryArtifactService
 from google.adk.models import BaseLlm  # <- for StubLLM typing
+from google.adk.models.llm_response import LlmResponse
 from google.genai.types import Content, Part
+from pydantic import Field
 import pytest
 
+# Tests patch the PDF renderer with mocks, which cannot be pickled into a
+# render worker process (see app.services.rendering.pool).
+os.environ.setdefault("PDF_RENDER_POOL", "thread")
+
 
 ##############################################################################
 # Simple stub that replaces any LlmAgent's model with deterministic replies. #
 ##############################################################################
 class StubLLM(BaseLlm):
-    """Deterministic stand-in for any Gemini / GPT model used in tests."""
+    """Deterministic stand-in for any Gemini / GPT model used in tests.
+
+    Answers with the canned replies in order (``"stub-reply"`` once they run
+    out), counts its calls in ``calls`` and keeps the requests in
+    ``requests``.  A reply is either text or a ready ``LlmResponse`` (e.g. a
+    function call).
+    """
+
+    canned: deque[str | LlmResponse] = Field(default_factory=deque)
+    calls: int = 0
+    requests: list = Field(default_factory=list)
+
+    def __init__(self, canned: Iterable[str | LlmResponse] = (), **kwargs):
+        super().__init__(model="stub", canned=deque(canned), **kwargs)
 
-    def __init__(self, canned: deque[str]):
-        super().__init__(model="stub")  # parent ctor expects a model name
-        self._answers = canned
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.calls += 1
+        self.requests.append(llm_request)
+        reply = self.canned.popleft() if self.canned else "stub-reply"
+        if isinstance(reply, str):
+            reply = LlmResponse(content=Content(parts=[Part(text=reply)], role="model"))
+        yield reply
 
-    async def generate_content_async(self, *_, **__):
-        text = self._answers.popleft() if self._answers else "stub-reply"
-        return Content(parts=[Part(text=text)], role="model")
+
+@pytest.fixture(autouse=True)
+def _clear_render_cache():
+    """Keep rendered PDFs cached or staged by one test from serving another."""
+    yield
+    from app.services.cache.renders import get_render_cache
+    from app.services.rendering.staged import get_report_stages
+
+    get_render_cache().clear()
+    get_report_stages().clear()
 
 
 @pytest.fixture(scope="session")
 def artifact_service():
     """Artifact service for tests."""
     return InMemoryArtifactService()
+
+
+@pytest.fixture
+def stub_llm():
+    """Factory for StubLLM models: ``stub_llm(["first reply", ...])``."""
+    return StubLLM
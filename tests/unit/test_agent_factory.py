@@ -0,0 +1,35 @@
+"""Unit tests for the prebuilt LLM sub-agents and their instruction providers."""
+
+from types import SimpleNamespace
+
+from app.agents.factory import analyst_core_llm, parser_llm
+from app.services.parsing.intake import IntakeRecord
+from app.services.prompts.builders import PARSER_REPAIR_KEY
+from app.services.transcript.store import Transcript
+
+
+def test_agents_are_built_once_per_process():
+    """Test repeated lookups return the same agent and callback list."""
+    assert parser_llm(True) is parser_llm(True)
+    assert parser_llm(True).output_schema is IntakeRecord
+    assert parser_llm(False).output_schema is None
+
+    analyst = analyst_core_llm()
+    assert analyst is analyst_core_llm()
+    assert analyst.before_model_callback is analyst_core_llm().before_model_callback
+
+
+def test_instructions_are_rendered_from_session_state():
+    """Test per-session data reaches the prompt through state, braces untouched."""
+    state: dict = {"parsed": {"situation": "A {team} meeting"}}
+    Transcript(state).append("user", "My {boss} asked me a question")
+    ctx = SimpleNamespace(state=state)
+
+    parser_prompt = parser_llm(True).instruction(ctx)
+    assert "user: My {boss} asked me a question" in parser_prompt
+    assert "not a valid intake record" not in parser_prompt
+
+    state[PARSER_REPAIR_KEY] = {"response": '{"thoughts": []}', "errors": "situation: missing"}
+    assert "situation: missing" in parser_llm(True).instruction(ctx)
+
+    assert '{"situation":"A {team} meeting"}' in analyst_core_llm().instruction(ctx)
@@ -0,0 +1,123 @@
+"""Unit tests for the batch report regeneration command."""
+
+import json
+
+from google.adk.artifacts import FileArtifactService, GcsArtifactService, InMemoryArtifactService
+import pytest
+from reportlab import rl_config
+
+from app.services.rendering.batch import (
+    REPORT_FILENAME,
+    Checkpoint,
+    artifact_service,
+    exported_sessions,
+    regenerate,
+)
+from app.services.rendering.lazy import LazyPdfArtifactService, register_artifact_schemes
+from app.services.rendering.pool import RenderPool
+from app.tools.pdf_generator import build_pdf_bytes
+
+PARSED = {"situation": "A meeting", "thoughts": ["I'm dull"], "feelings": ["anxious"]}
+
+
+def _export(directory, session_id, state, *, user_id="user", last_update_time=None):
+    path = directory / f"session-{user_id}-{session_id}.json"
+    data = {"id": session_id, "appName": "reframe_agent", "userId": user_id, "state": state}
+    if last_update_time is not None:
+        data["lastUpdateTime"] = last_update_time
+    path.write_text(json.dumps({**data, "events": []}))
+
+
+async def _jobs(items):
+    for item in items:
+        yield item
+
+
+async def _run(tmp_path, artifacts):
+    pool = RenderPool("thread", max_workers=2, max_pending=4)
+    checkpoint = Checkpoint(str(tmp_path / "checkpoint.jsonl"))
+    jobs = _jobs(exported_sessions([str(tmp_path / "session-*.json")]))
+    try:
+        return await regenerate(jobs, artifacts, pool, checkpoint, window=4)
+    finally:
+        checkpoint.close()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_reports_are_saved_and_a_rerun_resumes(tmp_path):
+    """Test every complete session gets a new report version, once."""
+    for n in range(5):
+        _export(tmp_path, f"s{n}", {"parsed": PARSED, "cbt_analysis": f"Analysis {n}"})
+    _export(tmp_path, "no-parse", {"conv_raw": []})
+    _export(tmp_path, "legacy", {"parsed": "Okay, let's break this down."})
+    artifacts = InMemoryArtifactService()
+
+    first = await _run(tmp_path, artifacts)
+    second = await _run(tmp_path, artifacts)
+
+    assert (first.rendered, first.incomplete, first.failed) == (5, 2, 0)
+    assert (second.rendered, second.skipped) == (0, 5)
+    report = await artifacts.load_artifact(
+        app_name="reframe_agent", user_id="user", session_id="s3", filename=REPORT_FILENAME
+    )
+    assert report.inline_data.data.startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_template_version_bump_renders_again(tmp_path, monkeypatch):
+    """Test a new layout version invalidates the checkpoint entries."""
+    _export(tmp_path, "s0", {"parsed": PARSED, "cbt_analysis": "Analysis"})
+    artifacts = InMemoryArtifactService()
+    await _run(tmp_path, artifacts)
+
+    monkeypatch.setattr("app.services.cache.renders.TEMPLATE_VERSION", "next")
+    stats = await _run(tmp_path, artifacts)
+
+    assert stats.rendered == 1
+    versions = await artifacts.list_versions(
+        app_name="reframe_agent", user_id="user", session_id="s0", filename=REPORT_FILENAME
+    )
+    assert len(versions) == 2
+
+
+@pytest.mark.asyncio
+async def test_report_keeps_the_session_date(tmp_path, monkeypatch):
+    """Test a regenerated report is dated by the session, not the run."""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    _export(tmp_path, "s0", {"parsed": PARSED, "cbt_analysis": "A"}, last_update_time=1767323045.5)
+    artifacts = InMemoryArtifactService()
+
+    await _run(tmp_path, artifacts)
+
+    report = await artifacts.load_artifact(
+        app_name="reframe_agent", user_id="user", session_id="s0", filename=REPORT_FILENAME
+    )
+    assert report.inline_data.data == build_pdf_bytes(PARSED, "A", date="2026-01-02")
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_tells_users_with_the_same_session_id_apart(tmp_path):
+    """Test a session id reused by another user is not skipped as done."""
+    for user_id in ("alice", "bob"):
+        _export(tmp_path, "s0", {"parsed": PARSED, "cbt_analysis": "A"}, user_id=user_id)
+    artifacts = InMemoryArtifactService()
+
+    first = await _run(tmp_path, artifacts)
+    second = await _run(tmp_path, artifacts)
+
+    assert (first.rendered, first.skipped) == (2, 0)
+    assert (second.rendered, second.skipped) == (0, 2)
+
+
+def test_artifact_services_come_from_the_adk_registry(tmp_path, monkeypatch):
+    """Test --artifacts resolves URIs the way adk web does, through one registry."""
+    monkeypatch.setattr(GcsArtifactService, "__init__", lambda self, bucket_name: None)
+
+    assert isinstance(artifact_service("memory://"), InMemoryArtifactService)
+    assert isinstance(artifact_service(f"file://{tmp_path}"), FileArtifactService)
+    assert isinstance(artifact_service("gs://reports"), GcsArtifactService)
+    register_artifact_schemes()
+    assert isinstance(artifact_service("lazypdf+memory://"), LazyPdfArtifactService)
+    with pytest.raises(ValueError, match="unsupported"):
+        artifact_service("ftp://reports")
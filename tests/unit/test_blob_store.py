@@ -0,0 +1,117 @@
+"""Unit tests for the content-addressed blob store."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+import pytest
+
+from app.agents.pdf_agent import PdfAgent
+from app.services.persistence.blobs import (
+    BlobStore,
+    FilesystemBackend,
+    content_digest,
+    load_report,
+    main,
+)
+
+
+def test_filesystem_store_round_trip_and_dedup(tmp_path):
+    """Test blobs are addressed by content and stored once."""
+    store = BlobStore(FilesystemBackend(str(tmp_path)))
+
+    ref = store.put(b"%PDF-1.4 report", "application/pdf")
+    again = store.put(b"%PDF-1.4 report", "application/pdf")
+
+    assert (
+        ref
+        == again
+        == {
+            "digest": content_digest(b"%PDF-1.4 report"),
+            "size": 15,
+            "mime_type": "application/pdf",
+        }
+    )
+    assert store.get(ref) == store.get(ref["digest"]) == b"%PDF-1.4 report"
+    assert len([path for path in tmp_path.rglob("*") if path.is_file()]) == 1
+
+
+def test_unknown_digest_is_none(tmp_path):
+    """Test a reference to a missing blob resolves to None."""
+    store = BlobStore(FilesystemBackend(str(tmp_path)))
+
+    assert store.get(content_digest(b"never stored")) is None
+
+
+@pytest.mark.asyncio
+async def test_pdf_agent_keeps_the_pdf_out_of_the_session(tmp_path):
+    """Test the fallback path stores a reference, not the bytes."""
+    store = BlobStore(FilesystemBackend(str(tmp_path)))
+    pdf = b"%PDF" + b"x" * 100_000
+    # No artifact service: the context has no save_artifact.
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(state={"parsed": {}, "cbt_analysis": ""}),
+    )
+
+    with (
+        patch("app.agents.pdf_agent.build_pdf_bytes", return_value=pdf),
+        patch("app.agents.pdf_agent.get_blob_store", return_value=store),
+    ):
+        events = [event async for event in PdfAgent()._produce(ctx)]
+
+    output = events[0].actions.state_delta["pdf_output"]
+    assert "pdf_output" not in ctx.session.state  # stored through the event
+    assert store.get(output["pdf_blob"]) == pdf
+    assert output["pdf_size"] == len(pdf)
+    assert len(json.dumps(output)) < 300
+    assert [part.inline_data for part in events[0].content.parts] == [None]
+    assert output["pdf_blob"]["digest"] in events[0].content.parts[0].text
+    assert load_report(output, store) == (pdf, "application/pdf")
+
+
+@pytest.mark.asyncio
+async def test_runner_session_keeps_the_blob_reference(tmp_path):
+    """Test the reference reaches the session service and reads the PDF back."""
+    store = BlobStore(FilesystemBackend(str(tmp_path)))
+    sessions = InMemorySessionService()
+    runner = Runner(app_name="reframe", agent=PdfAgent(), session_service=sessions)
+    session = await sessions.create_session(
+        app_name="reframe", user_id="u", state={"parsed": {}, "cbt_analysis": ""}
+    )
+
+    with (
+        patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-stored"),
+        patch("app.agents.pdf_agent.get_blob_store", return_value=store),
+    ):
+        async for _ in runner.run_async(
+            user_id="u",
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text="ok")]),
+        ):
+            pass
+
+    stored = await sessions.get_session(app_name="reframe", user_id="u", session_id=session.id)
+    assert load_report(stored.state["pdf_output"], store) == (b"%PDF-stored", "application/pdf")
+
+
+def test_reports_are_read_back_from_the_command_line(tmp_path, capsysbinary):
+    """Test the CLI writes a stored report by digest or from an exported session."""
+    store = BlobStore(FilesystemBackend(str(tmp_path / "blobs")))
+    ref = store.put(b"<html>report</html>", "text/html")
+    session = tmp_path / "session.json"
+    session.write_text(json.dumps({"state": {"pdf_output": {"report_blob": ref}}}))
+    out = tmp_path / "report.html"
+
+    with patch("app.services.persistence.blobs.get_blob_store", return_value=store):
+        assert main(["--session", str(session), "-o", str(out)]) == 0
+        assert main([ref["digest"]]) == 0
+        assert main([content_digest(b"missing")]) == 1
+
+    assert out.read_bytes() == b"<html>report</html>"
+    assert capsysbinary.readouterr().out == b"<html>report</html>"
+    assert load_report({"pdf_filename": "report.pdf", "version": 0}, store) is None
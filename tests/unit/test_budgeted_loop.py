@@ -0,0 +1,198 @@
+"""Unit tests for BudgetedLoopAgent stop conditions and degradation."""
+
+from unittest.mock import MagicMock
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.apps import ResumabilityConfig
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, FunctionCall, Part
+from pydantic import Field
+import pytest
+
+from app.agents.budgeted_loop import LOOP_CONTROL_KEY, BudgetedLoopAgent
+from app.callbacks.token_usage import TOKEN_USAGE_KEY
+
+
+class ScriptedAgent(BaseAgent):
+    """Sub-agent that answers with the next scripted reply on every run."""
+
+    replies: list[str] = Field(default_factory=list)
+    tokens_per_run: int = 0
+    escalate_on: str | None = None
+
+    async def run_async(self, parent_context):
+        state = parent_context.session.state
+        usage = dict(state.get(TOKEN_USAGE_KEY) or {})
+        spent = usage.get(self.name, {"calls": 0, "prompt": 0, "output": 0})
+        usage[self.name] = {**spent, "prompt": spent["prompt"] + self.tokens_per_run}
+        state[TOKEN_USAGE_KEY] = usage
+
+        reply = self.replies.pop(0) if self.replies else "same again"
+        if reply == self.escalate_on:
+            yield Event(
+                author=self.name,
+                content=Content(parts=[Part(function_call=FunctionCall(name="save_analysis"))]),
+                actions=EventActions(escalate=True),
+            )
+            return
+        yield Event(author=self.name, content=Content(parts=[Part(text=reply)]))
+
+
+def _ctx(state=None):
+    ctx = MagicMock()
+    ctx.session.state = {} if state is None else state
+    ctx.invocation_id = "inv-1"
+    ctx.branch = None
+    ctx.is_resumable = False
+    ctx.agent_states = {}
+    ctx.should_pause_invocation.return_value = False
+    return ctx
+
+
+async def _run(loop, ctx):
+    events = [event async for event in loop._run_async_impl(ctx)]
+    # The runner applies state deltas as events are appended.
+    for event in events:
+        ctx.session.state.update(event.actions.state_delta)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_escalation_stops_the_loop():
+    """Test the normal exit records the reason and does not degrade."""
+    agent = ScriptedAgent(name="Analyst", replies=["draft", "save"], escalate_on="save")
+    loop = BudgetedLoopAgent(
+        name="AnalysisLoop", sub_agents=[agent], max_iterations=8, fallback_output_key="cbt"
+    )
+    ctx = _ctx()
+
+    await _run(loop, ctx)
+
+    control = ctx.session.state[LOOP_CONTROL_KEY]["AnalysisLoop"]
+    assert control["stop_reason"] == "escalated"
+    assert control["iterations"] == 2
+    assert control["degraded"] is False
+    assert "cbt" not in ctx.session.state
+
+
+@pytest.mark.asyncio
+async def test_repeated_output_without_tool_call_degrades_to_last_output():
+    """Test stalled iterations stop the loop and keep the last draft."""
+    agent = ScriptedAgent(name="Analyst", replies=["draft one", "draft two", "draft two"])
+    loop = BudgetedLoopAgent(
+        name="AnalysisLoop",
+        sub_agents=[agent],
+        max_iterations=8,
+        max_stalls=2,
+        require_tool_call=True,
+        fallback_output_key="cbt",
+    )
+    ctx = _ctx()
+
+    await _run(loop, ctx)
+
+    control = ctx.session.state[LOOP_CONTROL_KEY]["AnalysisLoop"]
+    assert control["stop_reason"] == "no_progress"
+    assert control["iterations"] == 2
+    assert control["degraded"] is True
+    assert ctx.session.state["cbt"] == "draft two"
+
+
+@pytest.mark.asyncio
+async def test_repeated_output_is_a_stall_even_without_required_tools():
+    """Test a loop that keeps saying the same thing stops early."""
+    agent = ScriptedAgent(name="Collector", replies=["What happened?", "Tell me more"])
+    loop = BudgetedLoopAgent(name="CollectorLoop", sub_agents=[agent], max_iterations=12)
+    ctx = _ctx()
+
+    await _run(loop, ctx)
+
+    control = ctx.session.state[LOOP_CONTROL_KEY]["CollectorLoop"]
+    assert control["stop_reason"] == "no_progress"
+    # Two questions, "same again" once as new output, then twice repeated.
+    assert control["iterations"] == 5
+
+
+@pytest.mark.asyncio
+async def test_token_budget_is_summed_across_invocations():
+    """Test the session's spend carries over to the next invocation."""
+    agent = ScriptedAgent(name="Analyst", replies=[f"draft {i}" for i in range(20)])
+    loop = BudgetedLoopAgent(
+        name="AnalysisLoop", sub_agents=[agent], max_iterations=3, max_tokens=1000
+    )
+    agent.tokens_per_run = 300
+    ctx = _ctx()
+
+    await _run(loop, ctx)
+    first = ctx.session.state[LOOP_CONTROL_KEY]["AnalysisLoop"]
+    assert first == {**first, "stop_reason": "max_iterations", "tokens": 900}
+
+    await _run(loop, ctx)
+    second = ctx.session.state[LOOP_CONTROL_KEY]["AnalysisLoop"]
+    assert second["stop_reason"] == "token_budget"
+    assert second["iterations"] == 1
+    assert second["tokens"] == 1200
+
+
+@pytest.mark.asyncio
+async def test_budget_per_invocation_starts_fresh_on_every_turn():
+    """Test a spent per-turn budget does not skip the loop on the next turn."""
+    agent = ScriptedAgent(name="Collector", replies=[f"question {i}" for i in range(20)])
+    loop = BudgetedLoopAgent(
+        name="CollectorLoop",
+        sub_agents=[agent],
+        max_iterations=3,
+        max_tokens=500,
+        budget_per_invocation=True,
+    )
+    agent.tokens_per_run = 300
+    ctx = _ctx()
+
+    await _run(loop, ctx)
+    assert ctx.session.state[LOOP_CONTROL_KEY]["CollectorLoop"]["stop_reason"] == "token_budget"
+
+    ctx.invocation_id = "inv-2"
+    await _run(loop, ctx)
+    second = ctx.session.state[LOOP_CONTROL_KEY]["CollectorLoop"]
+    assert second["stop_reason"] == "token_budget"
+    assert second["iterations"] == 2
+    assert second["tokens"] == 600
+    assert second["invocation_id"] == "inv-2"
+
+
+@pytest.mark.asyncio
+async def test_resumable_invocation_gets_agent_state_events():
+    """Test the loop keeps LoopAgent's agent-state and end-of-agent events."""
+    agent = ScriptedAgent(name="Analyst", replies=["draft", "save"], escalate_on="save")
+    loop = BudgetedLoopAgent(name="AnalysisLoop", sub_agents=[agent], max_iterations=8)
+    service = InMemorySessionService()
+    session = await service.create_session(app_name="app", user_id="u")
+    ctx = InvocationContext(
+        session_service=service,
+        invocation_id="inv-1",
+        agent=loop,
+        session=session,
+        resumability_config=ResumabilityConfig(is_resumable=True),
+    )
+
+    events = [event async for event in loop._run_async_impl(ctx)]
+
+    states = [e.actions.agent_state for e in events if e.actions.agent_state is not None]
+    assert [s["times_looped"] for s in states] == [0, 1]
+    assert states[0]["current_sub_agent"] == "Analyst"
+    assert events[-1].actions.end_of_agent is True
+
+
+@pytest.mark.asyncio
+async def test_time_budget_stops_before_the_next_iteration():
+    """Test a spent wall-clock budget stops the loop without running it."""
+    agent = ScriptedAgent(name="Analyst", replies=["draft"])
+    loop = BudgetedLoopAgent(name="AnalysisLoop", sub_agents=[agent], max_seconds=5.0)
+    ctx = _ctx({LOOP_CONTROL_KEY: {"AnalysisLoop": {"seconds": 6.0, "tokens": 0}}})
+
+    events = await _run(loop, ctx)
+
+    assert len(events) == 1  # only the state-delta event
+    assert ctx.session.state[LOOP_CONTROL_KEY]["AnalysisLoop"]["stop_reason"] == "time_budget"
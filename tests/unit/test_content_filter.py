@@ -0,0 +1,199 @@
+"""Unit tests for the local content scorer and the ContentFilter callback."""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import threading
+from typing import ClassVar
+from unittest.mock import MagicMock
+
+from google.genai.types import Content, Part
+import pytest
+
+from app.callbacks import content_filter as content_filter_module
+from app.callbacks.content_filter import ContentFilter
+from app.services.cache.verdicts import VerdictCache
+from app.services.safety.perspective import PerspectiveClient, PerspectiveError
+from app.services.safety.toxicity import scorer
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I feel so stupid and worthless, I'm such a loser",
+        "Me siento un inútil, joder, no sé qué hacer",
+        "Sometimes I want to kill myself",
+        "Hola, me siento muy ansioso hoy por el trabajo",
+    ],
+)
+def test_scorer_keeps_self_talk_below_threshold(text):
+    """Test self-directed harsh words and distress are not treated as abuse."""
+    assert scorer.score(text).score < 2.8
+
+
+@pytest.mark.parametrize(
+    ("text", "category"),
+    [
+        ("You are a stupid fucking idiot!!!", "insult"),
+        ("YOU STUUUPID 1D10T", "insult"),
+        ("eres un imbécil de mierda, gilipollas", "insult"),
+        ("I'm gonna kill you", "threat"),
+        ("te voy a matar", "threat"),
+        ("Ich bring dich um", "threat"),
+    ],
+)
+def test_scorer_flags_targeted_abuse(text, category):
+    """Test abuse aimed at the reader crosses the default threshold."""
+    result = scorer.score(text)
+
+    assert result.score >= 2.8
+    assert category in result.categories
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'My boss yelled "you are a useless idiot, you pathetic loser" in front of everyone',
+        "My boss told me you are a useless pathetic idiot, you are garbage",
+        "Mi jefe me dijo que eres un inútil, eres un imbécil",
+        "Mi jefe me gritó «¡eres un inútil, un idiota!»",
+        "He said he would find you and hurt you if I told anyone",
+    ],
+)
+def test_scorer_keeps_reported_abuse_below_threshold(text):
+    """Test users describing abuse they received are not flagged for repeating it."""
+    assert scorer.score(text).score < 2.8
+
+
+def test_scorer_still_targets_the_writers_own_words():
+    """Test a first-person reporting verb does not hide abuse aimed at the reader."""
+    assert scorer.score("I told you, you are a stupid worthless idiot").score >= 2.8
+
+
+def test_score_batch_matches_single_scores():
+    """Test batch scoring returns one score per text, in order."""
+    texts = ["hello", "you idiot", "te voy a matar"]
+
+    assert scorer.score_batch(texts) == [scorer.score(text) for text in texts]
+
+
+def _ctx(text: str) -> MagicMock:
+    ctx = MagicMock()
+    ctx.state = {"lang": "en"}
+    ctx.session.id = "session-1"
+    ctx.user_content = Content(parts=[Part(text=text)])
+    return ctx
+
+
+@pytest.mark.asyncio
+async def test_content_filter_passes_clean_messages_and_blocks_abuse():
+    """Test clean text passes and abuse is answered with a canned response."""
+    content_filter = ContentFilter(cache=VerdictCache())
+
+    assert await content_filter(callback_context=_ctx("I felt anxious"), llm_request=None) is None
+
+    ctx = _ctx("I'm gonna kill you, you idiot")
+    result = await content_filter(callback_context=ctx, llm_request=None)
+
+    assert result is not None
+    assert ctx.state["content_flagged"]["source"] == "local"
+    assert ctx.state["content_flagged"]["categories"] == ["insult", "threat"]
+
+
+@pytest.mark.asyncio
+async def test_content_filter_lets_users_report_abuse():
+    """Test a quoted insult from someone else reaches the model."""
+    content_filter = ContentFilter(cache=VerdictCache())
+    ctx = _ctx('My boss said "you are a useless idiot, you are pathetic" and I froze')
+
+    assert await content_filter(callback_context=ctx, llm_request=MagicMock()) is None
+    assert "content_flagged" not in ctx.state
+
+
+@pytest.mark.asyncio
+async def test_content_filter_scores_long_messages_off_the_event_loop(monkeypatch):
+    """Test long messages are scored in a worker thread."""
+    calls = []
+    real_to_thread = content_filter_module.asyncio.to_thread
+
+    async def spy(func, *args):
+        calls.append(func)
+        return await real_to_thread(func, *args)
+
+    monkeypatch.setattr(content_filter_module.asyncio, "to_thread", spy)
+    content_filter = ContentFilter(cache=VerdictCache())
+
+    await content_filter(callback_context=_ctx("hello " * 10), llm_request=None)
+    assert calls == []
+    await content_filter(callback_context=_ctx("hello " * 1000), llm_request=None)
+    assert calls == [content_filter.scorer.score_batch]
+
+
+class _PerspectiveStub(BaseHTTPRequestHandler):
+    toxicity = 0.9
+    requests: ClassVar[list[dict]] = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append(body)
+        payload = {"attributeScores": {"TOXICITY": {"summaryScore": {"value": self.toxicity}}}}
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def perspective_url():
+    _PerspectiveStub.requests = []
+    server = HTTPServer(("127.0.0.1", 0), _PerspectiveStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1alpha1/comments:analyze"
+    server.shutdown()
+    server.server_close()
+
+
+def test_perspective_client_reads_summary_score(perspective_url):
+    """Test the client speaks the Perspective JSON protocol."""
+    client = PerspectiveClient("secret", url=perspective_url)
+
+    assert client.score("some text", ["es"]) == 0.9
+    assert _PerspectiveStub.requests[0]["comment"] == {"text": "some text"}
+    assert _PerspectiveStub.requests[0]["languages"] == ["es"]
+
+
+def test_perspective_client_wraps_failures():
+    """Test unreachable endpoints raise PerspectiveError."""
+    client = PerspectiveClient("secret", url="http://127.0.0.1:9/analyze", timeout=0.5)
+
+    with pytest.raises(PerspectiveError):
+        client.score("text")
+
+
+@pytest.mark.asyncio
+async def test_content_filter_asks_remote_only_in_gray_zone(perspective_url):
+    """Test the remote scorer decides gray-zone messages and is skipped otherwise."""
+    remote = PerspectiveClient("secret", url=perspective_url)
+    content_filter = ContentFilter(remote=remote, cache=VerdictCache())
+
+    assert await content_filter(callback_context=_ctx("Hello there"), llm_request=None) is None
+    assert _PerspectiveStub.requests == []
+
+    ctx = _ctx("you idiot")  # 2.0: above the gray-zone floor, below the threshold
+    assert await content_filter(callback_context=ctx, llm_request=None) is not None
+    assert ctx.state["content_flagged"]["source"] == "perspective"
+    assert len(_PerspectiveStub.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_content_filter_falls_back_to_local_verdict():
+    """Test a failing remote scorer leaves the local verdict in place."""
+    remote = PerspectiveClient("secret", url="http://127.0.0.1:9/analyze", timeout=0.5)
+    content_filter = ContentFilter(remote=remote, cache=VerdictCache())
+
+    assert await content_filter(callback_context=_ctx("you idiot"), llm_request=None) is None
@@ -0,0 +1,185 @@
+"""Unit tests for the rule-based intake readiness check."""
+
+from unittest.mock import MagicMock
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.events import EventActions
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, FunctionCall, Part
+import pytest
+
+from app.agents.budgeted_loop import LOOP_CONTROL_KEY, BudgetedLoopAgent
+from app.agents.turn_gate import TurnGatedPipeline
+from app.callbacks.intake_readiness import CLOSING_MESSAGE, CLOSING_MESSAGES, IntakeReadiness
+from app.callbacks.intake_tracker import IntakeTracker
+from app.callbacks.transcript_acc import TranscriptAccumulator
+from app.services.parsing.slots import INTAKE_SLOTS_KEY
+from app.services.transcript.store import INTAKE_LEN_KEY, Transcript
+from app.tools.exit_loop import exit_loop
+
+
+def _ctx(state):
+    ctx = MagicMock()
+    ctx.state = state
+    ctx.actions = EventActions()
+    return ctx
+
+
+def _reply(text=None, call=None):
+    part = Part(function_call=FunctionCall(name=call)) if call else Part(text=text)
+    return LlmResponse(content=Content(role="model", parts=[part]))
+
+
+def test_incomplete_intake_is_left_alone():
+    """Test the collector's question goes out while fields are missing."""
+    ctx = _ctx({INTAKE_SLOTS_KEY: {"complete": False}})
+
+    assert IntakeReadiness()(callback_context=ctx, llm_response=_reply("And then?")) is None
+    assert not ctx.actions.escalate
+    assert INTAKE_LEN_KEY not in ctx.state
+
+
+def test_complete_intake_hands_off_like_exit_loop():
+    """Test full coverage escalates, marks the intake and closes the conversation."""
+    state = {INTAKE_SLOTS_KEY: {"complete": True}}
+    for turn in range(5):
+        Transcript(state).append("user", f"answer {turn}")
+        Transcript(state).append("assistant", f"question {turn}")
+    ctx = _ctx(state)
+
+    response = IntakeReadiness()(callback_context=ctx, llm_response=_reply("Anything else?"))
+
+    assert response.content.parts[0].text == CLOSING_MESSAGE
+    assert ctx.actions.escalate is True
+    assert ctx.state[INTAKE_LEN_KEY] == 10
+
+
+def test_closing_message_follows_the_session_language():
+    """Test a Spanish session is closed in Spanish and the transcript says so."""
+    state = {INTAKE_SLOTS_KEY: {"complete": True}, "lang": "es"}
+    transcript = Transcript(state)
+    transcript.append("user", "Me quedé callado.")
+    transcript.append("assistant", "¿Algo más que quieras añadir?")
+    ctx = _ctx(state)
+
+    response = IntakeReadiness()(callback_context=ctx, llm_response=_reply("¿Algo más?"))
+
+    assert response.content.parts[0].text == CLOSING_MESSAGES["es"]
+    assert Transcript(state).entries()[-1].text == CLOSING_MESSAGES["es"]
+    assert state[INTAKE_LEN_KEY] == 2
+
+
+def test_unknown_language_falls_back_to_english():
+    """Test a language without a translation gets the English message."""
+    assert IntakeReadiness().closing_message("nl") == CLOSING_MESSAGE
+    assert IntakeReadiness().closing_message(None) == CLOSING_MESSAGE
+
+
+def test_tool_calls_are_left_to_the_model():
+    """Test a response that already calls exit_loop is not rewritten."""
+    ctx = _ctx({INTAKE_SLOTS_KEY: {"complete": True}})
+
+    assert IntakeReadiness()(callback_context=ctx, llm_response=_reply(call="_exit_loop")) is None
+    assert not ctx.actions.escalate
+
+
+class Downstream(BaseAgent):
+    """Stands in for the parser: counts how often the pipeline reaches it."""
+
+    runs: int = 0
+
+    async def _run_async_impl(self, ctx):
+        self.runs += 1
+        return
+        yield
+
+
+QUESTIONS = [
+    "What went through your mind?",
+    "How did you feel?",
+    "What did you do?",
+    "How did it turn out in the end?",
+    "Is there anything else you'd like to add?",
+]
+ANSWERS = ["I froze in a meeting.", "They think I'm dull.", "Ashamed", "I left.", "I hid."]
+
+
+def _pipeline(model):
+    collector = LlmAgent(
+        name="CollectorLLM",
+        model=model,
+        instruction="Ask one question.",
+        after_model_callback=[
+            TranscriptAccumulator(append_only=True),
+            IntakeTracker(),
+            IntakeReadiness(),
+        ],
+        tools=[exit_loop],
+    )
+    loop = BudgetedLoopAgent(
+        name="CollectorLoop", sub_agents=[collector], max_iterations=12, await_user_after_reply=True
+    )
+    downstream = Downstream(name="JsonParser")
+    return TurnGatedPipeline(name="Pipeline", sub_agents=[loop, downstream]), downstream
+
+
+async def _converse(runner, session, answers):
+    replies = []
+    for answer in answers:
+        async for event in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text=answer)]),
+        ):
+            if event.author == "CollectorLLM" and event.content:
+                replies.append(event.content.parts[0].text)
+    return replies
+
+
+@pytest.mark.asyncio
+async def test_intake_ends_without_an_exit_loop_call(stub_llm):
+    """Test the pipeline moves on after the last field, although the model asks on."""
+    model = stub_llm(QUESTIONS)
+    root, downstream = _pipeline(model)
+    sessions = InMemorySessionService()
+    runner = Runner(app_name="reframe", agent=root, session_service=sessions)
+    session = await sessions.create_session(app_name="reframe", user_id="user")
+
+    replies = await _converse(runner, session, ANSWERS)
+
+    state = (
+        await sessions.get_session(app_name="reframe", user_id="user", session_id=session.id)
+    ).state
+    assert model.calls == 5
+    assert replies[-1] == CLOSING_MESSAGE
+    assert downstream.runs == 1
+    assert state[LOOP_CONTROL_KEY]["CollectorLoop"]["stop_reason"] == "escalated"
+    assert state[INTAKE_LEN_KEY] == 10
+    assert state["parsed"]["outcome"] == "I hid."
+    # The transcript records the closing message, not the question it replaced.
+    assert Transcript(state).entries()[-1].text == CLOSING_MESSAGE
+
+
+@pytest.mark.asyncio
+async def test_second_intake_in_a_session_also_ends_on_its_own(stub_llm):
+    """Test the readiness and the draft start over once the first intake is handed over."""
+    model = stub_llm(QUESTIONS * 2)
+    root, downstream = _pipeline(model)
+    sessions = InMemorySessionService()
+    runner = Runner(app_name="reframe", agent=root, session_service=sessions)
+    session = await sessions.create_session(app_name="reframe", user_id="user")
+
+    await _converse(runner, session, ANSWERS)
+    second = ["I snapped at a friend.", "I'm a bad friend.", "Guilty", "I apologised.", "Relief"]
+    replies = await _converse(runner, session, second)
+
+    state = (
+        await sessions.get_session(app_name="reframe", user_id="user", session_id=session.id)
+    ).state
+    assert replies[-1] == CLOSING_MESSAGE
+    assert downstream.runs == 2
+    assert state[INTAKE_LEN_KEY] == 20
+    assert state[INTAKE_SLOTS_KEY]["since"] == 10
+    assert state["parsed"]["outcome"] == "Relief"
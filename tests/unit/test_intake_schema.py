@@ -0,0 +1,112 @@
+"""Unit tests for the intake record schema and the parser's repair path."""
+
+from unittest.mock import MagicMock, patch
+
+from google.adk.events import Event
+from google.genai.types import Content, Part
+import pytest
+
+from app.agents.parser import JsonParserAgent
+from app.services.cache.parses import get_parse_cache
+from app.services.parsing.intake import IntakeParseError, parse_intake
+from app.services.prompts.builders import PARSER_REPAIR_KEY, parser_prompt_from_state
+from app.services.transcript.store import Transcript
+
+VALID = (
+    '{"situation": "A team meeting", "thoughts": ["They think I am boring"], '
+    '"feelings": ["anxious"], "behaviors": ["stayed quiet"], "outcome": "Felt drained"}'
+)
+
+
+def test_parse_intake_bare_object():
+    """Test schema-constrained output validates straight from the raw text."""
+    record = parse_intake(VALID)
+
+    assert record.situation == "A team meeting"
+    assert record.thoughts == ["They think I am boring"]
+    assert record.timestamp is None
+
+
+def test_parse_intake_wrapped_object_and_lenient_fields():
+    """Test prose around the object, single strings and nulls are tolerated."""
+    record = parse_intake(
+        'Here you go:\n```json\n{"situation": " A party ", "thoughts": "Everyone stares", '
+        '"feelings": null, "behaviors": ["left early"], "outcome": null, "extra": 1}\n```'
+    )
+
+    assert record.situation == "A party"
+    assert record.thoughts == ["Everyone stares"]
+    assert record.feelings == []
+    assert record.outcome == ""
+    assert "extra" not in record.model_dump()
+
+
+@pytest.mark.parametrize(
+    ("text", "message"),
+    [
+        ("I could not find anything.", "does not contain a JSON object"),
+        ('{"thoughts": ["x"]}', "situation: Field required"),
+        ('{"situation": "", "thoughts": 3}', "situation"),
+    ],
+)
+def test_parse_intake_errors_describe_the_problem(text, message):
+    """Test failures raise IntakeParseError with a repair-friendly message."""
+    with pytest.raises(IntakeParseError, match=message):
+        parse_intake(text)
+
+
+def _llm_returning(*texts):
+    """Patch target for parser_llm: each run answers with the next text."""
+    answers = iter(texts)
+    instructions = []
+
+    async def run_async(ctx):
+        instructions.append(parser_prompt_from_state(ctx.session.state))
+        yield Event(author="JsonParserLLM", content=Content(parts=[Part(text=next(answers))]))
+
+    def factory(structured_output):
+        assert structured_output is True
+        return MagicMock(run_async=run_async)
+
+    return factory, instructions
+
+
+async def _run(factory):
+    get_parse_cache().clear()
+    state: dict = {}
+    Transcript(state).append("user", "I froze in a meeting")
+    ctx = MagicMock(invocation_id="turn-1", branch=None)
+    ctx.session.state = state
+    with patch("app.agents.parser.parser_llm", side_effect=factory):
+        events = [event async for event in JsonParserAgent(name="JsonParser")._run_async_impl(ctx)]
+    return state, events
+
+
+@pytest.mark.asyncio
+async def test_parser_repairs_invalid_output_once():
+    """Test an invalid answer is repaired with its errors instead of a full re-run."""
+    factory, instructions = _llm_returning('{"thoughts": ["x"]}', VALID)
+
+    state, events = await _run(factory)
+
+    assert state["parsed"]["situation"] == "A team meeting"
+    assert state["parse_attempts"] == 2
+    assert "situation: Field required" in instructions[1]
+    assert '{"thoughts": ["x"]}' in instructions[1]
+    assert "I froze in a meeting" in instructions[1]
+    assert PARSER_REPAIR_KEY not in state
+    assert events[-1].content.parts[0].text.startswith("Successfully extracted")
+
+
+@pytest.mark.asyncio
+async def test_parser_falls_back_to_raw_response_after_repairs():
+    """Test the raw response is kept once the repair budget is spent."""
+    factory, instructions = _llm_returning("", "still nothing")
+
+    state, events = await _run(factory)
+
+    assert len(instructions) == 2
+    assert instructions[0] == instructions[1]  # an empty answer - same prompt again
+    assert state["parse_attempts"] == 2
+    assert state["parsed"] == {"raw_response": "still nothing"}
+    assert events[-1].content.parts[0].text == "still nothing"
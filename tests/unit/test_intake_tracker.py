@@ -0,0 +1,214 @@
+"""Unit tests for the slot-filling intake tracker."""
+
+from unittest.mock import MagicMock
+
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+import pytest
+
+from app.agents.parser import JsonParserAgent
+from app.callbacks.intake_tracker import IntakeTracker
+from app.services.parsing.slots import INTAKE_SLOTS_KEY, question_slot, split_items
+from app.services.transcript.store import Transcript
+
+CONVERSATION = [
+    (
+        "I froze when my manager asked me a question in the team meeting.",
+        "What went through your mind?",
+    ),
+    (
+        "Everyone thinks I'm incompetent. I'm going to get fired.",
+        "How did you feel in that moment?",
+    ),
+    ("Anxious, embarrassed and hot", "What did you do?"),
+    ("I mumbled something and stared at my notes.", "How did you feel afterwards?"),
+    ("I replayed it all evening and skipped lunch the next day.", None),
+]
+
+
+def _turn(tracker, state, turn_id, user_text, reply):
+    ctx = MagicMock()
+    ctx.state = state
+    ctx.invocation_id = turn_id
+    ctx.user_content = Content(parts=[Part(text=user_text)])
+    content = Content(parts=[Part(text=reply)]) if reply else None
+    assert tracker(callback_context=ctx, llm_response=LlmResponse(content=content)) is None
+
+
+@pytest.mark.parametrize(
+    ("question", "slot"),
+    [
+        ("What went through your mind?", "thoughts"),
+        ("How did you feel?", "feelings"),
+        ("How did you feel afterwards?", "outcome"),
+        ("What did you do next?", "behaviors"),
+        ("Can you describe what happened?", "situation"),
+        ("Thank you for sharing.", None),
+        ("Hi! What's on your mind today?", "situation"),
+        ("Any other thoughts about it?", "thoughts"),
+        ("What feelings came up?", "feelings"),
+        ("¿Qué tienes en mente hoy?", "situation"),
+        ("¿Qué pasó por tu mente en ese momento?", "thoughts"),
+        ("¿Cómo te sentiste?", "feelings"),
+        ("¿Qué hiciste?", "behaviors"),
+        ("¿Cómo te sentiste después?", "outcome"),
+    ],
+)
+def test_question_slot(question, slot):
+    """Test collector questions are mapped to the field they ask about."""
+    assert question_slot(question) == slot
+
+
+def test_split_items():
+    """Test feelings split on "and"/commas, other lists on sentences only."""
+    assert split_items("feelings", "Anxious, embarrassed and hot") == [
+        "Anxious",
+        "embarrassed",
+        "hot",
+    ]
+    assert split_items("thoughts", "They think I'm dull and slow. I'll be fired!") == [
+        "They think I'm dull and slow",
+        "I'll be fired!",
+    ]
+
+
+def test_tracker_fills_the_record_and_stores_parsed():
+    """Test a full intake leaves a validated record in state["parsed"]."""
+    tracker, state = IntakeTracker(), {}
+
+    for turn, (answer, question) in enumerate(CONVERSATION):
+        assert "parsed" not in state
+        _turn(tracker, state, f"inv-{turn}", answer, question)
+
+    parsed = state["parsed"]
+    assert parsed["situation"].startswith("I froze")
+    assert parsed["thoughts"] == ["Everyone thinks I'm incompetent", "I'm going to get fired"]
+    assert parsed["feelings"] == ["Anxious", "embarrassed", "hot"]
+    assert parsed["behaviors"] == ["I mumbled something and stared at my notes"]
+    assert parsed["outcome"].startswith("I replayed it")
+    assert parsed["timestamp"]
+    assert state[INTAKE_SLOTS_KEY]["complete"] is True
+
+
+def test_tracker_records_an_answer_once_per_invocation():
+    """Test a second model call in the same turn does not repeat the answer."""
+    tracker, state = IntakeTracker(), {}
+    _turn(tracker, state, "inv-0", "A meeting went badly.", "What did you do?")
+    _turn(tracker, state, "inv-1", "I left early.", None)
+    _turn(tracker, state, "inv-1", "I left early.", "How did you feel?")
+
+    record = state[INTAKE_SLOTS_KEY]["record"]
+    assert record["behaviors"] == ["I left early"]
+    assert state[INTAKE_SLOTS_KEY]["pending"] == "feelings"
+    assert "parsed" not in state
+
+
+def test_greeting_and_opener_do_not_misplace_the_answers():
+    """Test a greeting fills nothing and the opener's answer is the situation."""
+    tracker, state = IntakeTracker(), {}
+    _turn(tracker, state, "inv-0", "Hi!", "Hi! What's on your mind today?")
+    assert state[INTAKE_SLOTS_KEY]["record"]["situation"] == ""
+
+    _turn(tracker, state, "inv-1", "My presentation went badly.", "What thoughts came up?")
+    _turn(tracker, state, "inv-2", "I'm a fraud.", None)
+
+    record = state[INTAKE_SLOTS_KEY]["record"]
+    assert record["situation"] == "My presentation went badly."
+    assert record["thoughts"] == ["I'm a fraud"]
+
+
+def test_tracker_fills_a_spanish_intake():
+    """Test Spanish questions place each answer in its field."""
+    tracker, state = IntakeTracker(), {}
+    conversation = [
+        ("Hola", "Hola, ¿qué tienes en mente hoy?"),
+        ("Me bloqueé en una reunión con mi jefe.", "¿Qué pasó por tu mente en ese momento?"),
+        ("Pensé que soy un inútil.", "¿Cómo te sentiste?"),
+        ("Ansioso, avergonzado y triste", "¿Qué hiciste?"),
+        ("Me quedé callado.", "¿Cómo te sentiste después?"),
+        ("Estuve dándole vueltas toda la noche.", None),
+    ]
+
+    for turn, (answer, question) in enumerate(conversation):
+        _turn(tracker, state, f"inv-{turn}", answer, question)
+
+    parsed = state["parsed"]
+    assert parsed["situation"] == "Me bloqueé en una reunión con mi jefe."
+    assert parsed["thoughts"] == ["Pensé que soy un inútil"]
+    assert parsed["feelings"] == ["Ansioso", "avergonzado", "triste"]
+    assert parsed["behaviors"] == ["Me quedé callado"]
+    assert parsed["outcome"] == "Estuve dándole vueltas toda la noche."
+
+
+@pytest.mark.asyncio
+async def test_parser_runs_by_default_even_with_a_tracked_record(monkeypatch):
+    """Test the tracked draft does not replace the parser unless enabled."""
+    tracker, state = IntakeTracker(), {}
+    for turn, (answer, question) in enumerate(CONVERSATION):
+        _turn(tracker, state, f"inv-{turn}", answer, question)
+
+    with pytest.raises(AssertionError, match="parser LLM"):
+        await _parse_without_llm(monkeypatch, state)
+
+
+async def _parse_without_llm(monkeypatch, state):
+    Transcript(state).append("user", "I froze in a meeting.")
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("the parser LLM must not run")
+
+    monkeypatch.setattr("app.agents.parser.parser_llm", no_llm)
+    monkeypatch.setattr("app.agents.parser.get_parse_cache", lambda: None)
+    ctx = MagicMock(invocation_id="turn-1", branch=None)
+    ctx.session.state = state
+    return [event async for event in JsonParserAgent(name="JsonParser")._run_async_impl(ctx)]
+
+
+@pytest.mark.asyncio
+async def test_parser_skips_the_llm_for_a_tracked_record(monkeypatch):
+    """Test JsonParserAgent reuses the tracked record without a model call."""
+    monkeypatch.setattr("app.agents.parser.settings.parser_use_tracked_record", True)
+    tracker, state = IntakeTracker(), {}
+    for turn, (answer, question) in enumerate(CONVERSATION):
+        _turn(tracker, state, f"inv-{turn}", answer, question)
+
+    events = await _parse_without_llm(monkeypatch, state)
+
+    assert len(events) == 1
+    assert state["parse_attempts"] == 0
+    assert state["parsed"]["feelings"] == ["Anxious", "embarrassed", "hot"]
+
+
+@pytest.mark.asyncio
+async def test_runner_stores_the_tracked_record_without_a_parser_call(monkeypatch):
+    """Test the opt-in flag through a Runner: the tracked record is stored, no model runs."""
+    monkeypatch.setattr("app.agents.parser.settings.parser_use_tracked_record", True)
+    tracker, state = IntakeTracker(), {}
+    for turn, (answer, question) in enumerate(CONVERSATION):
+        _turn(tracker, state, f"inv-{turn}", answer, question)
+    Transcript(state).append("user", "I froze in a meeting.")
+
+    def no_llm(*args, **kwargs):
+        raise AssertionError("the parser LLM must not run")
+
+    monkeypatch.setattr("app.agents.parser.parser_llm", no_llm)
+    sessions = InMemorySessionService()
+    runner = Runner(
+        app_name="reframe", agent=JsonParserAgent(name="JsonParser"), session_service=sessions
+    )
+    session = await sessions.create_session(app_name="reframe", user_id="u", state=state)
+
+    async for _ in runner.run_async(
+        user_id="u",
+        session_id=session.id,
+        new_message=Content(role="user", parts=[Part(text="ok")]),
+    ):
+        pass
+
+    stored = (
+        await sessions.get_session(app_name="reframe", user_id="u", session_id=session.id)
+    ).state
+    assert stored["parse_attempts"] == 0
+    assert stored["parsed"]["feelings"] == ["Anxious", "embarrassed", "hot"]
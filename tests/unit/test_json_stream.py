@@ -0,0 +1,63 @@
+"""Unit tests for the incremental JSON object extractor."""
+
+import json
+
+import pytest
+
+from app.services.parsing.json_stream import JsonObjectExtractor, extract_json_object
+
+RECORD = {
+    "situation": "Team meeting {weekly}",
+    "thoughts": ['They think I\'m "boring" }', "I\\will fail"],
+    "feelings": ["anxious"],
+}
+
+RESPONSE = (
+    "Sure! I extracted the data {as requested}, see below:\n"
+    f"```json\n{json.dumps(RECORD, indent=2)}\n```\n"
+    'Let me know if you need a different {"format"}.'
+)
+
+
+def test_extracts_first_object_past_prose_braces():
+    """Test braces in prose and inside strings do not confuse the extractor."""
+    assert extract_json_object(RESPONSE) == RECORD
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_streamed_chunks_give_the_same_result(size):
+    """Test the object is found however the response is split into chunks."""
+    extractor = JsonObjectExtractor()
+    results = [extractor.feed(RESPONSE[i : i + size]) for i in range(0, len(RESPONSE), size)]
+
+    completed = [i for i, result in enumerate(results) if result is not None]
+    assert results[completed[0]] == RECORD
+    # Emitted as soon as the closing brace arrives, before the closing fence.
+    closing = RESPONSE.index("\n```\n", RESPONSE.index("```json") + 7)
+    assert completed[0] * size <= closing
+
+
+def test_fence_around_truncated_object_is_dropped():
+    """Test an unbalanced object inside a fence does not swallow the next one."""
+    text = '```json\n{"situation": "cut off\n```\nRetry: {"situation": "ok"}'
+
+    assert extract_json_object(text) == {"situation": "ok"}
+
+
+def test_returns_none_without_a_complete_object():
+    """Test prose-only and unfinished responses yield nothing."""
+    extractor = JsonObjectExtractor()
+
+    assert extractor.feed("No JSON here, just {prose}.") is None
+    assert extractor.feed('{"situation": "still') is None
+    assert not extractor.done
+    assert extractor.feed(' going"}') == {"situation": "still going"}
+    assert extractor.done
+
+
+def test_buffers_only_the_candidate():
+    """Test prose before the object is not kept in memory."""
+    extractor = JsonObjectExtractor()
+    extractor.feed("x" * 10_000 + '{"a": ')
+
+    assert sum(map(len, extractor._buffer)) == len('{"a": ')
@@ -113,3 +113,77 @@ def test_lang_detect_multiple_parts():
 
     assert result is None
     assert ctx.state["lang"] == "es"  # Spanish characters detected
+
+
+def test_lang_detect_other_supported_languages():
+    """Test detection beyond Spanish/English stores language and confidence."""
+    samples = {
+        "fr": "Je me sens très seul depuis que j'ai changé de travail.",
+        "de": "Ich habe Angst, dass meine Kollegen schlecht über mich denken.",
+        "it": "Ho paura che i miei amici pensino che sono noioso.",
+        "pt": "Tenho medo que os meus amigos achem que sou aborrecido.",
+        "ca": "Tinc por que els meus amics pensin que sóc avorrit.",
+    }
+    for expected, text in samples.items():
+        callback = LangCallback()
+
+        ctx = MagicMock()
+        ctx.state = {}
+        ctx.user_content = Content(parts=[Part(text=text)])
+
+        result = callback(callback_context=ctx, llm_request=MagicMock())
+
+        assert result is None
+        assert ctx.state["lang"] == expected
+        assert 0.5 < ctx.state["lang_confidence"] <= 1.0
+
+
+def _send(callback, state, text, invocation_id):
+    ctx = MagicMock()
+    ctx.state = state
+    ctx.invocation_id = invocation_id
+    ctx.user_content = Content(parts=[Part(text=text)])
+    return callback(callback_context=ctx, llm_request=MagicMock())
+
+
+def test_lang_detect_switches_when_evidence_shifts():
+    """Test the session language follows the user once they keep writing in another one."""
+    callback = LangCallback()
+    state = {}
+
+    _send(callback, state, "Hi, I had a really awkward moment at work today.", "inv-1")
+    assert state["lang"] == "en"
+
+    # A single short foreign phrase is not enough to switch.
+    _send(callback, state, "Bueno, sí.", "inv-2")
+    assert state["lang"] == "en"
+
+    _send(callback, state, "Perdona, prefiero hablar en español, me resulta más fácil.", "inv-3")
+    _send(callback, state, "Estaba en una reunión y me quedé en blanco delante de todos.", "inv-4")
+    assert state["lang"] == "es"
+    assert 0.5 < state["lang_confidence"] <= 1.0
+
+
+def test_lang_detect_folds_each_message_once_per_turn():
+    """Test LoopAgent re-invocations do not count the same message again."""
+    callback = LangCallback()
+    state = {}
+
+    _send(callback, state, "Je me sens nerveux avant chaque réunion.", "inv-1")
+    scores = dict(state["lang_scores"])
+    for _ in range(11):
+        _send(callback, state, "Je me sens nerveux avant chaque réunion.", "inv-1")
+
+    assert state["lang_scores"] == scores
+
+
+def test_lang_detect_state_stays_constant_size():
+    """Test the running model keeps one score per language, whatever the history length."""
+    callback = LangCallback()
+    state = {}
+
+    for turn in range(50):
+        _send(callback, state, f"Message number {turn} about my day at work.", f"inv-{turn}")
+
+    assert state["lang"] == "en"
+    assert len(state["lang_scores"]) == 7
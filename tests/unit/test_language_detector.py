@@ -0,0 +1,57 @@
+"""Unit tests for the n-gram language detector."""
+
+from collections import Counter
+import json
+from pathlib import Path
+
+from app.services.language.detector import NgramLanguageDetector, detect_language
+from app.services.language.profiles import TRAINING_SAMPLES
+
+CORPUS_PATH = Path(__file__).parents[1] / "data" / "lang_corpus.jsonl"
+
+
+def load_corpus() -> list[dict[str, str]]:
+    with CORPUS_PATH.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_corpus_covers_every_supported_language():
+    """Test the labelled corpus has samples for every profiled language."""
+    counts = Counter(row["lang"] for row in load_corpus())
+
+    assert set(counts) == set(TRAINING_SAMPLES)
+    assert min(counts.values()) >= 10
+
+
+def test_detector_accuracy_on_labelled_corpus():
+    """Test accuracy on held-out messages stays high for every language."""
+    corpus = load_corpus()
+    correct: Counter[str] = Counter()
+    for row in corpus:
+        if detect_language(row["text"]).lang == row["lang"]:
+            correct[row["lang"]] += 1
+
+    assert sum(correct.values()) / len(corpus) >= 0.95
+    totals = Counter(row["lang"] for row in corpus)
+    for lang, total in totals.items():
+        assert correct[lang] / total >= 0.85, lang
+
+
+def test_detector_confidence_and_default():
+    """Test confidence is a probability and empty text falls back to the default."""
+    guess = detect_language("I keep thinking that everyone is judging me at work.")
+    assert guess.lang == "en"
+    assert 0.9 < guess.confidence <= 1.0
+
+    assert detect_language("", default="es") == ("es", 0.0)
+    assert detect_language("12345 !!!") == ("en", 0.0)
+
+
+def test_detector_probabilities_sum_to_one():
+    """Test the posterior is a distribution over the compiled languages."""
+    detector = NgramLanguageDetector()
+    probabilities, n_words = detector.probabilities("Gracias, me siento un poco mejor hoy.")
+
+    assert n_words == 7
+    assert len(probabilities) == len(detector.languages)
+    assert abs(sum(probabilities) - 1.0) < 1e-9
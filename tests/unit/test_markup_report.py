@@ -0,0 +1,208 @@
+"""Unit tests for the HTML/Markdown report and the lazily rendered PDF."""
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.cli.service_registry import load_services_module
+from google.adk.cli.utils.service_factory import create_artifact_service_from_options
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Blob, Content, Part
+import pytest
+from reportlab import rl_config
+
+from app.agents import pdf_agent
+from app.agents.pdf_agent import PdfAgent
+from app.services.cache.renders import RenderCache
+from app.services.rendering.lazy import (
+    REPORT_PDF,
+    REPORT_SOURCE,
+    LazyPdfArtifactService,
+    report_source,
+)
+from app.services.rendering.markup import render_html, render_markdown
+from app.services.rendering.pool import RenderPool
+from app.services.rendering.report import ReportData
+from app.tools.pdf_generator import build_pdf_bytes
+
+PARSED = {
+    "situation": "A <b>team</b> meeting | all hands",
+    "thoughts": ["They think I'm dull"],
+    "feelings": ["anxious", "ashamed"],
+    "behaviors": ["froze"],
+    "outcome": "Drained",
+}
+ANALYSIS = (
+    '{"distortions": ["MW"], "balanced_thought": "One pause is not failure.",'
+    ' "certainty_before": 80, "certainty_after": 40}'
+)
+SCOPE = {"app_name": "app", "user_id": "u", "session_id": "s"}
+ROOT = Path(__file__).resolve().parents[2]  # the agents dir of adk web / api_server
+
+
+def test_html_report_has_every_section_and_escapes_session_text():
+    """Test the HTML page shows the PDF's content without interpreting user markup."""
+    html = render_html(ReportData.from_session(PARSED, ANALYSIS, date="2026-01-02"))
+
+    assert "A &lt;b&gt;team&lt;/b&gt; meeting | all hands" in html
+    assert "<td>anxious, ashamed</td>" in html
+    assert "Mind Reading" in html
+    assert "<i>One pause is not failure.</i>" in html
+    assert "80% → 40%" in html
+    assert "<b>team</b>" not in html
+
+
+def test_markdown_report_keeps_the_table_intact():
+    """Test session text cannot break the snapshot table or add formatting."""
+    markdown = render_markdown(
+        ReportData.from_session(PARSED, "First.\n\nSecond", date="2026-01-02")
+    )
+
+    assert "| Situation | A \\<b\\>team\\</b\\> meeting \\| all hands |" in markdown
+    assert "| Feelings | anxious, ashamed |" in markdown
+    assert "First.\n\nSecond\n" in markdown
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_rendered_from_its_source_on_first_load(monkeypatch):
+    """Test report.pdf appears with its source's versions and renders once."""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    inner = InMemoryArtifactService()
+    lazy = LazyPdfArtifactService(
+        inner, pool=RenderPool("thread", max_workers=1), cache=RenderCache()
+    )
+    await lazy.save_artifact(
+        filename=REPORT_SOURCE, artifact=report_source(PARSED, ANALYSIS, "2026-01-02"), **SCOPE
+    )
+
+    assert await lazy.list_artifact_keys(**SCOPE) == [REPORT_SOURCE, REPORT_PDF]
+    assert await lazy.list_versions(filename=REPORT_PDF, **SCOPE) == [0]
+    first = await lazy.load_artifact(filename=REPORT_PDF, **SCOPE)
+    again = await lazy.load_artifact(filename=REPORT_PDF, version=0, **SCOPE)
+
+    assert first.inline_data.mime_type == "application/pdf"
+    assert first.inline_data.data == build_pdf_bytes(PARSED, ANALYSIS, date="2026-01-02")
+    assert again.inline_data.data == first.inline_data.data
+    assert lazy.rendered == 1
+
+
+@pytest.mark.asyncio
+async def test_saved_pdfs_are_served_unchanged():
+    """Test a session without a report source keeps its eagerly saved PDF."""
+    inner = InMemoryArtifactService()
+    lazy = LazyPdfArtifactService(inner)
+    pdf = Part(inline_data=Blob(data=b"%PDF-eager", mime_type="application/pdf"))
+    await lazy.save_artifact(filename=REPORT_PDF, artifact=pdf, **SCOPE)
+
+    loaded = await lazy.load_artifact(filename=REPORT_PDF, **SCOPE)
+
+    assert loaded.inline_data.data == b"%PDF-eager"
+    assert lazy.rendered == 0
+
+
+@pytest.mark.asyncio
+async def test_pdf_agent_saves_html_and_no_pdf(monkeypatch):
+    """Test the html report format saves the page and the PDF's source only."""
+    monkeypatch.setattr(pdf_agent.settings, "report_format", "html")
+    inner = InMemoryArtifactService()
+
+    async def save_artifact(filename, artifact):
+        return await inner.save_artifact(filename=filename, artifact=artifact, **SCOPE)
+
+    state = {"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(id="s", state=state),
+        artifact_service=LazyPdfArtifactService(inner),
+        save_artifact=save_artifact,
+        get_artifact_url=AsyncMock(return_value="https://example.com/report.html"),
+    )
+
+    with patch("app.agents.pdf_agent.build_pdf_bytes") as build:
+        events = [event async for event in PdfAgent()._produce(ctx)]
+
+    build.assert_not_called()
+    assert await inner.list_artifact_keys(**SCOPE) == ["report.html", REPORT_SOURCE]
+    output = events[0].actions.state_delta["pdf_output"]
+    assert output["report_format"] == "html"
+    assert output["pdf_version"] == 0
+    assert events[0].content.parts[0].text.endswith("report.html")
+    pdf = await LazyPdfArtifactService(inner).load_artifact(filename=REPORT_PDF, **SCOPE)
+    assert pdf.inline_data.data.startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_pdf_is_only_advertised_by_a_lazy_artifact_service(monkeypatch):
+    """Test report.pdf is not named in the output when nothing would render it."""
+    monkeypatch.setattr(pdf_agent.settings, "report_format", "html")
+    inner = InMemoryArtifactService()
+
+    async def save_artifact(filename, artifact):
+        return await inner.save_artifact(filename=filename, artifact=artifact, **SCOPE)
+
+    state = {"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(id="s", state=state),
+        artifact_service=inner,
+        save_artifact=save_artifact,
+        get_artifact_url=AsyncMock(return_value="https://example.com/report.html"),
+    )
+
+    events = [event async for event in PdfAgent()._produce(ctx)]
+
+    output = events[0].actions.state_delta["pdf_output"]
+    assert output["report_filename"] == "report.html"
+    assert "pdf_filename" not in output
+    assert await inner.load_artifact(filename=REPORT_PDF, **SCOPE) is None
+
+
+def test_served_app_wraps_its_artifact_service():
+    """Test the services.py adk web / api_server load registers the lazypdf+ URIs."""
+    load_services_module(str(ROOT))
+
+    service = create_artifact_service_from_options(
+        base_dir=ROOT, artifact_service_uri="lazypdf+memory://", strict_uri=True
+    )
+
+    assert isinstance(service, LazyPdfArtifactService)
+    assert isinstance(service.inner, InMemoryArtifactService)
+
+
+@pytest.mark.asyncio
+async def test_runner_serves_the_advertised_pdf(monkeypatch):
+    """Test the report.pdf PdfAgent advertises loads through the Runner's artifact service."""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    monkeypatch.setattr(pdf_agent.settings, "report_format", "html")
+    artifacts = LazyPdfArtifactService(
+        InMemoryArtifactService(), pool=RenderPool("thread", max_workers=1), cache=RenderCache()
+    )
+    sessions = InMemorySessionService()
+    runner = Runner(
+        app_name="reframe", agent=PdfAgent(), session_service=sessions, artifact_service=artifacts
+    )
+    session = await sessions.create_session(
+        app_name="reframe", user_id="u", state={"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    )
+
+    async for _ in runner.run_async(
+        user_id="u",
+        session_id=session.id,
+        new_message=Content(role="user", parts=[Part(text="ok")]),
+    ):
+        pass
+
+    scope = {"app_name": "reframe", "user_id": "u", "session_id": session.id}
+    advertised = (await sessions.get_session(**scope)).state["pdf_output"]
+    assert advertised["pdf_filename"] in await artifacts.list_artifact_keys(**scope)
+    pdf = await artifacts.load_artifact(
+        filename=advertised["pdf_filename"], version=advertised["pdf_version"], **scope
+    )
+    source = await artifacts.load_artifact(filename=REPORT_SOURCE, **scope)
+    date = json.loads(source.inline_data.data)["date"]
+    assert pdf.inline_data.data == build_pdf_bytes(PARSED, ANALYSIS, date=date)
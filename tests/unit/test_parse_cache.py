@@ -0,0 +1,147 @@
+"""Unit tests for the content-addressed parse cache."""
+
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+from google.adk.events import Event
+from google.genai.types import Content, Part
+import pytest
+
+from app.agents.parser import JsonParserAgent
+from app.services.cache.parses import (
+    MemoryBackend,
+    ParseCache,
+    SqliteBackend,
+    get_parse_cache,
+    normalise_transcript,
+)
+from app.services.transcript.store import Transcript
+
+PARSED = {"situation": "A meeting", "thoughts": ["x"], "feelings": [], "behaviors": []}
+
+
+def test_normalise_transcript_ignores_cosmetic_differences():
+    """Test whitespace runs, blank lines and Unicode forms do not change the key."""
+    a = "user:  I  felt\u00a0anxious \n\n\nassistant: Why?\n"
+    b = "user: I felt anxious\nassistant: Why?"
+
+    assert normalise_transcript(a) == normalise_transcript(b) == b
+    assert normalise_transcript("cafe\u0301") == normalise_transcript("caf\u00e9")
+    assert ParseCache.key(a, "v1") == ParseCache.key(b, "v1")
+    assert ParseCache.key(b, "v1") != ParseCache.key(b, "v2")
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_backends_roundtrip_and_count_hits(kind, tmp_path):
+    """Test every backend stores parses and the cache tracks its hit rate."""
+    backend = (
+        MemoryBackend(max_entries=8)
+        if kind == "memory"
+        else SqliteBackend(str(tmp_path / "parses.sqlite3"), max_entries=8)
+    )
+    cache = ParseCache(backend)
+
+    assert cache.get("user: hi", "v1") is None
+    cache.put("user: hi", "v1", PARSED)
+    assert cache.get("user:  hi\n", "v1") == PARSED
+    assert cache.get("user: hi", "v2") is None
+
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "entries": 1}
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_backends_evict_by_size_and_ttl(kind, tmp_path):
+    """Test least recently used entries beyond max_entries and expired ones are dropped."""
+
+    def make(**options):
+        if kind == "memory":
+            return MemoryBackend(**options)
+        return SqliteBackend(str(tmp_path / f"{options['ttl']}.sqlite3"), **options)
+
+    backend = make(max_entries=2, ttl=60)
+    backend.set(b"a", "1")
+    backend.set(b"b", "2")
+    assert backend.get(b"a") == "1"  # "a" is now the most recently used
+    backend.set(b"c", "3")
+
+    assert len(backend) == 2
+    assert backend.get(b"b") is None
+    assert backend.get(b"a") == "1"
+
+    expired = make(max_entries=2, ttl=0)
+    expired.set(b"a", "1")
+    assert expired.get(b"a") is None
+
+
+@pytest.mark.asyncio
+async def test_parser_reuses_cached_parse():
+    """Test a second run over the same transcript skips the parser LLM."""
+    get_parse_cache().clear()
+    calls = []
+
+    async def run_async(_ctx):
+        calls.append("JsonParserLLM")
+        text = '{"situation": "A meeting", "thoughts": ["x"]}'
+        yield Event(author="JsonParserLLM", content=Content(parts=[Part(text=text)]))
+
+    states = []
+    with patch("app.agents.parser.parser_llm", return_value=MagicMock(run_async=run_async)):
+        for transcript in ("I froze in a meeting", "I  froze in a meeting "):
+            state: dict = {}
+            Transcript(state).append("user", transcript)
+            ctx = MagicMock(invocation_id="turn-1", branch=None)
+            ctx.session.state = state
+            events = [
+                event async for event in JsonParserAgent(name="JsonParser")._run_async_impl(ctx)
+            ]
+            states.append(state)
+            # The token estimate travels in a state delta, so the session service persists it.
+            assert "parser" in events[0].actions.state_delta["prompt_tokens"]
+
+    assert calls == ["JsonParserLLM"]
+    assert states[0]["parsed"] == states[1]["parsed"]
+    assert states[1]["parse_attempts"] == 0
+    assert get_parse_cache().stats()["hit_rate"] == 0.5
+
+
+class _BrokenBackend(MemoryBackend):
+    """A backend whose database has gone away."""
+
+    def get(self, key):
+        raise sqlite3.OperationalError("database is locked")
+
+    def set(self, key, value):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_backend_errors_read_as_misses(tmp_path):
+    """Test a failing backend never fails the caller, and the sqlite file's directory is created."""
+    cache = ParseCache(_BrokenBackend())
+
+    assert cache.get("user: hi", "v1") is None
+    cache.put("user: hi", "v1", PARSED)
+    assert cache.misses == 1
+
+    SqliteBackend(str(tmp_path / "private" / "parses.sqlite3")).set(b"a", "1")
+    assert (tmp_path / "private" / "parses.sqlite3").exists()
+
+
+@pytest.mark.asyncio
+async def test_parser_parses_when_the_cache_backend_fails():
+    """Test a cache outage falls back to the parser LLM instead of failing the parse."""
+
+    async def run_async(_ctx):
+        text = '{"situation": "A meeting", "thoughts": ["x"]}'
+        yield Event(author="JsonParserLLM", content=Content(parts=[Part(text=text)]))
+
+    state: dict = {}
+    Transcript(state).append("user", "I froze in a meeting")
+    ctx = MagicMock(invocation_id="turn-1", branch=None)
+    ctx.session.state = state
+    with (
+        patch("app.agents.parser.parser_llm", return_value=MagicMock(run_async=run_async)),
+        patch("app.agents.parser.get_parse_cache", return_value=ParseCache(_BrokenBackend())),
+    ):
+        [event async for event in JsonParserAgent(name="JsonParser")._run_async_impl(ctx)]
+
+    assert state["parsed"]["situation"] == "A meeting"
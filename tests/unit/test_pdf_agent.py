@@ -13,7 +13,7 @@ async def test_pdf_agent_yields_events():
     agent = PdfAgent()
 
     # Mock context
-    ctx = AsyncMock()
+    ctx = AsyncMock(invocation_id="i", branch=None)
     ctx.session.state = {"intake_data": {"name": "Test User"}, "analysis_output": "Test analysis"}
     ctx.save_artifact = AsyncMock(return_value="v1")
     ctx.get_artifact_url = AsyncMock(return_value="https://example.com/report.pdf")
@@ -34,10 +34,11 @@ async def test_pdf_agent_yields_events():
     assert events[0].author == "PdfGenerator"
     assert events[0].content.parts[0].text == "📄 PDF generated: https://example.com/report.pdf"
 
-    # Check state was updated
-    assert ctx.session.state["pdf_output"]["pdf_filename"] == "report.pdf"
-    assert ctx.session.state["pdf_output"]["version"] == "v1"
-    assert ctx.session.state["pdf_output"]["url"] == "https://example.com/report.pdf"
+    # Check the state delta carries the output
+    pdf_output = events[0].actions.state_delta["pdf_output"]
+    assert pdf_output["pdf_filename"] == "report.pdf"
+    assert pdf_output["version"] == "v1"
+    assert pdf_output["url"] == "https://example.com/report.pdf"
 
 
 @pytest.mark.asyncio
@@ -46,7 +47,7 @@ async def test_pdf_agent_run_async_impl():
     agent = PdfAgent()
 
     # Mock context
-    ctx = AsyncMock()
+    ctx = AsyncMock(invocation_id="i", branch=None)
     ctx.session.state = {"intake_data": {}, "analysis_output": ""}
     ctx.save_artifact = AsyncMock(return_value="v1")
     ctx.get_artifact_url = AsyncMock(return_value="https://example.com/report.pdf")
@@ -0,0 +1,99 @@
+"""Unit tests for the single-pass PII scanner."""
+
+import pytest
+
+from app.services.safety.pii import PiiScanner, luhn_valid, redact, scanner
+
+
+@pytest.mark.parametrize(
+    ("text", "category", "value"),
+    [
+        ("write to maria.lopez+test@gmail.com today", "email", "maria.lopez+test@gmail.com"),
+        ("call me on +34 612 345 678", "phone", "+34 612 345 678"),
+        ("home 020-7946-0958", "phone", "020-7946-0958"),
+        ("office 555.123.4567", "phone", "555.123.4567"),
+        ("my mobile is 612345678", "phone", "612345678"),
+        ("office (555) 123-4567", "phone", "(555) 123-4567"),
+        ("IBAN ES91 2100 0418 4502 0005 1332", "iban", "ES91 2100 0418 4502 0005 1332"),
+        ("card 4111 1111 1111 1111 exp 12/27", "credit_card", "4111 1111 1111 1111"),
+        ("DNI 12345678Z", "dni", "12345678Z"),
+        ("NIE X1234567L", "nie", "X1234567L"),
+        ("SSN 123-45-6789", "ssn", "123-45-6789"),
+        ("number 123456789", "ssn", "123456789"),
+    ],
+)
+def test_scanner_detects_each_category(text, category, value):
+    """Test every supported category is found with its exact span."""
+    matches = [match for match in scanner.scan(text) if match.category != "ssn_mention"]
+
+    assert len(matches) == 1
+    match = matches[0]
+    assert match.category == category
+    assert match.value == value
+    assert text[match.start : match.end] == value
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I was so anxious at the party on 12/05/2023 at 10:30",
+        "card 4111 1111 1111 1112",  # fails Luhn
+        "IBAN ES00 2100 0418 4502 0005 1332",  # wrong check digits
+        "DNI 12345678A",  # wrong control letter
+        "serial 000-12-3456",  # invalid area
+        "pi is 3.14159265",
+        "order abc123456789",  # digits glued to a word
+        "classic assn lessons",
+        "version 10.0.19045.1234",
+        "kernel 4.18.0.553 after the update",
+        "order 2024051712346",  # a bare run of digits, no phone format
+    ],
+)
+def test_scanner_rejects_lookalikes(text):
+    """Test validators reject candidates that only look like PII."""
+    assert scanner.scan(text) == []
+    assert scanner.contains_pii(text) is False
+
+
+def test_scanner_returns_matches_in_text_order():
+    """Test multiple matches are reported once each, in order."""
+    text = "ssn? mail a@b.io or call +44 20 7946 0958"
+
+    assert [match.category for match in scanner.scan(text)] == ["ssn_mention", "email", "phone"]
+
+
+def test_scanner_category_filter():
+    """Test a scanner restricted to some categories ignores the others."""
+    emails_only = PiiScanner(categories=["email"])
+
+    assert emails_only.scan("a@b.io 123-45-6789")[0].category == "email"
+    assert len(emails_only.scan("a@b.io 123-45-6789")) == 1
+    with pytest.raises(ValueError):
+        PiiScanner(categories=["passport"])
+
+
+def test_luhn():
+    """Test the Luhn checksum helper."""
+    assert luhn_valid("4111111111111111")
+    assert not luhn_valid("4111111111111112")
+
+
+def test_redact_masks_spans_in_one_pass():
+    """Test matched values are masked while mentions and clean text are kept as-is."""
+    text = "My SSN is 123-45-6789, mail ana@example.com"
+
+    assert redact(text, scanner.scan(text)) == "My SSN is [SSN], mail [EMAIL]"
+    clean = "nothing to see here"
+    assert redact(clean, scanner.scan(clean)) is clean
+
+
+def test_digit_heavy_scan_is_well_under_a_millisecond():
+    """Test a 10k-character message full of dates, times and numbers scans fast."""
+    from benchmarks.bench_pii import build_messages, time_calls
+
+    text = build_messages(10_000)["digit-heavy"]
+    scanner.scan(text)  # warm up
+    samples = sorted(time_calls(scanner.scan, text, rounds=100))
+
+    # The median, so a busy CI machine does not fail the test on a few slow rounds.
+    assert samples[49] < 0.001  # seconds
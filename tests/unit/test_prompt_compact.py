@@ -0,0 +1,153 @@
+"""Unit tests for token-lean prompt serialisation and token accounting."""
+
+import json
+from types import SimpleNamespace
+
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.state import State
+from google.genai.types import Content, GenerateContentResponseUsageMetadata, Part
+import pytest
+
+from app.agents import parser
+from app.agents.factory import parser_llm
+from app.agents.parser import JsonParserAgent
+from app.callbacks.token_usage import TOKEN_USAGE_KEY, TokenUsageRecorder
+from app.services.prompts.builders import PROMPT_TOKENS_KEY, prompt_tokens_delta
+from app.services.prompts.compact import (
+    compact_json,
+    estimate_tokens,
+    fit_record,
+    fit_transcript,
+)
+from app.services.transcript.store import Transcript, TranscriptEntry
+
+PARSED = {
+    "situation": "Una reunión con todo el equipo",
+    "thoughts": ["Think I'm boring", ""],
+    "feelings": [],
+    "behaviors": ["stayed quiet"],
+    "outcome": "",
+    "timestamp": None,
+}
+
+
+def test_compact_json_prunes_and_drops_whitespace():
+    """Test empty values go and non-ASCII text is kept as is."""
+    compact = compact_json(PARSED)
+
+    assert compact == (
+        '{"situation":"Una reunión con todo el equipo",'
+        '"thoughts":["Think I\'m boring"],"behaviors":["stayed quiet"]}'
+    )
+    assert estimate_tokens(compact) < estimate_tokens(json.dumps(PARSED, indent=2)) * 0.6
+
+
+def test_fit_transcript_keeps_short_transcripts_whole():
+    """Test a transcript within budget is rendered unchanged."""
+    entries = [TranscriptEntry("user", "Hi"), TranscriptEntry("assistant", "Hello")]
+
+    assert fit_transcript(entries, 100) == "user: Hi\nassistant: Hello"
+
+
+def test_fit_transcript_drops_questions_then_the_middle():
+    """Test assistant turns go first, then the middle of the conversation."""
+    entries = []
+    for turn in range(20):
+        entries.append(TranscriptEntry("user", f"message {turn} " + "x" * 40))
+        entries.append(TranscriptEntry("assistant", "And then? " * 5))
+
+    user_only = fit_transcript(entries, 300)
+    assert "assistant:" not in user_only
+    assert user_only.count("user:") == 20
+
+    trimmed = fit_transcript(entries, 100)
+    assert estimate_tokens(trimmed) <= 100
+    lines = trimmed.split("\n")
+    assert lines[0].startswith("user: message 0 ")
+    assert lines[-1].startswith("user: message 19 ")
+    assert "[... earlier messages omitted ...]" in lines
+
+
+def test_fit_record_cuts_the_longest_strings():
+    """Test an oversized record is brought within budget, short fields untouched."""
+    record = {"situation": "s" * 2000, "thoughts": ["short"], "outcome": "o" * 400}
+
+    fitted = fit_record(record, 200)
+
+    assert estimate_tokens(compact_json(fitted)) <= 200
+    assert fitted["thoughts"] == ["short"]
+    assert fitted["situation"].endswith("...")
+    assert record["situation"] == "s" * 2000  # the input is not modified
+
+
+def test_prompt_tokens_delta_per_stage():
+    """Test estimated raw and sent sizes are kept per stage, without touching the state."""
+    state: dict = {}
+    state.update(
+        prompt_tokens_delta(state, "analysis", json.dumps(PARSED, indent=2), compact_json(PARSED))
+    )
+    analysis_only = dict(state[PROMPT_TOKENS_KEY])
+    state.update(prompt_tokens_delta(state, "parser", "x" * 400, "x" * 100))
+
+    assert list(analysis_only) == ["analysis"]
+
+    assert state[PROMPT_TOKENS_KEY]["parser"] == {"raw": 100, "sent": 25}
+    assert (
+        state[PROMPT_TOKENS_KEY]["analysis"]["sent"] < state[PROMPT_TOKENS_KEY]["analysis"]["raw"]
+    )
+
+
+def test_token_usage_recorder_sums_complete_responses_per_agent():
+    """Test reported usage is summed per agent and partial chunks are skipped."""
+    session: dict = {}
+    delta: dict = {}
+    ctx = SimpleNamespace(state=State(value=session, delta=delta), agent_name="AnalystLLMCore")
+    usage = GenerateContentResponseUsageMetadata(prompt_token_count=120, candidates_token_count=30)
+    recorder = TokenUsageRecorder()
+
+    recorder(callback_context=ctx, llm_response=LlmResponse(usage_metadata=usage))
+    recorder(callback_context=ctx, llm_response=LlmResponse(usage_metadata=usage))
+    recorder(callback_context=ctx, llm_response=LlmResponse(usage_metadata=usage, partial=True))
+    recorder(callback_context=ctx, llm_response=LlmResponse())
+
+    assert delta[TOKEN_USAGE_KEY] == {"AnalystLLMCore": {"calls": 2, "prompt": 240, "output": 60}}
+
+
+@pytest.mark.asyncio
+async def test_parser_token_usage_reaches_the_session(monkeypatch, stub_llm):
+    """Test the parser LLM's usage is stored although its own events are not yielded."""
+    usage = GenerateContentResponseUsageMetadata(prompt_token_count=200, candidates_token_count=40)
+
+    def reply(text: str) -> LlmResponse:
+        return LlmResponse(
+            content=Content(role="model", parts=[Part(text=text)]), usage_metadata=usage
+        )
+
+    # The first answer fails validation, so the parser asks once more.
+    model = stub_llm(
+        [reply("no JSON here"), reply('{"situation": "A meeting", "thoughts": ["x"]}')]
+    )
+    llm = parser_llm(True).model_copy(update={"model": model})
+    monkeypatch.setattr(parser, "parser_llm", lambda structured_output: llm)
+    monkeypatch.setattr(parser, "get_parse_cache", lambda: None)
+    state: dict = {}
+    Transcript(state).append("user", "I froze in the budget meeting")
+    sessions = InMemorySessionService()
+    runner = Runner(
+        app_name="reframe", agent=JsonParserAgent(name="JsonParser"), session_service=sessions
+    )
+    session = await sessions.create_session(app_name="reframe", user_id="u", state=state)
+
+    async for _ in runner.run_async(
+        user_id="u",
+        session_id=session.id,
+        new_message=Content(role="user", parts=[Part(text="ok")]),
+    ):
+        pass
+
+    stored = (
+        await sessions.get_session(app_name="reframe", user_id="u", session_id=session.id)
+    ).state
+    assert stored[TOKEN_USAGE_KEY]["JsonParserLLM"] == {"calls": 2, "prompt": 400, "output": 80}
@@ -0,0 +1,142 @@
+"""Unit tests for the PDF render cache and PdfAgent's reuse of saved reports."""
+
+from unittest.mock import AsyncMock, patch
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+import pytest
+
+from app.agents.pdf_agent import PdfAgent
+from app.services.cache.renders import RenderCache, get_render_cache, render_key
+
+PARSED = {"situation": "A meeting", "thoughts": ["I'm dull"], "feelings": ["anxious"]}
+
+
+def test_key_is_stable_and_covers_the_inputs():
+    """Test key order does not matter; the record and the analysis do."""
+    reordered = dict(reversed(list(PARSED.items())))
+
+    assert render_key(PARSED, "analysis") == render_key(reordered, "analysis")
+    assert render_key(PARSED, "analysis") != render_key(PARSED, "analysis!")
+    assert render_key(PARSED, "analysis") != render_key({**PARSED, "outcome": ""}, "analysis")
+
+
+def test_template_version_changes_the_key(monkeypatch):
+    """Test a layout change never serves an old render."""
+    before = render_key(PARSED, "analysis")
+    monkeypatch.setattr("app.services.cache.renders.TEMPLATE_VERSION", "next")
+
+    assert render_key(PARSED, "analysis") != before
+
+
+def test_eviction_is_bounded_by_size_and_counters():
+    """Test the least recently used PDFs go once max_bytes is exceeded."""
+    cache = RenderCache(max_bytes=250)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    assert cache.get("a") == b"a" * 100  # "b" is now least recently used
+    cache.put("c", b"c" * 100)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == b"c" * 100
+    cache.put("huge", b"x" * 1000)  # larger than the whole cache: not stored
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 1,
+        "hit_rate": 2 / 3,
+        "bytes_saved": 200,
+        "entries": 2,
+        "bytes": 200,
+    }
+
+
+def _ctx(state):
+    ctx = AsyncMock(invocation_id="i", branch=None)
+    ctx.session.state = state
+    ctx.save_artifact = AsyncMock(return_value=3)
+    ctx.get_artifact_url = AsyncMock(return_value="https://example.com/report.pdf?v=3")
+    return ctx
+
+
+async def _run(ctx):
+    """Run PdfAgent, applying its state deltas to the session as the Runner does."""
+    events = [event async for event in PdfAgent()._produce(ctx)]
+    for event in events:
+        ctx.session.state.update(event.actions.state_delta)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_unchanged_inputs_reuse_the_saved_artifact():
+    """Test a re-run neither renders nor uploads, and keeps the version and link."""
+    state = {"parsed": PARSED, "cbt_analysis": "Be kind."}
+    ctx = _ctx(state)
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-first") as build:
+        await _run(ctx)
+        events = await _run(ctx)
+
+    assert build.call_count == 1
+    assert ctx.save_artifact.await_count == 1
+    assert ctx.get_artifact_url.await_count == 1  # the link was still valid
+    assert state["pdf_output"]["version"] == 3
+    assert events[0].content.parts[0].text.endswith("report.pdf?v=3")
+    assert get_render_cache().stats()["bytes_saved"] == len(b"%PDF-first")
+
+
+@pytest.mark.asyncio
+async def test_render_is_reused_after_an_artifact_failure():
+    """Test a retry after a failed upload does not render the PDF again."""
+    state = {"parsed": PARSED, "cbt_analysis": "Be kind."}
+    ctx = _ctx(state)
+    ctx.save_artifact.side_effect = [RuntimeError("GCS unavailable"), 4]
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-report") as build:
+        with pytest.raises(RuntimeError):
+            await _run(ctx)
+        await _run(ctx)
+
+    assert build.call_count == 1
+    assert state["pdf_output"]["version"] == 4
+    assert get_render_cache().stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_changed_analysis_renders_again():
+    """Test new inputs produce a new render and a new artifact version."""
+    state = {"parsed": PARSED, "cbt_analysis": "Be kind."}
+    ctx = _ctx(state)
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF") as build:
+        await _run(ctx)
+        state["cbt_analysis"] = "Be kinder."
+        await _run(ctx)
+
+    assert build.call_count == 2
+    assert ctx.save_artifact.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_runner_reuses_the_artifact_saved_in_an_earlier_run():
+    """Test a second run in the same session neither renders nor uploads again."""
+    artifacts = InMemoryArtifactService()
+    sessions = InMemorySessionService()
+    runner = Runner(
+        app_name="reframe", agent=PdfAgent(), session_service=sessions, artifact_service=artifacts
+    )
+    session = await sessions.create_session(
+        app_name="reframe", user_id="u", state={"parsed": PARSED, "cbt_analysis": "Be kind."}
+    )
+
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-once") as build:
+        for _ in range(2):
+            async for _ in runner.run_async(
+                user_id="u",
+                session_id=session.id,
+                new_message=Content(role="user", parts=[Part(text="ok")]),
+            ):
+                pass
+
+    scope = {"app_name": "reframe", "user_id": "u", "session_id": session.id}
+    assert build.call_count == 1
+    assert await artifacts.list_versions(filename="report.pdf", **scope) == [0]
+    assert (await sessions.get_session(**scope)).state["pdf_output"]["version"] == 0
@@ -0,0 +1,114 @@
+"""Unit tests for the bounded render pool."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.agents.pdf_agent import PdfAgent
+from app.services.rendering.pool import (
+    RenderError,
+    RenderPool,
+    RenderQueueFullError,
+    RenderTimeoutError,
+)
+from app.tools.pdf_generator import build_pdf_bytes
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_runs_off_the_event_loop():
+    """Test the render runs on a worker thread and its result is returned."""
+    pool = RenderPool("thread", max_workers=1)
+
+    name = await pool.run(lambda: threading.current_thread().name)
+
+    assert name.startswith("render")
+    assert pool.stats() == {
+        "completed": 1,
+        "rejected": 0,
+        "timed_out": 0,
+        "failed": 0,
+        "pending": 0,
+    }
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_bounded():
+    """Test a render beyond max_pending is rejected instead of queued."""
+    pool = RenderPool("thread", max_workers=1, max_pending=2)
+    release = threading.Event()
+
+    running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(RenderQueueFullError):
+        await pool.run(time.sleep, 0)
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    assert pool.stats()["rejected"] == 1
+    assert pool.pending == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_render_times_out_and_frees_its_slot_when_done():
+    """Test the caller stops waiting after the timeout; the slot frees on completion."""
+    pool = RenderPool("thread", max_workers=1, max_pending=1, timeout=0.05)
+
+    with pytest.raises(RenderTimeoutError):
+        await pool.run(time.sleep, 0.2)
+    assert pool.pending == 1
+
+    await asyncio.sleep(0.3)
+    assert pool.pending == 0
+    assert pool.stats()["timed_out"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failing_render_is_wrapped_in_render_error():
+    """Test any exception from the render reaches the caller as RenderError."""
+    pool = RenderPool("thread", max_workers=1)
+
+    def broken():
+        raise ValueError("bad markup")
+
+    with pytest.raises(RenderError) as excinfo:
+        await pool.run(broken)
+
+    assert isinstance(excinfo.value.__cause__, ValueError)
+    assert pool.stats()["failed"] == 1
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_renders_a_pdf():
+    """Test build_pdf_bytes round-trips through a worker process."""
+    pool = RenderPool("process", max_workers=1, timeout=60)
+
+    pdf = await pool.run(
+        build_pdf_bytes, intake_data={"situation": "A meeting"}, analysis_output="Be kind."
+    )
+
+    assert pdf.startswith(b"%PDF")
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pdf_agent_reports_a_full_pool():
+    """Test PdfAgent answers with an error event when the pool rejects the render."""
+    ctx = AsyncMock(invocation_id="i", branch=None)
+    ctx.session.state = {"parsed": {}, "cbt_analysis": ""}
+    full = RenderPool("thread", max_pending=1)
+    full._pending = 1
+
+    with patch("app.agents.pdf_agent.get_render_pool", return_value=full):
+        events = [event async for event in PdfAgent()._produce(ctx)]
+
+    assert len(events) == 1
+    assert "could not be generated" in events[0].content.parts[0].text
+    assert "error" in events[0].actions.state_delta["pdf_output"]
+    ctx.save_artifact.assert_not_called()
@@ -0,0 +1,78 @@
+"""Unit tests for the cached report template and its data model."""
+
+from reportlab import rl_config
+
+from app.services.rendering.report import ReportData, ReportTemplate, get_report_template
+from app.tools.pdf_generator import build_pdf_bytes
+
+PARSED = {
+    "situation": "A team meeting",
+    "thoughts": ["They think I'm dull"],
+    "feelings": ["anxious", "ashamed"],
+    "behaviors": ["froze"],
+    "outcome": "Drained",
+}
+
+
+def test_structured_analysis_is_extracted():
+    """Test JSON analysis fields, distortion names and certainty are picked up."""
+    analysis = (
+        '{"distortions": ["MW", "XX"], "balanced_thought": "One pause is not failure.",'
+        ' "certainty_before": 80, "certainty_after": 40}'
+    )
+
+    data = ReportData.from_session(PARSED, analysis, date="2026-01-02")
+
+    assert data.structured is True
+    assert data.distortions == ("Mind Reading", "XX")
+    assert data.balanced_thought == "One pause is not failure."
+    assert data.micro_action == ""
+    assert data.certainty == (80, 40)
+    assert data.snapshot[2] == ("Feelings", "anxious, ashamed")
+
+
+def test_plain_text_analysis_keeps_its_paragraphs():
+    """Test text analysis is split into non-empty paragraphs."""
+    data = ReportData.from_session(PARSED, "First.\n\n  \n\n- Second", date="2026-01-02")
+
+    assert data.structured is False
+    assert data.paragraphs == ("First.", "- Second")
+
+
+def test_legacy_intake_format():
+    """Test records from before the parser still fill the snapshot table."""
+    legacy = {"trigger_situation": "A party", "emotion_data": {"emotion": "fear", "intensity": 7}}
+
+    data = ReportData.from_session(legacy, "", date="2026-01-02")
+
+    assert data.snapshot == (
+        ("Situation", "A party"),
+        ("Automatic Thought", '"Not provided"'),
+        ("Initial Emotion", "fear (7/10)"),
+    )
+
+
+def test_template_is_built_once_and_renders_the_same_report(monkeypatch):
+    """Test the cached template renders deterministically, like a fresh one."""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    data = ReportData.from_session(PARSED, '{"distortions": ["CT"]}', date="2026-01-02")
+
+    assert get_report_template() is get_report_template()
+    cached = get_report_template().render(data)
+
+    assert cached.startswith(b"%PDF")
+    assert cached == get_report_template().render(data) == ReportTemplate().render(data)
+
+
+def test_build_pdf_bytes_uses_the_template():
+    """Test the public helper still returns a PDF."""
+    assert build_pdf_bytes(intake_data=PARSED, analysis_output="Be kind.").startswith(b"%PDF")
+
+
+def test_session_text_is_not_read_as_markup():
+    """Test markup-like user text renders instead of failing the report."""
+    analysis = '{"balanced_thought": "a<b <i>", "micro_action": "Say \'no\' & rest"}'
+
+    for output in (analysis, "a<b <i> plain text"):
+        pdf = build_pdf_bytes(intake_data={**PARSED, "situation": "x < y"}, analysis_output=output)
+        assert pdf.startswith(b"%PDF")
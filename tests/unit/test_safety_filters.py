@@ -2,7 +2,9 @@
 
 from unittest.mock import MagicMock
 
+from google.adk.models.llm_request import LlmRequest
 from google.genai.types import Content, Part
+import pytest
 
 from app.callbacks.safety_filters import SafetyGuard
 
@@ -147,3 +149,103 @@ def test_safety_guard_multiple_parts():
 
     assert result is not None
     assert ctx._event_actions.escalate is True
+
+
+def test_safety_guard_blocks_other_pii_categories():
+    """Test e-mails, IBANs and Spanish IDs are blocked and their categories recorded."""
+    guard = SafetyGuard()
+
+    ctx = MagicMock()
+    ctx.state = {}
+    ctx.user_content = Content(parts=[Part(text="Mi correo es ana@example.com y mi DNI 12345678Z")])
+    ctx._event_actions = MagicMock()
+
+    result = guard(callback_context=ctx, llm_request=MagicMock())
+
+    assert result is not None
+    assert ctx._event_actions.escalate is True
+    assert ctx.state["pii_detected"] == ["dni", "email"]
+
+
+def test_safety_guard_redact_mode_masks_request_and_continues():
+    """Test redact mode rewrites only the parts with PII and does not block the turn."""
+    guard = SafetyGuard(mode="redact")
+
+    ctx = MagicMock()
+    ctx.state = {}
+    ctx._event_actions = MagicMock(escalate=False)
+    clean_part = Part(text="I get anxious in meetings")
+    request = LlmRequest(
+        contents=[
+            Content(role="user", parts=[clean_part]),
+            Content(
+                role="user", parts=[Part(text="Call me on +34 612 345 678 or ana@example.com")]
+            ),
+        ]
+    )
+    original = request.contents[1].parts[0]
+
+    result = guard(callback_context=ctx, llm_request=request)
+
+    assert result is None
+    assert ctx._event_actions.escalate is False
+    assert request.contents[0].parts[0] is clean_part
+    assert request.contents[1].parts[0].text == "Call me on [PHONE] or [EMAIL]"
+    assert original.text == "Call me on +34 612 345 678 or ana@example.com"
+    assert ctx.state["pii_redacted"] == ["email", "phone"]
+
+
+def test_safety_guard_rejects_unknown_mode():
+    """Test an unknown PII mode fails fast."""
+    with pytest.raises(ValueError):
+        SafetyGuard(mode="ignore")
+
+
+@pytest.mark.asyncio
+async def test_redact_mode_keeps_pii_out_of_transcript_and_later_prompts(stub_llm):
+    """Test redacted PII reaches neither the collector, the transcript nor the parser prompt."""
+    from google.adk.agents import LlmAgent
+    from google.adk.runners import InMemoryRunner
+
+    from app.callbacks.intake_tracker import IntakeTracker
+    from app.callbacks.transcript_acc import TranscriptAccumulator
+    from app.services.parsing.slots import INTAKE_SLOTS_KEY
+    from app.services.prompts.builders import parser_prompt_from_state
+
+    model = stub_llm(["What happened?", "How did you feel?"])
+    collector = LlmAgent(
+        name="CollectorLLM",
+        model=model,
+        instruction="Ask one question.",
+        before_model_callback=[SafetyGuard(mode="redact")],
+        after_model_callback=[
+            TranscriptAccumulator(append_only=True, redact_pii=True),
+            IntakeTracker(redact_pii=True),
+        ],
+    )
+    runner = InMemoryRunner(agent=collector, app_name="reframe")
+    session = await runner.session_service.create_session(app_name="reframe", user_id="user")
+    for text in ["Hi", "My boss emailed ana.garcia@example.com and called +34 612 345 678"]:
+        async for _ in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text=text)]),
+        ):
+            pass
+
+    state = (
+        await runner.session_service.get_session(
+            app_name="reframe", user_id="user", session_id=session.id
+        )
+    ).state
+    sent = " ".join(
+        part.text for content in model.requests[-1].contents for part in content.parts if part.text
+    )
+    stored = [state[f"conv_raw.{i}"][1] for i in range(state["conv_len"])]
+    prompt = parser_prompt_from_state(state)
+
+    for text in (sent, prompt, " ".join(stored), str(state[INTAKE_SLOTS_KEY]["record"])):
+        assert "ana.garcia@example.com" not in text
+        assert "612 345 678" not in text
+    assert "My boss emailed [EMAIL] and called [PHONE]" in stored
+    assert "[EMAIL]" in prompt
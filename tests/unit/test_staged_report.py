@@ -0,0 +1,226 @@
+"""Unit tests for reports laid out in stages, the intake section first."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from reportlab import rl_config
+
+from app.agents import parser, pdf_agent
+from app.agents.parser import JsonParserAgent
+from app.agents.pdf_agent import PdfAgent
+from app.services.rendering import staged
+from app.services.rendering.pool import RenderPool
+from app.services.rendering.report import ReportData, get_report_template
+from app.services.rendering.staged import (
+    ReportStages,
+    StagedDocTemplate,
+    StagedReport,
+    get_report_stages,
+    reportlab_supported,
+)
+
+PARSED = {
+    "situation": "A team meeting",
+    "thoughts": ["They think I'm dull"],
+    "feelings": ["anxious", "ashamed"],
+    "behaviors": ["froze"],
+    "outcome": "Drained",
+}
+ANALYSIS = '{"distortions": ["MW"], "balanced_thought": "One pause is not failure."}'
+
+
+@pytest.fixture
+def staging(monkeypatch):
+    """Turn the opt-in staged render on for PdfAgent and the parser."""
+    monkeypatch.setattr(pdf_agent.settings, "pdf_staged_render", True)
+    monkeypatch.setattr(parser.settings, "pdf_staged_render", True)
+
+
+@pytest.mark.parametrize(
+    "parsed, analysis",
+    [
+        (PARSED, ANALYSIS),
+        # The snapshot and the analysis both run over several pages.
+        ({**PARSED, "situation": "A long meeting. " * 400}, "A paragraph.\n\n" * 120),
+    ],
+)
+def test_staged_report_matches_a_full_render(monkeypatch, parsed, analysis):
+    """Test laying out the intake section first produces the same PDF."""
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    full = get_report_template().render(
+        ReportData.from_session(parsed, analysis, date="2026-01-02")
+    )
+
+    report = StagedReport(parsed, date="2026-01-02")
+    report.lay_out_intake()
+
+    assert report.intake_ready
+    assert report.finish(analysis) == full
+    with pytest.raises(RuntimeError):
+        report.finish(analysis)
+
+
+@pytest.mark.asyncio
+async def test_take_checks_the_record_and_sessions_are_bounded():
+    """Test a changed record is not served and the oldest sessions are dropped."""
+    stages = ReportStages(max_sessions=2, pool=RenderPool("thread", max_workers=1))
+    for session_id in ("a", "b", "c"):
+        stages.start(session_id, PARSED)
+
+    assert len(stages) == 2
+    assert stages.take("a", PARSED) is None  # evicted
+    assert stages.take("b", {**PARSED, "outcome": "Relieved"}) is None
+    assert stages.take("c", PARSED) is not None
+    assert len(stages) == 0
+
+
+@pytest.mark.asyncio
+async def test_intake_is_laid_out_on_the_render_pool():
+    """Test the first stage runs on the render pool, under its depth limit."""
+    pool = RenderPool("thread", max_workers=1)
+    stages = ReportStages(pool=pool)
+
+    report = stages.start("s", PARSED)
+    await asyncio.gather(*stages._tasks)
+
+    assert report.intake_ready
+    assert pool.stats()["completed"] == 1
+
+    full = RenderPool("thread", max_pending=1)
+    full._pending = 1
+    report = ReportStages(pool=full).start("s", PARSED)
+    await asyncio.sleep(0)
+
+    assert not report.intake_ready  # rejected: finish() lays it out instead
+    assert full.stats()["rejected"] == 1
+
+
+def test_staging_needs_a_checked_reportlab(monkeypatch):
+    """Test staging stays off on reportlab releases it was not checked against."""
+    assert reportlab_supported("4.4.2") and reportlab_supported("5.0.1")
+    assert not reportlab_supported("4.3.1")
+    assert not reportlab_supported("5.1.0")
+    assert not reportlab_supported("nightly")
+
+    stages = ReportStages(pool=RenderPool("thread"))
+    assert stages.enabled
+    monkeypatch.setattr(staged.reportlab, "Version", "6.0.0")
+    assert not stages.enabled
+    monkeypatch.undo()
+    monkeypatch.setattr(StagedDocTemplate, "_startBuild", None)
+    assert not stages.enabled
+
+
+@pytest.mark.asyncio
+async def test_parser_stages_reports_only_when_enabled(monkeypatch):
+    """Test the parser leaves the staged reports alone unless staging is on and can work."""
+    ctx = SimpleNamespace(invocation_id="i", branch=None, session=SimpleNamespace(id="s", state={}))
+    agent = JsonParserAgent(name="JsonParser")
+    with patch("app.agents.parser.get_report_stages") as stages:
+        agent._parsed_event(ctx, PARSED)  # off by default
+    stages.assert_not_called()
+
+    monkeypatch.setattr(parser.settings, "pdf_staged_render", True)
+    on_processes = ReportStages(pool=RenderPool("process"))
+    monkeypatch.setattr(parser, "get_report_stages", lambda: on_processes)
+    agent._parsed_event(ctx, PARSED)
+    assert len(on_processes) == 0
+
+    on_threads = ReportStages(pool=RenderPool("thread", max_workers=1))
+    monkeypatch.setattr(parser, "get_report_stages", lambda: on_threads)
+    agent._parsed_event(ctx, PARSED)
+    assert on_threads.take("s", PARSED) is not None
+
+
+@pytest.mark.asyncio
+async def test_pdf_agent_finishes_the_staged_report(staging):
+    """Test PdfAgent only adds the analysis to the report staged by the parser."""
+    state = {"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(id="s1", state=state),
+        save_artifact=AsyncMock(return_value=1),
+        get_artifact_url=AsyncMock(return_value="https://example.com/report.pdf"),
+    )
+    report = get_report_stages().start("s1", PARSED)
+
+    with patch("app.agents.pdf_agent.build_pdf_bytes") as build:
+        events = [event async for event in PdfAgent()._produce(ctx)]
+
+    build.assert_not_called()
+    with pytest.raises(RuntimeError):  # PdfAgent finished it
+        report.finish(ANALYSIS)
+    saved = ctx.save_artifact.await_args.kwargs["artifact"].inline_data.data
+    assert saved.startswith(b"%PDF")
+    assert events[0].actions.state_delta["pdf_output"]["pdf_size"] == len(saved)
+
+
+@pytest.mark.asyncio
+async def test_pdf_agent_renders_in_full_when_the_record_changed(staging):
+    """Test a report staged from an older record is not used."""
+    state = {"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(id="s2", state=state),
+        save_artifact=AsyncMock(return_value=1),
+        get_artifact_url=AsyncMock(return_value="https://example.com/report.pdf"),
+    )
+    get_report_stages().start("s2", {**PARSED, "outcome": "Relieved"})
+
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-full") as build:
+        [event async for event in PdfAgent()._produce(ctx)]
+
+    build.assert_called_once()
+    assert len(get_report_stages()) == 0
+
+
+@pytest.mark.asyncio
+async def test_pdf_agent_renders_in_full_when_reportlab_internals_change(staging, monkeypatch):
+    """Test a staged report that reportlab can no longer build falls back to a full render."""
+
+    def gone(self, *args, **kwargs):
+        raise AttributeError("'StagedDocTemplate' object has no attribute '_startBuild'")
+
+    monkeypatch.setattr(StagedDocTemplate, "_startBuild", gone)
+    state = {"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(id="s3", state=state),
+        save_artifact=AsyncMock(return_value=1),
+        get_artifact_url=AsyncMock(return_value="https://example.com/report.pdf"),
+    )
+    get_report_stages().start("s3", PARSED)
+
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-full") as build:
+        [event async for event in PdfAgent()._produce(ctx)]
+
+    build.assert_called_once()
+    assert ctx.save_artifact.await_args.kwargs["artifact"].inline_data.data == b"%PDF-full"
+
+
+@pytest.mark.asyncio
+async def test_reports_are_not_staged_on_a_process_pool(staging, monkeypatch):
+    """Test a process render pool keeps the whole render out of the serving process."""
+    stages = ReportStages(pool=RenderPool("process"))
+    stages._reports["s4"] = StagedReport(PARSED)  # as if staged before a pool change
+    monkeypatch.setattr(pdf_agent, "get_report_stages", lambda: stages)
+    state = {"parsed": PARSED, "cbt_analysis": ANALYSIS}
+    ctx = SimpleNamespace(
+        invocation_id="i",
+        branch=None,
+        session=SimpleNamespace(id="s4", state=state),
+        save_artifact=AsyncMock(return_value=1),
+        get_artifact_url=AsyncMock(return_value="https://example.com/report.pdf"),
+    )
+
+    with patch("app.agents.pdf_agent.build_pdf_bytes", return_value=b"%PDF-full") as build:
+        [event async for event in PdfAgent()._produce(ctx)]
+
+    assert not stages.enabled
+    build.assert_called_once()
+    assert len(stages) == 1  # never taken
@@ -1,11 +1,15 @@
 """Unit tests for TranscriptAccumulator callback."""
 
+import json
 from unittest.mock import MagicMock
 
 from google.adk.models.llm_response import LlmResponse
+from google.adk.sessions.state import State
 from google.genai.types import Content, Part
 
 from app.callbacks.transcript_acc import TranscriptAccumulator
+from app.services.prompts.builders import build_parser_prompt
+from app.services.transcript.store import Transcript
 
 
 def test_transcript_accumulator_basic():
@@ -134,3 +138,124 @@ def test_transcript_accumulator_empty_text():
     assert result is None
     assert "conv_raw" in ctx.state
     assert len(ctx.state["conv_raw"]) == 0  # Empty text should not be added
+
+
+def test_transcript_accumulator_append_only_basic():
+    """Test append-only mode stores one key per entry plus a counter."""
+    accumulator = TranscriptAccumulator(append_only=True)
+
+    # Mock context
+    ctx = MagicMock()
+    ctx.state = {}
+    ctx.user_content = Content(parts=[Part(text="Hello, I need help")])
+
+    # Mock response
+    response = LlmResponse(content=Content(parts=[Part(text="Hello! I'm here to help you.")]))
+
+    result = accumulator(callback_context=ctx, llm_response=response)
+
+    assert result is None
+    assert "conv_raw" not in ctx.state
+    assert "transcript" not in ctx.state
+    assert ctx.state["conv_len"] == 2
+    assert ctx.state["conv_raw.0"] == ["user", "Hello, I need help"]
+    assert ctx.state["conv_raw.1"] == ["assistant", "Hello! I'm here to help you."]
+
+
+def test_transcript_accumulator_append_only_delta_stays_flat():
+    """Test the per-turn state delta does not grow with the conversation."""
+    accumulator = TranscriptAccumulator(append_only=True)
+    session_state: dict = {}
+    response = LlmResponse(content=Content(parts=[Part(text="Tell me more.")]))
+
+    delta_sizes = []
+    for turn in range(200):
+        delta: dict = {}
+        ctx = MagicMock()
+        ctx.state = State(value=session_state, delta=delta)
+        ctx.invocation_id = f"inv-{turn}"
+        ctx.user_content = Content(parts=[Part(text=f"Message {turn:03d}")])
+
+        accumulator(callback_context=ctx, llm_response=response)
+        delta_sizes.append(len(json.dumps(delta)))
+
+    assert session_state["conv_len"] == 400
+    # Only the digits of the entry keys and counter may grow.
+    assert max(delta_sizes) - min(delta_sizes) < 16
+    assert Transcript(session_state).entries()[-2].text == "Message 199"
+
+
+def test_render_transcript_both_layouts():
+    """Test lazy rendering gives the same text for legacy and append-only layouts."""
+    legacy, append_only = TranscriptAccumulator(), TranscriptAccumulator(append_only=True)
+    legacy_ctx, append_ctx = MagicMock(), MagicMock()
+    legacy_ctx.state, append_ctx.state = {}, {}
+
+    for text in ("First message", "Second message"):
+        response = LlmResponse(content=Content(parts=[Part(text=f"Reply to {text}")]))
+        for accumulator, ctx in ((legacy, legacy_ctx), (append_only, append_ctx)):
+            ctx.user_content = Content(parts=[Part(text=text)])
+            accumulator(callback_context=ctx, llm_response=response)
+
+    expected = (
+        "user: First message\n"
+        "assistant: Reply to First message\n"
+        "user: Second message\n"
+        "assistant: Reply to Second message"
+    )
+    assert Transcript(legacy_ctx.state).render() == expected
+    assert Transcript(append_ctx.state).render() == expected
+    assert "transcript" not in legacy_ctx.state
+
+
+def test_transcript_accumulator_dedupes_loop_iterations():
+    """Test LoopAgent re-invocations of the same turn are recorded once."""
+    accumulator = TranscriptAccumulator(append_only=True)
+    state: dict = {}
+    user_content = Content(parts=[Part(text="I froze when my boss asked me a question")])
+    question = LlmResponse(content=Content(parts=[Part(text="What went through your mind?")]))
+
+    def run_turn(invocation_id: str, iterations: int) -> None:
+        for _ in range(iterations):
+            ctx = MagicMock()
+            ctx.state = state
+            ctx.invocation_id = invocation_id
+            ctx.user_content = user_content
+            accumulator(callback_context=ctx, llm_response=question)
+
+    run_turn("inv-1", iterations=1)
+    single_iteration = Transcript(state).render()
+
+    run_turn("inv-1", iterations=11)  # 12 iterations in total, like collector_loop
+    assert state["conv_len"] == 2
+    assert Transcript(state).render() == single_iteration
+
+    # The parser prompt - and therefore its input tokens - does not grow either.
+    assert len(build_parser_prompt(Transcript(state).render_intake())) == len(
+        build_parser_prompt(single_iteration)
+    )
+
+    # A new invocation is a new turn, even if the user repeats themselves.
+    run_turn("inv-2", iterations=3)
+    assert state["conv_len"] == 4
+    assert len(state["conv_turn"]["seen"]) == 2
+
+
+def test_replace_last_rewrites_the_reply_in_both_layouts():
+    """Test a rewritten reply replaces the recorded one instead of adding another."""
+    legacy = {"conv_raw": [{"role": "user", "text": "Hi"}, {"role": "assistant", "text": "Q?"}]}
+    append_only: dict = {}
+    Transcript(append_only).append("user", "Hi")
+    Transcript(append_only).append("assistant", "Q?")
+
+    for state in (legacy, append_only):
+        transcript = Transcript(state)
+        assert transcript.render() == "user: Hi\nassistant: Q?"
+        transcript.replace_last("assistant", "Bye")
+
+        assert transcript.render() == "user: Hi\nassistant: Bye"
+        assert Transcript(state).render() == "user: Hi\nassistant: Bye"
+
+    Transcript(append_only).replace_last("assistant", "Bye again")
+    Transcript(append_only).replace_last("user", "Thanks")
+    assert len(Transcript(append_only)) == 3
@@ -0,0 +1,123 @@
+"""Unit tests for the shared Transcript store."""
+
+from unittest.mock import MagicMock
+
+from app.services.transcript.store import Transcript, TranscriptEntry
+from app.tools.exit_loop import _exit_loop
+
+
+def test_transcript_entry_is_slotted():
+    """Test entries carry no per-instance __dict__."""
+    entry = TranscriptEntry("user", "Hello")
+
+    assert not hasattr(entry, "__dict__")
+    assert entry.to_record() == ["user", "Hello"]
+    assert entry.render() == "user: Hello"
+
+
+def test_transcript_append_and_render():
+    """Test appending writes compact records and renders lazily."""
+    state: dict = {}
+    transcript = Transcript(state)
+
+    transcript.append("user", "I felt anxious")
+    transcript.append("assistant", "What happened?")
+
+    assert state == {
+        "conv_raw.0": ["user", "I felt anxious"],
+        "conv_raw.1": ["assistant", "What happened?"],
+        "conv_len": 2,
+    }
+    assert len(transcript) == 2
+    assert transcript.render() == "user: I felt anxious\nassistant: What happened?"
+
+
+def test_transcript_render_is_cached_and_extended():
+    """Test the cached rendering is reused and extended after appends."""
+    transcript = Transcript({})
+    transcript.append("user", "One")
+
+    first = transcript.render()
+    assert transcript.render() is first
+
+    transcript.append("assistant", "Two")
+    assert transcript.render() == "user: One\nassistant: Two"
+    assert transcript.render(1) == "user: One"
+
+
+def test_transcript_reads_legacy_layout():
+    """Test sessions using the legacy conv_raw list are still readable."""
+    state = {
+        "conv_raw": [
+            {"role": "user", "text": "First message"},
+            {"role": "assistant", "text": "First response"},
+        ]
+    }
+    transcript = Transcript(state)
+
+    assert len(transcript) == 2
+    assert [entry.role for entry in transcript] == ["user", "assistant"]
+    assert transcript.render() == "user: First message\nassistant: First response"
+
+
+def test_append_to_legacy_session_migrates_the_list():
+    """Test the first append moves the legacy list into append-only keys."""
+    state = {
+        "conv_raw": [
+            {"role": "user", "text": "First message"},
+            {"role": "assistant", "text": "First response"},
+        ]
+    }
+    Transcript(state).append("user", "Second message")
+
+    assert state["conv_len"] == 3
+    assert state["conv_raw.0"] == ["user", "First message"]
+    assert state["conv_raw.2"] == ["user", "Second message"]
+    assert [entry.text for entry in Transcript(state)] == [
+        "First message",
+        "First response",
+        "Second message",
+    ]
+
+
+def test_exit_loop_marks_intake_without_copying_transcript():
+    """Test exit_loop records the intake length instead of a rendered copy."""
+    state: dict = {}
+    transcript = Transcript(state)
+    transcript.append("user", "I froze in the meeting")
+    transcript.append("assistant", "Thank you for sharing.")
+
+    tool_context = MagicMock()
+    tool_context.state = state
+
+    assert _exit_loop(tool_context) == {}
+    assert tool_context.actions.escalate is True
+    assert state["intake_len"] == 2
+    assert "intake_transcript" not in state
+    assert "transcript" not in state
+
+    # Later turns (e.g. the analysis stage) are not part of the intake.
+    transcript.append("assistant", "Here is your analysis.")
+    assert Transcript(state).render_intake() == (
+        "user: I froze in the meeting\nassistant: Thank you for sharing."
+    )
+
+
+def test_transcript_append_once_is_idempotent_per_turn():
+    """Test duplicate content is skipped within a turn but not across turns."""
+    state: dict = {}
+    transcript = Transcript(state)
+
+    assert transcript.append_once("user", "Hello", "inv-1") is not None
+    assert transcript.append_once("user", "Hello", "inv-1") is None
+    assert transcript.append_once("assistant", "Hello", "inv-1") is not None
+    assert transcript.append_once("user", "Hello", "inv-2") is not None
+
+    assert [entry.render() for entry in transcript] == [
+        "user: Hello",
+        "assistant: Hello",
+        "user: Hello",
+    ]
+    # Only the current invocation's hashes are kept.
+    assert state["conv_turn"]["id"] == "inv-2"
+    assert len(state["conv_turn"]["seen"]) == 1
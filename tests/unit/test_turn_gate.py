@@ -0,0 +1,114 @@
+"""Stub-LLM tests for the turn-gated collector loop."""
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, FunctionCall, Part
+import pytest
+
+from app.agents.budgeted_loop import LOOP_CONTROL_KEY, BudgetedLoopAgent
+from app.agents.turn_gate import AWAITING_USER_KEY, TurnGatedPipeline, skip_while_awaiting_user
+from app.tools.exit_loop import exit_loop
+
+
+class Downstream(BaseAgent):
+    """Stands in for the parser: counts how often the pipeline reaches it."""
+
+    runs: int = 0
+
+    async def _run_async_impl(self, ctx):
+        self.runs += 1
+        return
+        yield
+
+
+def _pipeline(model, *, gated: bool) -> tuple[TurnGatedPipeline, Downstream]:
+    collector = LlmAgent(
+        name="CollectorLLM", model=model, instruction="Ask one question.", tools=[exit_loop]
+    )
+    loop = BudgetedLoopAgent(
+        name="CollectorLoop",
+        sub_agents=[collector],
+        max_iterations=12,
+        await_user_after_reply=gated,
+    )
+    downstream = Downstream(name="JsonParser")
+    return TurnGatedPipeline(name="Pipeline", sub_agents=[loop, downstream]), downstream
+
+
+async def _calls_per_turn(root, model, messages) -> tuple[list[int], dict]:
+    """Send *messages* one /run at a time; return model calls per turn and the state."""
+    sessions = InMemorySessionService()
+    runner = Runner(app_name="reframe", agent=root, session_service=sessions)
+    session = await sessions.create_session(app_name="reframe", user_id="user")
+
+    calls = []
+    for message in messages:
+        before = model.calls
+        async for _ in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=Content(role="user", parts=[Part(text=message)]),
+        ):
+            pass
+        calls.append(model.calls - before)
+
+    session = await sessions.get_session(app_name="reframe", user_id="user", session_id=session.id)
+    return calls, session.state
+
+
+@pytest.mark.asyncio
+async def test_gated_loop_calls_the_model_once_per_user_turn(stub_llm):
+    """Test each user message costs one model call and the parser waits."""
+    model = stub_llm(["What happened?", "What did you think?", "How did you feel?"])
+    root, downstream = _pipeline(model, gated=True)
+
+    calls, state = await _calls_per_turn(root, model, ["Hi", "A meeting", "I froze"])
+
+    assert calls == [1, 1, 1]
+    assert downstream.runs == 0
+    assert state[LOOP_CONTROL_KEY]["CollectorLoop"]["stop_reason"] == "awaiting_user"
+    assert AWAITING_USER_KEY not in state  # temporary, never persisted
+
+
+@pytest.mark.asyncio
+async def test_exit_loop_ends_the_intake_instead_of_waiting(stub_llm):
+    """Test a turn that calls exit_loop is not held back for the user."""
+    exit_call = LlmResponse(
+        content=Content(role="model", parts=[Part(function_call=FunctionCall(name="_exit_loop"))])
+    )
+    model = stub_llm(["What happened?", exit_call])
+    root, _ = _pipeline(model, gated=True)
+
+    calls, state = await _calls_per_turn(root, model, ["Hi", "That's all"])
+
+    assert calls == [1, 1]
+    # exit_loop escalates (or, being long-running, pauses the invocation); either
+    # way the loop did not stop to wait for the user.
+    assert state[LOOP_CONTROL_KEY]["CollectorLoop"]["stop_reason"] in ("escalated", "paused")
+
+
+@pytest.mark.asyncio
+async def test_ungated_loop_wastes_calls_without_user_input(stub_llm):
+    """Test the behaviour the gate removes: repeated calls within one /run."""
+    model = stub_llm(["What happened?", "Continue processing", "No more outputs"])
+    root, _ = _pipeline(model, gated=False)
+
+    calls, _ = await _calls_per_turn(root, model, ["Hi"])
+
+    assert calls[0] > 1
+
+
+def test_pipeline_gates_each_sub_agent_once_and_keeps_its_callbacks():
+    """Test the gate runs first and is not added again by another pipeline."""
+
+    def own_callback(callback_context):
+        return None
+
+    downstream = Downstream(name="JsonParser", before_agent_callback=own_callback)
+    TurnGatedPipeline(name="Pipeline", sub_agents=[downstream])
+    downstream.parent_agent = None
+    TurnGatedPipeline(name="Pipeline", sub_agents=[downstream])
+
+    assert downstream.before_agent_callback == [skip_while_awaiting_user, own_callback]
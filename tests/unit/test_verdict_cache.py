@@ -0,0 +1,85 @@
+"""Unit tests for the per-session verdict cache."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from google.genai.types import Content, Part
+
+from app.callbacks.lang_detect import LangCallback
+from app.callbacks.safety_filters import SafetyGuard
+from app.services.cache.verdicts import VerdictCache, verdict_scope
+from app.services.safety.pii import PiiScanner
+
+
+def _ctx(text: str, *, session_id: str = "s1", invocation_id: str = "inv-1") -> MagicMock:
+    ctx = MagicMock()
+    ctx.state = {}
+    ctx.session.id = session_id
+    ctx.invocation_id = invocation_id
+    ctx.user_content = Content(parts=[Part(text=text)])
+    ctx._event_actions = MagicMock()
+    return ctx
+
+
+def test_cache_computes_once_per_scope_and_namespace():
+    """Test hits and misses are counted per namespace and scopes stay separate."""
+    cache = VerdictCache()
+    compute = MagicMock(side_effect=len)
+
+    assert cache.get_or_compute("s1", "pii", "hello", compute) == 5
+    assert cache.get_or_compute("s1", "pii", "hello", compute) == 5
+    assert cache.get_or_compute("s2", "pii", "hello", compute) == 5
+    assert cache.get_or_compute("s1", "lang", "hello", compute) == 5
+
+    assert compute.call_count == 3
+    assert cache.stats() == {"lang": {"hits": 0, "misses": 1}, "pii": {"hits": 1, "misses": 2}}
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the cache stays bounded and keeps recently used entries."""
+    cache = VerdictCache(max_entries=2)
+    cache.get_or_compute("s", "ns", "a", str.upper)
+    cache.get_or_compute("s", "ns", "b", str.upper)
+    cache.get_or_compute("s", "ns", "a", str.upper)  # refresh "a"
+    cache.get_or_compute("s", "ns", "c", str.upper)  # evicts "b"
+
+    assert len(cache) == 2
+    cache.get_or_compute("s", "ns", "a", str.upper)
+    cache.get_or_compute("s", "ns", "b", str.upper)
+    assert cache.stats()["ns"] == {"hits": 2, "misses": 4}
+
+
+def test_verdict_scope_falls_back_to_invocation():
+    """Test contexts without a session are scoped to their invocation."""
+    assert verdict_scope(SimpleNamespace(session=SimpleNamespace(id="abc"))) == "abc"
+    assert verdict_scope(SimpleNamespace(session=None, invocation_id="inv-9")) == "inv-9"
+
+
+def test_safety_guard_scans_each_message_once():
+    """Test loop iterations and agents sharing a session reuse the PII verdict."""
+    cache = VerdictCache()
+    pii_scanner = PiiScanner()
+    pii_scanner.scan = MagicMock(wraps=pii_scanner.scan)
+    collector, analyst = SafetyGuard(pii_scanner, cache), SafetyGuard(pii_scanner, cache)
+
+    for guard in (collector, collector, collector, analyst):
+        ctx = _ctx("Mi correo es ana@example.com")
+        assert guard(callback_context=ctx, llm_request=MagicMock()) is not None
+        assert ctx._event_actions.escalate is True
+        assert ctx.state["pii_detected"] == ["email"]
+
+    assert pii_scanner.scan.call_count == 1
+    assert cache.stats()["pii"] == {"hits": 3, "misses": 1}
+
+
+def test_lang_callback_reuses_detector_verdict():
+    """Test a message seen by two agents of the same session is detected once."""
+    cache = VerdictCache()
+    text = "Me siento muy nervioso cuando hablo en público"
+
+    first, second = _ctx(text, invocation_id="inv-1"), _ctx(text, invocation_id="inv-2")
+    LangCallback(cache)(callback_context=first, llm_request=MagicMock())
+    LangCallback(cache)(callback_context=second, llm_request=MagicMock())
+
+    assert first.state["lang"] == second.state["lang"] == "es"
+    assert cache.stats()["lang"] == {"hits": 1, "misses": 1}